@@ -0,0 +1,529 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Benchmark the Python QA checkers and track regressions across runs.
+
+Each benchmark runs a checker in-process on a fixed input (the repository itself or
+its examples) or a scaled one (synthetic packs from ``generate-context-pack.py``,
+the Markdown tree replicated ``--scale`` times, a synthetic ``_site``). For every
+benchmark the best wall time of ``--repeat`` runs, the tracemalloc peak of one
+extra traced run, and the throughput in its own unit are recorded. Fast benchmarks
+are looped until each timed sample lasts at least ``MIN_SAMPLE_SECONDS``.
+
+Results are appended to a JSON history file (default
+``qa-reports/bench-history.json``). They are compared with ``--baseline`` when
+given, else with the latest earlier run from the same machine in the history; a
+benchmark slower than ``--threshold`` or using more memory than
+``--memory-threshold`` (fractions, e.g. 0.25 = 25%) fails the run. Baselines
+recorded on a different machine are reported but never fail the run::
+
+    python3 scripts/bench-qa.py --save-baseline qa-reports/bench-baseline.json
+    python3 scripts/bench-qa.py --baseline qa-reports/bench-baseline.json --threshold 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import copy
+import fnmatch
+import gc
+import io
+import json
+import math
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import yaml
+
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR = ROOT / "scripts"
+DEFAULT_HISTORY = ROOT / "qa-reports/bench-history.json"
+HISTORY_FORMAT_VERSION = 1
+MIN_SAMPLE_SECONDS = 0.05
+
+EXAMPLE_V2 = ROOT / "docs/examples/common-example/context-pack-v2.yaml"
+MARKDOWN_SCANNERS = ("markdown_scan.py", "check-placeholders.py", "check-invalid-markdown-links.py", "check-markdown.py")
+MARKDOWN_DIRS = ("chapters", "appendices", "docs")
+
+# (path to an entry list, key holding the id) of every list replicated by _inflated_example.
+INFLATED_LISTS: list[tuple[tuple[str, ...], str]] = [
+    (("objects",), "id"),
+    (("morphisms",), "id"),
+    (("diagrams",), "id"),
+    (("acceptance_tests",), "id"),
+    (("data_contracts", "schemas"), "id"),
+    (("data_contracts", "mappings"), "id"),
+    (("open_systems", "components"), "id"),
+    (("views", "lenses_or_optics"), "id"),
+    (("effects", "operations"), "id"),
+    (("effects", "handlers"), "id"),
+    (("resource_constraints", "linear_resources"), "id"),
+]
+INFLATE_FACTOR = 100
+
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from script_loader import load_script_module  # noqa: E402
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    unit: str
+    # Builds the input once and returns (run, units processed per run).
+    prepare: Callable[[Path], tuple[Callable[[], Any], int]]
+
+
+@dataclass(frozen=True)
+class Result:
+    name: str
+    seconds: float
+    peak_bytes: int
+    units: int
+    unit: str
+
+    @property
+    def throughput(self) -> float:
+        return self.units / self.seconds if self.seconds else 0.0
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "seconds": round(self.seconds, 6),
+            "peak_bytes": self.peak_bytes,
+            "units": self.units,
+            "unit": self.unit,
+            "throughput": round(self.throughput, 3),
+        }
+
+
+def _quiet(fn: Callable[[], Any]) -> Callable[[], Any]:
+    """Run ``fn`` with the checker's own stdout/stderr output discarded."""
+
+    def run() -> Any:
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            return fn()
+
+    return run
+
+
+def _pack_entries(doc: dict[str, Any]) -> int:
+    return sum(len(doc.get(key, [])) for key in ("objects", "morphisms", "diagrams", "acceptance_tests"))
+
+
+def _synthetic_pack(scale: int) -> dict[str, Any]:
+    generator = load_script_module("context_pack_generator", SCRIPTS_DIR / "generate-context-pack.py")
+    return generator.generate_pack(version=2, objects=1000 * scale, morphisms=2000 * scale, seed=0)
+
+
+def _semantic(doc_factory: Callable[[int], Any]) -> Callable[[Path], tuple[Callable[[], Any], int]]:
+    def prepare(work_dir: Path) -> tuple[Callable[[], Any], int]:
+        validator = load_script_module("context_pack_semantic_validator", SCRIPTS_DIR / "validate-context-pack.py")
+        doc = doc_factory(_SCALE)
+        return (lambda: validator.validate_context_pack_v2(doc)), _pack_entries(doc)
+
+    return prepare
+
+
+def _schema(doc_factory: Callable[[int], Any]) -> Callable[[Path], tuple[Callable[[], Any], int]]:
+    def prepare(work_dir: Path) -> tuple[Callable[[], Any], int]:
+        schema_validation = load_script_module("context_pack_schema_validator", SCRIPTS_DIR / "validate-context-pack-schema.py")
+        validator = schema_validation.compile_validator(schema_validation.DEFAULT_SCHEMA_BY_VERSION[2])
+        doc = doc_factory(_SCALE)
+        return (lambda: list(schema_validation.iter_schema_errors(validator, doc))), _pack_entries(doc)
+
+    return prepare
+
+
+def _example(scale: int) -> Any:
+    return yaml.safe_load(EXAMPLE_V2.read_text(encoding="utf-8"))
+
+
+def _inflated_example(scale: int) -> Any:
+    """The v2 example with every id-bearing list replicated ``INFLATE_FACTOR * scale``
+    times under suffixed ids; unlike the synthetic packs it fills every v2 section."""
+    doc = _example(scale)
+    for keys, id_key in INFLATED_LISTS:
+        container: Any = doc
+        for key in keys[:-1]:
+            container = container.get(key) if isinstance(container, dict) else None
+        if not isinstance(container, dict) or not isinstance(container.get(keys[-1]), list):
+            continue
+        original = container[keys[-1]]
+        inflated = list(original)
+        for n in range(1, INFLATE_FACTOR * scale):
+            for item in original:
+                clone = copy.deepcopy(item)
+                if isinstance(clone, dict) and isinstance(clone.get(id_key), str):
+                    clone[id_key] = f"{clone[id_key]}-{n}"
+                inflated.append(clone)
+        container[keys[-1]] = inflated
+    return doc
+
+
+def _prepare_regressions(work_dir: Path) -> tuple[Callable[[], Any], int]:
+    module = load_script_module("context_pack_v2_regressions", SCRIPTS_DIR / "check-context-pack-v2-schema-regressions.py")
+    fixtures = len(json.loads(module.EMPTY_OBJECT_FIXTURE_PATH.read_text(encoding="utf-8"))) + len(
+        json.loads(module.MALFORMED_FIXTURE_PATH.read_text(encoding="utf-8"))
+    )
+    return _quiet(module.main), fixtures
+
+
+def _markdown_tree(work_dir: Path, scale: int) -> Path:
+    """A copy of the scanners next to the Markdown tree replicated ``scale`` times."""
+    root = work_dir / f"markdown-x{scale}"
+    if root.exists():
+        return root
+    (root / "scripts").mkdir(parents=True)
+    for name in MARKDOWN_SCANNERS:
+        shutil.copy2(SCRIPTS_DIR / name, root / "scripts" / name)
+    for top in MARKDOWN_DIRS:
+        for source in (ROOT / top).rglob("*.md"):
+            relative = source.relative_to(ROOT / top)
+            for n in range(scale):
+                target = root / top / f"copy{n}" / relative
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(source, target)
+    return root
+
+
+def _markdown_scanner(
+    script: str, scaled: bool, incremental: bool = False, jobs: Optional[int] = None
+) -> Callable[[Path], tuple[Callable[[], Any], int]]:
+    def prepare(work_dir: Path) -> tuple[Callable[[], Any], int]:
+        root = _markdown_tree(work_dir, 10 * _SCALE) if scaled else ROOT
+        module_name = f"bench_{Path(script).stem.replace('-', '_')}_{'scaled' if scaled else 'repo'}"
+        module = load_script_module(module_name, root / "scripts" / script)
+        files = sum(1 for top in MARKDOWN_DIRS for _ in (root / top).rglob("*.md"))
+        # A warm manifest in the work directory: measures a run where nothing changed.
+        argv = ["--manifest", str(work_dir / f"{module_name}-manifest.json")] if incremental else []
+        if jobs is not None:
+            argv += ["--jobs", str(jobs)]
+        if incremental:
+            _quiet(lambda: module.main(argv))()
+        return _quiet(lambda: module.main(argv)), files
+
+    return prepare
+
+
+SITE_TABLE = "<table><thead><tr>{headers}</tr></thead><tbody>{rows}</tbody></table>"
+SITE_PAGES: dict[str, str] = {
+    "chapters/chapter01/index.html": (
+        SITE_TABLE.format(headers="<th>失敗パターン</th><th>典型症状</th><th>予防策（設計成果物）</th>", rows="{rows}")
+        + '<div class="mermaid-wrapper mermaid-live"></div><div class="mermaid-fallback">'
+        '<img src="/assets/images/chapter01/context-pack-loop.svg"></div>'
+    ),
+    "style/terminology/index.html": (
+        SITE_TABLE.format(headers="<th>English</th><th>日本語</th><th>備考</th>", rows="{rows}")
+        + '<a href="/style/notation/">notation</a>'
+    ),
+    "appendices/references/index.html": SITE_TABLE.format(headers="<th>章</th><th>次に読む候補</th>", rows="{rows}"),
+    "appendices/desk-reference/index.html": (
+        SITE_TABLE.format(headers="<th>図版</th><th>場所</th><th>何を確認するときに使うか</th>", rows="{rows}")
+        + SITE_TABLE.format(headers="<th>症状</th><th>最初に戻る場所</th><th>まず見るもの</th>", rows="{rows}")
+    ),
+    "index.html": (
+        '<div class="mermaid-wrapper mermaid-live"></div><div class="mermaid-fallback">'
+        '<img src="/assets/images/shared/context-pack-concept-map.svg"></div>'
+    ),
+    "chapters/chapter04/index.html": (
+        '<div class="mermaid-wrapper mermaid-live"></div><div class="mermaid-fallback">'
+        '<img src="/assets/images/chapter04/spec-code-functor.svg"></div>'
+    ),
+    "chapters/chapter07/index.html": (
+        '<div class="mermaid-wrapper mermaid-live"></div><div class="mermaid-wrapper mermaid-live"></div>'
+        '<img src="/assets/images/chapter07/pullback.svg"><img src="/assets/images/chapter07/pushout.svg">'
+    ),
+    "chapters/chapter09/index.html": (
+        '<div class="mermaid-wrapper mermaid-live"></div><div class="mermaid-fallback">'
+        '<img src="/assets/images/chapter09/pure-core-impure-shell.svg"></div>'
+    ),
+}
+
+
+def _synthetic_site(work_dir: Path, scale: int) -> Path:
+    """A ``_site`` whose checked pages pass, padded with ``scale`` x 2000 rows and paragraphs each."""
+    root = work_dir / f"site-x{scale}"
+    if root.exists():
+        return root
+    rows = "".join(f"<tr><td>row {i}</td><td><a href=\"/chapters/chapter{i % 10:02d}/\">link</a></td></tr>" for i in range(2000 * scale))
+    filler = "".join(f'<p class="body-text">段落 {i} <a href="#s{i}">#</a></p>' for i in range(2000 * scale))
+    for relative, body in SITE_PAGES.items():
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"<!DOCTYPE html><html><body>{filler}{body.replace('{rows}', rows)}</body></html>", encoding="utf-8")
+    return root
+
+
+def _prepare_rendered_html(work_dir: Path) -> tuple[Callable[[], Any], int]:
+    module = load_script_module("bench_check_rendered_html", SCRIPTS_DIR / "check-rendered-html.py")
+    site_root = _synthetic_site(work_dir, _SCALE)
+    size = sum(p.stat().st_size for p in site_root.rglob("*.html"))
+    return _quiet(lambda: module.main(["--site-root", str(site_root)])), size
+
+
+CRAWL_PAGE = (
+    "<!DOCTYPE html><html><body><table><thead><tr><th>ページ</th><th>図</th></tr></thead><tbody>{rows}</tbody></table>"
+    '<figure><div class="mermaid-live"><div class="mermaid-wrapper"></div></div><div class="mermaid-fallback">'
+    '<img src="/assets/images/figure.svg"></div></figure>{filler}</body></html>'
+)
+
+
+def _synthetic_crawl_site(work_dir: Path, scale: int) -> tuple[Path, Path]:
+    """A ``_site`` of ``scale`` x 50 cross-linked pages that passes every site-wide check, and a config running only those."""
+    root = work_dir / f"crawl-site-x{scale}"
+    config = work_dir / "crawl-checks.yml"
+    config.write_text("pages: {}\nsite:\n  checks: [internal-links, internal-images, mermaid-fallbacks, non-empty-tables]\n", encoding="utf-8")
+    if root.exists():
+        return root, config
+    pages = 50 * scale
+    for n in range(pages):
+        rows = "".join(f'<tr><td><a href="/pages/p{(n + i) % pages:04d}/">p{i}</a></td><td><img src="../../assets/images/figure.svg"></td></tr>' for i in range(100))
+        filler = "".join(f'<p class="body-text">段落 {i} <a href="#s{i}">#</a></p>' for i in range(200))
+        path = root / f"pages/p{n:04d}/index.html"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(CRAWL_PAGE.format(rows=rows, filler=filler), encoding="utf-8")
+    (root / "assets/images").mkdir(parents=True, exist_ok=True)
+    (root / "assets/images/figure.svg").write_text("<svg xmlns=\"http://www.w3.org/2000/svg\"/>", encoding="utf-8")
+    return root, config
+
+
+def _prepare_rendered_html_crawl(work_dir: Path) -> tuple[Callable[[], Any], int]:
+    module = load_script_module("bench_check_rendered_html", SCRIPTS_DIR / "check-rendered-html.py")
+    site_root, config = _synthetic_crawl_site(work_dir, _SCALE)
+    size = sum(p.stat().st_size for p in site_root.rglob("*.html"))
+    argv = ["--site-root", str(site_root), "--config", str(config), "--crawl", "--baseurl", ""]
+    return _quiet(lambda: module.main(argv)), size
+
+
+def _prepare_page_weight(work_dir: Path) -> tuple[Callable[[], Any], int]:
+    module = load_script_module("bench_check_page_weight", SCRIPTS_DIR / "check-page-weight.py")
+    site_root, _ = _synthetic_crawl_site(work_dir, _SCALE)
+    size = sum(p.stat().st_size for p in site_root.rglob("*.html"))
+    return _quiet(lambda: module.main(["--site-root", str(site_root), "--baseurl", ""])), size
+
+
+def _prepare_precompress(work_dir: Path) -> tuple[Callable[[], Any], int]:
+    module = load_script_module("bench_precompress_site", SCRIPTS_DIR / "precompress-site.py")
+    site_root, _ = _synthetic_crawl_site(work_dir, _SCALE)
+    size = sum(p.stat().st_size for p in site_root.rglob("*.html"))
+    return _quiet(lambda: module.main(["--site-root", str(site_root), "--no-cache"])), size
+
+
+def _prepare_svg_optimize(work_dir: Path) -> tuple[Callable[[], Any], int]:
+    """The repository's SVGs, re-indented with editor comments, 40x per scale step; --check minifies without writing."""
+    module = load_script_module("bench_optimize_svg", SCRIPTS_DIR / "optimize-svg.py")
+    sources = sorted((ROOT / "assets/images").rglob("*.svg"))
+    out = work_dir / "svg"
+    for i in range(40 * _SCALE):
+        for source in sources:
+            text = source.read_text(encoding="utf-8").replace("><", ">\n  <")
+            target = out / f"{i:03d}" / source.name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(f'<?xml version="1.0"?>\n<!-- exported copy {i} -->\n{text}', encoding="utf-8")
+    size = sum(p.stat().st_size for p in out.rglob("*.svg"))
+    return _quiet(lambda: module.main(["--check", "--no-manifest", str(out)])), size
+
+
+BENCHMARKS: list[Benchmark] = [
+    Benchmark("semantic-lint/example", "entries", _semantic(_example)),
+    Benchmark("semantic-lint/synthetic", "entries", _semantic(_synthetic_pack)),
+    Benchmark("semantic-lint/inflated", "entries", _semantic(_inflated_example)),
+    Benchmark("schema/example", "entries", _schema(_example)),
+    Benchmark("schema/synthetic", "entries", _schema(_synthetic_pack)),
+    Benchmark("v2-regressions/fixtures", "fixtures", _prepare_regressions),
+    Benchmark("placeholders/repo", "files", _markdown_scanner("check-placeholders.py", scaled=False)),
+    Benchmark("placeholders/scaled", "files", _markdown_scanner("check-placeholders.py", scaled=True)),
+    Benchmark("markdown-links/repo", "files", _markdown_scanner("check-invalid-markdown-links.py", scaled=False)),
+    Benchmark("markdown-links/scaled", "files", _markdown_scanner("check-invalid-markdown-links.py", scaled=True)),
+    Benchmark("markdown/repo", "files", _markdown_scanner("check-markdown.py", scaled=False)),
+    Benchmark("markdown/scaled", "files", _markdown_scanner("check-markdown.py", scaled=True)),
+    Benchmark("markdown/scaled-incremental", "files", _markdown_scanner("check-markdown.py", scaled=True, incremental=True)),
+    Benchmark("markdown/scaled-mmap", "files", _markdown_scanner("check-markdown.py", scaled=True, jobs=1)),
+    Benchmark("markdown/scaled-parallel", "files", _markdown_scanner("check-markdown.py", scaled=True, jobs=0)),
+    Benchmark("internal-links/repo", "files", _markdown_scanner("check-internal-links.py", scaled=False)),
+    Benchmark("rendered-html/synthetic", "bytes", _prepare_rendered_html),
+    Benchmark("rendered-html/crawl", "bytes", _prepare_rendered_html_crawl),
+    Benchmark("page-weight/crawl", "bytes", _prepare_page_weight),
+    Benchmark("svg-optimize/synthetic", "bytes", _prepare_svg_optimize),
+    Benchmark("precompress/crawl", "bytes", _prepare_precompress),
+]
+
+# Scale factor for the synthetic and replicated inputs; set from --scale in main().
+_SCALE = 1
+
+
+def run_benchmark(benchmark: Benchmark, work_dir: Path, repeat: int) -> Result:
+    run, units = benchmark.prepare(work_dir)
+    # The warm-up run (imports, generated validators, OS page cache) also sizes the loop.
+    start = time.perf_counter()
+    run()
+    loops = max(1, math.ceil(MIN_SAMPLE_SECONDS / max(time.perf_counter() - start, 1e-9)))
+    best = float("inf")
+    # Like timeit, keep the cyclic GC out of the timed samples; its pauses depend on heap history.
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(loops):
+                run()
+            best = min(best, (time.perf_counter() - start) / loops)
+    finally:
+        gc.enable()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return Result(benchmark.name, best, peak, units, benchmark.unit)
+
+
+def machine_id() -> dict[str, Any]:
+    return {
+        "node": platform.node(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.strip() or None
+
+
+def load_history(path: Path) -> dict[str, Any]:
+    try:
+        history = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {"format": HISTORY_FORMAT_VERSION, "runs": []}
+    if not isinstance(history, dict) or history.get("format") != HISTORY_FORMAT_VERSION:
+        raise ValueError(f"unsupported benchmark history format: {path}")
+    return history
+
+
+def write_json(path: Path, data: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        os.replace(tmp_name, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_name)
+        raise
+
+
+def compare(
+    current: dict[str, Any],
+    baseline: dict[str, Any],
+    threshold: float,
+    memory_threshold: float,
+) -> list[str]:
+    """Print the change of every benchmark against ``baseline`` and return the regressions."""
+    regressions: list[str] = []
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None or before.get("scale") != result.get("scale"):
+            print(f"  {name}: no comparable baseline")
+            continue
+        time_ratio = result["seconds"] / before["seconds"] if before["seconds"] else 1.0
+        memory_ratio = result["peak_bytes"] / before["peak_bytes"] if before["peak_bytes"] else 1.0
+        print(f"  {name}: time {time_ratio - 1:+.1%}, peak memory {memory_ratio - 1:+.1%}")
+        if time_ratio > 1 + threshold:
+            regressions.append(f"{name}: {before['seconds'] * 1000:.2f} ms -> {result['seconds'] * 1000:.2f} ms")
+        if memory_ratio > 1 + memory_threshold:
+            regressions.append(f"{name}: peak {before['peak_bytes']:,} B -> {result['peak_bytes']:,} B")
+    return regressions
+
+
+def main(argv: list[str]) -> int:
+    global _SCALE
+
+    parser = argparse.ArgumentParser(description="Benchmark the Python QA checkers and fail on regressions.")
+    parser.add_argument("--only", action="append", default=None, metavar="GLOB", help="Run only benchmarks matching GLOB (repeatable)")
+    parser.add_argument("--scale", type=int, default=1, help="Scale factor for synthetic and replicated inputs (default: 1)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark; the best is recorded (default: 3)")
+    parser.add_argument("--history", default=str(DEFAULT_HISTORY), help=f"JSON history file (default: {DEFAULT_HISTORY.relative_to(ROOT)})")
+    parser.add_argument("--no-record", action="store_true", help="Do not append this run to the history file")
+    parser.add_argument("--baseline", default=None, help="Compare against this baseline file instead of the latest history entry")
+    parser.add_argument("--save-baseline", default=None, metavar="PATH", help="Also write this run to PATH as a baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown as a fraction (default: 0.25)")
+    parser.add_argument("--memory-threshold", type=float, default=0.25, help="Allowed peak-memory growth as a fraction (default: 0.25)")
+    parser.add_argument("--label", default=None, help="Free-form label stored with the run")
+    args = parser.parse_args(argv)
+    if args.scale < 1 or args.repeat < 1:
+        parser.error("--scale and --repeat must be at least 1")
+    _SCALE = args.scale
+
+    selected = [b for b in BENCHMARKS if not args.only or any(fnmatch.fnmatch(b.name, g) for g in args.only)]
+    if not selected:
+        parser.error("no benchmark matches --only")
+
+    results: dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="bench-qa-") as tmp:
+        for benchmark in selected:
+            result = run_benchmark(benchmark, Path(tmp), args.repeat)
+            results[benchmark.name] = {**result.to_json(), "scale": args.scale}
+            print(
+                f"{benchmark.name}: {result.seconds * 1000:.2f} ms, peak {result.peak_bytes / 1024 / 1024:.1f} MiB, "
+                f"{result.throughput:,.0f} {result.unit}/s"
+            )
+
+    run = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "label": args.label,
+        "machine": machine_id(),
+        "results": results,
+    }
+
+    history_path = Path(args.history)
+    history = load_history(history_path)
+    if args.baseline:
+        baseline: Optional[dict[str, Any]] = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    else:
+        same_machine = [r for r in history["runs"] if r.get("machine") == run["machine"]]
+        baseline = same_machine[-1] if same_machine else None
+
+    rc = 0
+    if baseline is not None:
+        print(f"==> Compared with {baseline.get('label') or baseline.get('git_revision') or 'baseline'} ({baseline.get('timestamp')})")
+        regressions = compare(run, baseline, args.threshold, args.memory_threshold)
+        if baseline.get("machine") != run["machine"]:
+            print("⚠️  Baseline was recorded on a different machine; regressions are not enforced.", file=sys.stderr)
+        elif regressions:
+            print("❌ Benchmark regressions:", file=sys.stderr)
+            for line in regressions:
+                print(f"- {line}", file=sys.stderr)
+            rc = 1
+
+    if not args.no_record:
+        history["runs"].append(run)
+        write_json(history_path, history)
+    if args.save_baseline:
+        write_json(Path(args.save_baseline), run)
+    return rc
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
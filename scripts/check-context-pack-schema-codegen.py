@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Check that the generated schema validators agree with jsonschema.
+
+Every Context Pack example, the v2 negative fixtures, and a seeded set of mutations
+of each example (type swaps, empty containers, dropped keys) are validated with both
+``jsonschema.Draft202012Validator`` and the generated module. Validity and the
+multiset of ``(path, message, keyword)`` errors must match exactly. For mutations,
+``iter_errors_at`` on the mutated subtree must also yield exactly the full run's
+errors under that path.
+
+``--bench`` also reports the throughput of both engines on the examples.
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+import yaml
+from jsonschema import Draft202012Validator
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from context_pack_schema_codegen import load_generated_validator  # noqa: E402
+
+
+ROOT = Path(__file__).resolve().parent.parent
+SCHEMA_PATHS = {
+    1: ROOT / "docs/spec/context-pack-v1.schema.json",
+    2: ROOT / "docs/spec/context-pack-v2.schema.json",
+}
+EXAMPLE_DIR = ROOT / "docs/examples"
+EMPTY_OBJECT_FIXTURE_PATH = ROOT / "scripts/fixtures/context-pack-v2-empty-objects.json"
+MALFORMED_FIXTURE_PATH = ROOT / "scripts/fixtures/context-pack-v2-malformed-entries.json"
+
+REPLACEMENTS: list[Any] = [None, 0, 1.5, True, "", "x", [], {}, [{}], -1]
+
+
+def load_json(path: Path) -> Any:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def load_yaml(path: Path) -> Any:
+    return yaml.safe_load(path.read_text(encoding="utf-8"))
+
+
+def error_key(errors: Any) -> list[tuple[str, str, Any]]:
+    return sorted((repr(tuple(e.absolute_path)), e.message, str(e.validator)) for e in errors)
+
+
+def iter_paths(doc: Any, prefix: tuple[Any, ...] = ()) -> Iterator[tuple[Any, ...]]:
+    yield prefix
+    if isinstance(doc, dict):
+        for key, value in doc.items():
+            yield from iter_paths(value, (*prefix, key))
+    elif isinstance(doc, list):
+        for i, value in enumerate(doc):
+            yield from iter_paths(value, (*prefix, i))
+
+
+def mutate(doc: Any, path: tuple[Any, ...], rng: random.Random) -> tuple[Any, tuple[Any, ...]]:
+    """Return a mutated copy of ``doc`` and the path of the subtree that changed."""
+    out = copy.deepcopy(doc)
+    if not path:
+        return rng.choice(REPLACEMENTS), ()
+    parent = out
+    for part in path[:-1]:
+        parent = parent[part]
+    if isinstance(parent, dict) and rng.random() < 0.3:
+        del parent[path[-1]]
+        return out, path[:-1]
+    parent[path[-1]] = copy.deepcopy(rng.choice(REPLACEMENTS))
+    return out, path
+
+
+def fixture_cases(base: Any) -> Iterator[tuple[str, Any]]:
+    fixtures = [
+        *({**fixture, "value": {}} for fixture in load_json(EMPTY_OBJECT_FIXTURE_PATH)),
+        *load_json(MALFORMED_FIXTURE_PATH),
+    ]
+    for fixture in fixtures:
+        candidate = copy.deepcopy(base)
+        target: Any = candidate
+        for part in fixture["path"][:-1]:
+            target = target.setdefault(part, {})
+        target[fixture["path"][-1]] = [fixture["value"]]
+        yield f"fixture {fixture['name']}", candidate
+
+
+def bench(fn: Callable[[Any], Any], docs: list[Any], seconds: float = 1.0) -> float:
+    """Documents per second for ``fn`` cycling over ``docs``."""
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for doc in docs:
+            fn(doc)
+        count += len(docs)
+    return count / (time.perf_counter() - start)
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Differential test of the generated Context Pack schema validators.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the mutation sample (default: 0)")
+    parser.add_argument("--mutations", type=int, default=200, help="Mutations per example (default: 200)")
+    parser.add_argument("--bench", action="store_true", help="Also report validation throughput of both engines")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    engines = {}
+    for version, schema_path in SCHEMA_PATHS.items():
+        reference = Draft202012Validator(load_json(schema_path))
+        engines[version] = (reference, load_generated_validator(schema_path))
+
+    examples = {path: load_yaml(path) for path in sorted(EXAMPLE_DIR.glob("*/context-pack-v*.yaml"))}
+    checked = 0
+    failures = 0
+    for version, (reference, generated) in engines.items():
+        # (name, document, path of the changed subtree or None)
+        cases: list[tuple[str, Any, Optional[tuple[Any, ...]]]] = []
+        for path, doc in examples.items():
+            name = path.relative_to(ROOT).as_posix()
+            cases.append((name, doc, None))
+            paths = list(iter_paths(doc))
+            for n in range(args.mutations):
+                mutant, touched = mutate(doc, rng.choice(paths), rng)
+                cases.append((f"{name} mutation {n}", mutant, touched))
+            if path.name == "context-pack-v2.yaml":
+                cases.extend((f"{name} {label}", candidate, None) for label, candidate in fixture_cases(doc))
+
+        for name, doc, touched in cases:
+            reference_errors = list(reference.iter_errors(doc))
+            expected = error_key(reference_errors)
+            actual = error_key(generated.iter_errors(doc))
+            checked += 1
+            mismatch = expected != actual or generated.is_valid(doc) != (not expected)
+            if not mismatch and touched is not None:
+                scoped = generated.iter_errors_at(doc, touched)
+                if scoped is not None:
+                    under = [e for e in reference_errors if tuple(e.absolute_path)[: len(touched)] == touched]
+                    expected, actual = error_key(under), error_key(scoped)
+                    mismatch = expected != actual
+                    name = f"{name} (iter_errors_at {touched!r})"
+            if mismatch:
+                failures += 1
+                print(f"❌ v{version} schema: generated validator disagrees on {name}", file=sys.stderr)
+                for line in sorted(set(expected) ^ set(actual))[:5]:
+                    print(f"   {'jsonschema' if line in expected else 'generated'}: {line}", file=sys.stderr)
+
+    if failures:
+        print(f"❌ {failures} of {checked} documents disagree", file=sys.stderr)
+        return 1
+    print(f"✅ Generated schema validators agree with jsonschema on {checked} documents")
+
+    if args.bench:
+        for version, (reference, generated) in engines.items():
+            docs = [doc for path, doc in examples.items() if path.name == f"context-pack-v{version}.yaml"]
+            slow = bench(lambda doc: list(reference.iter_errors(doc)), docs)
+            fast = bench(lambda doc: list(generated.iter_errors(doc)), docs)
+            print(f"v{version}: jsonschema {slow:,.0f} docs/s, generated {fast:,.0f} docs/s ({fast / slow:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -1,9 +1,15 @@
 #!/usr/bin/env python3
-"""Reject empty structured entries while preserving the canonical v2 examples."""
+"""Reject empty structured entries while preserving the canonical v2 examples.
+
+Each negative fixture is applied as a path-copied overlay of the base example (only
+the dicts along the fixture path are copied; every other subtree is shared), and
+only the changed subtree is re-validated: the generated schema validator checks it
+with ``iter_errors_at`` and the semantic lint runs just the rules that read it or
+resolve ids defined under it, on a symbol table updated from the base's.
+"""
 
 from __future__ import annotations
 
-import copy
 import importlib.util
 import json
 from pathlib import Path
@@ -11,7 +17,10 @@ import sys
 from typing import Any
 
 import yaml
-from jsonschema import Draft202012Validator
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from context_pack_schema_codegen import load_generated_validator  # noqa: E402
 
 
 ROOT = Path(__file__).resolve().parent.parent
@@ -40,11 +49,15 @@ def format_path(parts: list[Any]) -> str:
     return result
 
 
-def replace_entry(document: dict[str, Any], path: list[str], value: Any) -> None:
-    target: Any = document
+def overlay(document: dict[str, Any], path: list[str], value: Any) -> dict[str, Any]:
+    """Return ``document`` with ``path`` set to ``[value]``, copying only the dicts along ``path``."""
+    root = dict(document)
+    target = root
     for part in path[:-1]:
+        target[part] = dict(target[part])
         target = target[part]
     target[path[-1]] = [value]
+    return root
 
 
 def load_semantic_validator() -> Any:
@@ -59,9 +72,8 @@ def load_semantic_validator() -> Any:
 
 
 def main() -> int:
-    schema = load_json(SCHEMA_PATH)
-    Draft202012Validator.check_schema(schema)
-    validator = Draft202012Validator(schema)
+    # Shares the validator generated for validate-context-pack-schema.py instead of recompiling the schema.
+    validator = load_generated_validator(SCHEMA_PATH)
     semantic_validator = load_semantic_validator()
 
     examples = [load_yaml(path) for path in EXAMPLE_PATHS]
@@ -79,6 +91,7 @@ def main() -> int:
             raise AssertionError(f"canonical semantic lint failed: {path}: {first.path}: {first.message}")
 
     base = examples[0]
+    base_symbols = semantic_validator.build_symbol_table(base)
     empty_object_fixtures = load_json(EMPTY_OBJECT_FIXTURE_PATH)
     malformed_fixtures = load_json(MALFORMED_FIXTURE_PATH)
     if not isinstance(empty_object_fixtures, list) or not empty_object_fixtures:
@@ -100,9 +113,11 @@ def main() -> int:
             raise AssertionError(f"duplicate negative fixture name: {name}")
         seen_names.add(name)
 
-        candidate = copy.deepcopy(base)
-        replace_entry(candidate, path, fixture.get("value"))
-        errors = list(validator.iter_errors(candidate))
+        candidate = overlay(base, path, fixture.get("value"))
+        touched = tuple(path)
+        errors = validator.iter_errors_at(candidate, touched)
+        if errors is None:
+            errors = validator.iter_errors(candidate)
         expected_prefix = [*path, 0]
         matching = [
             error
@@ -115,7 +130,7 @@ def main() -> int:
                 f"{format_path(expected_prefix)}"
             )
         expected_semantic_path = format_path(expected_prefix)
-        semantic_errors = semantic_validator.validate_context_pack_v2(candidate)
+        semantic_errors = semantic_validator.iter_errors_v2_scoped(candidate, touched, base_symbols)
         if not any(error.path.startswith(expected_semantic_path) for error in semantic_errors):
             raise AssertionError(
                 f"semantic lint accepted invalid structured entry for {name}: "
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Check internal links and ``#fragment`` anchors in the book's Markdown, offline.
+
+One pass reads every Markdown file under ``chapters/``, ``appendices/``, ``docs/``,
+``shared/`` and the top level, recording each file's site URL, the anchors Jekyll
+generates for it, and its links. A second pass resolves every link against that
+index; nothing is fetched and book-formatter is not needed.
+
+Resolution follows the site build:
+
+- page URLs come from the ``permalink`` front matter, else from ``permalink: pretty``;
+  files excluded by ``_config.yml`` (or, without front matter, the README-style names
+  skipped by jekyll-optional-front-matter) are not pages;
+- ``{{ '/path/' | relative_url }}`` links are site URLs;
+- relative links are rewritten by jekyll-relative-links when they name a page or
+  static file relative to the source file, and are otherwise resolved by the browser
+  against the page URL; files that are not published (e.g. an excluded README) are
+  read on GitHub, so their links are resolved as repository paths;
+- anchors are the kramdown GFM header ids (lower-cased, punctuation removed, spaces
+  to ``-``, ``-1``/``-2`` suffixes for duplicates), ``{#id}`` / ``{: #id}``
+  attributes, ``id=``/``name=`` attributes in raw HTML, footnote ids, and the ids in
+  ``_layouts``/``_includes`` (present on every page).
+
+External links (with a scheme or ``//``) and links built from other Liquid
+expressions are skipped.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import posixpath
+import re
+import sys
+import unicodedata
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import unquote, urljoin
+
+try:
+    import yaml
+except ImportError:
+    print("❌ Missing dependency: pyyaml", file=sys.stderr)
+    print("   Install: python3 -m pip install -r scripts/requirements-qa.txt", file=sys.stderr)
+    raise SystemExit(2)
+
+from markdown_scan import EXCLUDE_DIRS
+from qa_findings import Finding, add_format_argument, open_writer
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SOURCE_DIRS = ("chapters", "appendices", "docs", "shared")
+CONFIG_PATH = ROOT / "_config.yml"
+LAYOUT_DIRS = ("_layouts", "_includes")
+
+RULE_MISSING_TARGET = "internal-link/missing-target"
+RULE_MISSING_ANCHOR = "internal-link/missing-anchor"
+
+# Markdown files jekyll-optional-front-matter leaves alone unless they have front matter.
+OPTIONAL_FRONT_MATTER_SKIPPED = {
+    "README",
+    "LICENSE",
+    "LICENCE",
+    "COPYING",
+    "CODE_OF_CONDUCT",
+    "CONTRIBUTING",
+    "ISSUE_TEMPLATE",
+    "PULL_REQUEST_TEMPLATE",
+}
+
+FENCE_RE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+ATX_RE = re.compile(r"^ {0,3}(#{1,6})(?:[ \t]+(.*?))?[ \t]*$")
+ATX_CLOSING_RE = re.compile(r"(?:^|[ \t]+)#+$")
+HEADER_ID_RE = re.compile(r"[ \t]*\{#([A-Za-z][\w:-]*)\}$")
+SETEXT_RE = re.compile(r"^ {0,3}(?:=+|-+)[ \t]*$")
+NOT_PARAGRAPH_RE = re.compile(r"^\s*(?:[-*+>|]|\d+[.)]\s|#|<|\{:|$)")
+IAL_ID_RE = re.compile(r"\{:[^}]*#([A-Za-z][\w:-]*)[^}]*\}")
+HTML_ID_RE = re.compile(r"<[^>]*?\b(?:id|name)\s*=\s*(?:\"([^\"]+)\"|'([^']+)')")
+FOOTNOTE_DEF_RE = re.compile(r"^ {0,3}\[\^([^\]]+)\]:")
+FOOTNOTE_REF_RE = re.compile(r"\[\^([^\]]+)\](?!:)")
+CODE_SPAN_RE = re.compile(r"(`+)(?:(?!\1).)+?\1")
+INLINE_LINK_RE = re.compile(r"\]\(\s*(\{\{.*?\}\}[^)\s]*|<[^>\n]*>|[^)\s]+)")
+REFERENCE_DEF_RE = re.compile(r"^ {0,3}\[[^\]^][^\]]*\]:[ \t]*(<[^>\n]*>|\S+)")
+LIQUID_URL_RE = re.compile(r"\{\{\s*(['\"])(.*?)\1\s*\|\s*(?:relative_url|absolute_url)\s*\}\}(.*)")
+SCHEME_RE = re.compile(r"^[A-Za-z][A-Za-z0-9+.-]*:")
+
+
+@dataclass(frozen=True)
+class Link:
+    line: int
+    column: int
+    target: str
+
+
+@dataclass
+class Document:
+    rel: str
+    # Site URL, or None when the file is not published as a page.
+    url: Optional[str]
+    anchors: set[str] = field(default_factory=set)
+    links: list[Link] = field(default_factory=list)
+
+
+def gfm_header_id(text: str, counter: dict[str, int]) -> str:
+    """kramdown-parser-gfm's ``generate_gfm_header_id``: keep word characters, '-' and blanks."""
+    kept = []
+    for ch in text.lower():
+        if ch.isalnum() or ch in "_- \t" or unicodedata.category(ch) in ("Mn", "Mc", "Me", "Pc"):
+            kept.append(ch)
+    result = "".join(kept).replace(" ", "-").replace("\t", "-")
+    counter[result] = counter.get(result, -1) + 1
+    return f"{result}-{counter[result]}" if counter[result] > 0 else result
+
+
+def split_front_matter(text: str) -> tuple[dict[str, Any], list[str], int]:
+    """(front matter, body lines, number of lines before the body)."""
+    lines = text.splitlines()
+    if not lines or lines[0].rstrip() != "---":
+        return {}, lines, 0
+    for i in range(1, len(lines)):
+        if lines[i].rstrip() in ("---", "..."):
+            try:
+                data = yaml.safe_load("\n".join(lines[1:i]))
+            except yaml.YAMLError:
+                data = None
+            return (data if isinstance(data, dict) else {}), lines[i + 1 :], i + 1
+    return {}, lines, 0
+
+
+def parse_markdown(rel: str, text: str) -> tuple[dict[str, Any], Document]:
+    """Front matter, plus a Document with the anchors and links of ``text`` (URL unset)."""
+    front_matter, lines, offset = split_front_matter(text)
+    doc = Document(rel=rel, url=None)
+    counter: dict[str, int] = {}
+    fence: Optional[str] = None
+    previous = ""
+    for lineno, line in enumerate(lines, start=offset + 1):
+        match = FENCE_RE.match(line)
+        if fence is not None:
+            if match and match.group(1)[0] == fence[0] and len(match.group(1)) >= len(fence) and not line[match.end() :].strip():
+                fence = None
+            previous = ""
+            continue
+        if match:
+            fence = match.group(1)
+            previous = ""
+            continue
+
+        heading = ATX_RE.match(line)
+        if heading:
+            contents = ATX_CLOSING_RE.sub("", heading.group(2) or "")
+            explicit = HEADER_ID_RE.search(contents)
+            doc.anchors.add(explicit.group(1) if explicit else gfm_header_id(contents.strip(), counter))
+        elif SETEXT_RE.match(line) and previous:
+            explicit = HEADER_ID_RE.search(previous)
+            doc.anchors.add(explicit.group(1) if explicit else gfm_header_id(previous.strip(), counter))
+        previous = "" if heading or NOT_PARAGRAPH_RE.match(line) else line
+
+        code_free = CODE_SPAN_RE.sub(lambda m: " " * len(m.group(0)), line)
+        doc.anchors.update(IAL_ID_RE.findall(code_free))
+        doc.anchors.update(a or b for a, b in HTML_ID_RE.findall(code_free))
+        footnote = FOOTNOTE_DEF_RE.match(code_free)
+        if footnote:
+            doc.anchors.add(f"fn:{footnote.group(1)}")
+        doc.anchors.update(f"fnref:{label}" for label in FOOTNOTE_REF_RE.findall(code_free))
+
+        for link in INLINE_LINK_RE.finditer(code_free):
+            doc.links.append(Link(lineno, link.start(1) + 1, link.group(1)))
+        reference = REFERENCE_DEF_RE.match(code_free)
+        if reference:
+            doc.links.append(Link(lineno, reference.start(1) + 1, reference.group(1)))
+    return front_matter, doc
+
+
+class SiteIndex:
+    """Every repository file, the published site URLs, and the Markdown documents with their anchors."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        config = self._load_config()
+        self.exclude = [str(entry) for entry in config.get("exclude") or []]
+        self.include = [str(entry) for entry in config.get("include") or []]
+        self.files: set[str] = set()
+        self.dirs: set[str] = {""}
+        self.documents: dict[str, Document] = {}
+        # site URL -> source path
+        self.urls: dict[str, str] = {}
+        self.layout_anchors: set[str] = set()
+
+        top = os.fspath(root)
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames[:] = [name for name in dirnames if name not in EXCLUDE_DIRS]
+            prefix = os.path.relpath(dirpath, top).replace(os.sep, "/")
+            prefix = "" if prefix == "." else prefix + "/"
+            self.dirs.update(prefix + name for name in dirnames)
+            self.files.update(prefix + name for name in filenames)
+
+        for rel in sorted(self.files):
+            if rel.endswith(".md") and ("/" not in rel or rel.split("/", 1)[0] in SOURCE_DIRS):
+                self._add_markdown(rel)
+            elif self.published(rel):
+                self.urls.setdefault("/" + rel, rel)
+                if posixpath.basename(rel) == "index.html":
+                    self.urls.setdefault("/" + posixpath.dirname(rel) + "/" if "/" in rel else "/", rel)
+            if rel.split("/", 1)[0] in LAYOUT_DIRS and rel.endswith(".html"):
+                text = (root / rel).read_text(encoding="utf-8", errors="replace")
+                self.layout_anchors.update(a or b for a, b in HTML_ID_RE.findall(text) if "{" not in (a or b))
+
+    def _load_config(self) -> dict[str, Any]:
+        path = self.root / CONFIG_PATH.name
+        try:
+            data = yaml.safe_load(path.read_text(encoding="utf-8"))
+        except (OSError, yaml.YAMLError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def published(self, rel: str) -> bool:
+        """Whether Jekyll copies or renders ``rel`` (EntryFilter: special names and ``exclude``)."""
+        if any(fnmatch(rel, entry.rstrip("/")) or rel.startswith(entry.rstrip("/") + "/") for entry in self.include):
+            return True
+        parts = rel.split("/")
+        if any(part[0] in "._#" or part.endswith("~") for part in parts):
+            return False
+        for entry in self.exclude:
+            entry = entry.rstrip("/")
+            if rel == entry or rel.startswith(entry + "/") or fnmatch(rel, entry):
+                return False
+        return True
+
+    def _add_markdown(self, rel: str) -> None:
+        try:
+            text = (self.root / rel).read_bytes().decode("utf-8")
+        except (OSError, UnicodeDecodeError):
+            return
+        front_matter, doc = parse_markdown(rel, text)
+        has_front_matter = text.startswith("---")
+        stem = posixpath.splitext(posixpath.basename(rel))[0]
+        if self.published(rel) and (has_front_matter or stem.upper() not in OPTIONAL_FRONT_MATTER_SKIPPED):
+            permalink = front_matter.get("permalink")
+            if isinstance(permalink, str) and permalink:
+                doc.url = permalink if permalink.startswith("/") else "/" + permalink
+            else:
+                directory = posixpath.dirname(rel)
+                base = f"/{directory}/" if directory else "/"
+                doc.url = base if stem == "index" else f"{base}{stem}/"
+            self.urls.setdefault(doc.url, rel)
+        self.documents[rel] = doc
+
+    def lookup_url(self, url: str) -> Optional[str]:
+        """Source path served at site ``url`` (GitHub Pages also serves ``/x/`` for ``/x``)."""
+        url = url.split("?", 1)[0] or "/"
+        for candidate in (url, url + "/", url + "index.html"):
+            if candidate in self.urls:
+                return self.urls[candidate]
+        return None
+
+    def lookup_file(self, source: str, path: str) -> Optional[str]:
+        """Repository path named by ``path`` relative to ``source`` ('' for the root, None if absent)."""
+        base = "" if path.startswith("/") else posixpath.dirname(source)
+        joined = posixpath.normpath(posixpath.join(base, path.lstrip("/")))
+        if joined.startswith(".."):
+            return None
+        joined = "" if joined == "." else joined
+        return joined if joined in self.files or joined in self.dirs else None
+
+
+def check_link(index: SiteIndex, doc: Document, link: Link) -> Optional[tuple[str, str]]:
+    """(rule id, message) when ``link`` does not resolve, else None."""
+    target = link.target
+    if target.startswith("<") and target.endswith(">"):
+        target = target[1:-1]
+    liquid = LIQUID_URL_RE.fullmatch(target)
+    if liquid:
+        target = liquid.group(2) + liquid.group(3)
+    elif "{{" in target or "{%" in target or SCHEME_RE.match(target) or target.startswith("//"):
+        return None
+    path, _, fragment = target.partition("#")
+    path = unquote(path.split("?", 1)[0])
+    fragment = unquote(fragment)
+
+    if not path:
+        resolved: Optional[str] = doc.rel
+    elif liquid:
+        resolved = index.lookup_url(path if path.startswith("/") else "/" + path)
+    else:
+        resolved = index.lookup_file(doc.rel, path)
+        if doc.url is not None and (resolved is None or (resolved not in index.files or not index.published(resolved))):
+            # Not a published page or static file: the browser resolves it against the page URL.
+            resolved = index.lookup_url(urljoin(doc.url, path))
+    if resolved is None:
+        return RULE_MISSING_TARGET, f"Broken internal link: {link.target}"
+
+    target_doc = index.documents.get(resolved)
+    if fragment and target_doc is not None:
+        anchors = target_doc.anchors | (index.layout_anchors if target_doc.url is not None else set())
+        if fragment not in anchors:
+            return RULE_MISSING_ANCHOR, f"Broken anchor: {link.target} (no heading or id '{fragment}' in {resolved})"
+    return None
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Check internal Markdown links and anchors against a local index of the site.")
+    add_format_argument(parser)
+    args = parser.parse_args(argv)
+
+    index = SiteIndex(ROOT)
+    writer = open_writer(args.format, "check-internal-links")
+    hits = 0
+    checked = 0
+    try:
+        for rel, doc in index.documents.items():
+            for link in doc.links:
+                checked += 1
+                problem = check_link(index, doc, link)
+                if problem is None:
+                    continue
+                rule_id, message = problem
+                hits += 1
+                if writer is not None:
+                    writer.write(Finding(rule_id=rule_id, message=message, file=rel, line=link.line, column=link.column))
+                    continue
+                if hits == 1:
+                    print("❌ Broken internal links found:", file=sys.stderr)
+                print(f"- {rel}:{link.line}: {message}", file=sys.stderr)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if hits:
+        return 1
+    if writer is None:
+        print(f"✅ No broken internal links found ({checked} links in {len(index.documents)} files).")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
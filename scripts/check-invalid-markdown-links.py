@@ -7,63 +7,40 @@ import re
 import sys
 from pathlib import Path
 
+import markdown_scan
+from markdown_scan import LineRule
+
 
 ROOT = Path(__file__).resolve().parent.parent
 
-EXCLUDE_DIRS = {
-    ".git",
-    "_site",
-    "vendor",
-    "node_modules",
-    "book-formatter",
-    "qa-reports",
-}
+RULE_ID = "markdown-link/fullwidth-paren"
+MESSAGE = "Invalid markdown link (full-width '）' inside link URL parentheses)"
 
-FENCE_RE = re.compile(r"^\s*```")
 INVALID_LINK_RE = re.compile(r"\]\([^)\n]*）")
 
-
-def iter_markdown_files() -> list[Path]:
-    files: list[Path] = []
-    for p in ROOT.rglob("*.md"):
-        if any(part in EXCLUDE_DIRS for part in p.parts):
-            continue
-        if p.is_file():
-            files.append(p)
-    return sorted(files)
-
-
-def main() -> int:
-    hits: list[tuple[Path, int, str]] = []
-
-    for file_path in iter_markdown_files():
-        try:
-            text = file_path.read_text(encoding="utf-8")
-        except UnicodeDecodeError:
-            continue
-
-        in_fence = False
-        for lineno, line in enumerate(text.splitlines(), start=1):
-            if FENCE_RE.match(line):
-                in_fence = not in_fence
-                continue
-            if in_fence:
-                continue
-
-            if INVALID_LINK_RE.search(line):
-                hits.append((file_path, lineno, line))
-
-    if not hits:
-        print("✅ No invalid markdown links found.")
-        return 0
-
-    print("❌ Invalid markdown links found (full-width '）' inside link URL parentheses):", file=sys.stderr)
-    for file_path, lineno, line in hits:
-        rel = file_path.relative_to(ROOT)
-        print(f"- {rel}:{lineno}: {line}", file=sys.stderr)
-    return 1
+RULE = markdown_scan.register(
+    LineRule(
+        rule_id=RULE_ID,
+        pattern=INVALID_LINK_RE,
+        applies_to=lambda rel: rel.endswith(".md"),
+        message=lambda match, line: f"{MESSAGE}: {line.strip()}",
+        header="❌ Invalid markdown links found (full-width '）' inside link URL parentheses):",
+        ok_message="✅ No invalid markdown links found.",
+        skip_fences=True,
+        bytes_literals=("）".encode("utf-8"),),
+    )
+)
+
+
+def main(argv: list[str]) -> int:
+    return markdown_scan.main(
+        argv,
+        [RULE],
+        ROOT,
+        tool="check-invalid-markdown-links",
+        description="Check Markdown files for links broken by a full-width closing parenthesis.",
+    )
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
-
+    raise SystemExit(main(sys.argv[1:]))
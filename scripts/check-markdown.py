@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Run every registered Markdown line check in one pass over the repository.
+
+Loads the rule modules listed in ``RULE_SCRIPTS`` (each registers its rules with
+``markdown_scan``) and scans the tree once for all of them: one walk, one read per
+file. Equivalent to running each listed script on its own, with the same output per
+rule.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import markdown_scan
+from script_loader import load_script_module
+
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+ROOT = SCRIPTS_DIR.parent
+
+RULE_SCRIPTS = [
+    "check-placeholders.py",
+    "check-invalid-markdown-links.py",
+]
+
+
+def load_rules() -> list[markdown_scan.LineRule]:
+    for script in RULE_SCRIPTS:
+        load_script_module(f"markdown_rules_{Path(script).stem.replace('-', '_')}", SCRIPTS_DIR / script)
+    return markdown_scan.registered()
+
+
+def main(argv: list[str]) -> int:
+    return markdown_scan.main(
+        argv,
+        load_rules(),
+        ROOT,
+        tool="check-markdown",
+        description="Run all Markdown line checks (placeholders, invalid links) in a single pass.",
+    )
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Check the transfer weight of every page of the Jekyll build against budgets.
+
+For each HTML page under the site root the page is summarized once (with the
+``check-rendered-html.py`` engine) and its weight computed: the HTML plus every
+stylesheet, script, icon and image it references, each counted once, uncompressed
+and gzip-compressed, the number of requests, and the largest assets. References are
+resolved the way the site is served (``baseurl`` from ``_config.yml``); external ones
+count as requests of unknown size, and missing ones as requests of no size.
+
+Pages over the budgets in ``scripts/page-weight-budgets.yml`` fail the check.
+``--report`` writes every page's weight as JSON.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import sys
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any, Optional
+
+try:
+    import yaml
+except ImportError:
+    print("❌ Missing dependency: pyyaml", file=sys.stderr)
+    print("   Install: python3 -m pip install -r scripts/requirements-qa.txt", file=sys.stderr)
+    raise SystemExit(2)
+
+from qa_findings import Finding, add_format_argument, open_writer
+from script_loader import load_script_module
+
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+ROOT = SCRIPTS_DIR.parent
+DEFAULT_BUDGETS = SCRIPTS_DIR / "page-weight-budgets.yml"
+
+# Level of the on-the-fly compression of common web servers.
+GZIP_LEVEL = 6
+
+ASSET_KINDS = ("image", "stylesheet", "script", "icon")
+BUDGET_KEYS = {"max_bytes", "max_gzip_bytes", "max_requests", "max_asset_bytes"}
+
+RULE_BYTES = "page-weight/bytes"
+RULE_GZIP_BYTES = "page-weight/gzip-bytes"
+RULE_REQUESTS = "page-weight/requests"
+RULE_ASSET_BYTES = "page-weight/asset-bytes"
+
+
+rendered = load_script_module("check_rendered_html", SCRIPTS_DIR / "check-rendered-html.py")
+
+
+@dataclass(frozen=True)
+class Asset:
+    kind: str
+    # Path relative to the site root, or the URL as written for external and missing assets.
+    name: str
+    # None for external assets.
+    size: Optional[int]
+    gzip_size: Optional[int]
+
+
+@dataclass
+class PageWeight:
+    page: str
+    html: Asset
+    assets: list[Asset] = field(default_factory=list)
+    external: list[str] = field(default_factory=list)
+    missing: list[str] = field(default_factory=list)
+
+    @property
+    def requests(self) -> int:
+        return 1 + len(self.assets) + len(self.external) + len(self.missing)
+
+    @property
+    def size(self) -> int:
+        return self.html.size + sum(asset.size for asset in self.assets)  # type: ignore[operator]
+
+    @property
+    def gzip_size(self) -> int:
+        return self.html.gzip_size + sum(asset.gzip_size for asset in self.assets)  # type: ignore[operator]
+
+    def largest(self, count: int) -> list[Asset]:
+        return sorted(self.assets, key=lambda asset: (-(asset.size or 0), asset.name))[:count]
+
+
+class SizeCache:
+    """Uncompressed and gzip sizes of site files, each file read and compressed once."""
+
+    def __init__(self, site_root: Path) -> None:
+        self.site_root = site_root
+        self.sizes: dict[str, tuple[int, int]] = {}
+
+    def get(self, relative: str) -> tuple[int, int]:
+        sizes = self.sizes.get(relative)
+        if sizes is None:
+            data = (self.site_root / relative).read_bytes()
+            sizes = self.sizes[relative] = (len(data), len(gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)))
+        return sizes
+
+
+def weigh_page(site_root: Path, relative: str, site: Any, cache: SizeCache) -> PageWeight:
+    summary = rendered.summarize(site_root / relative)
+    weight = PageWeight(relative, Asset("html", relative, *cache.get(relative)))
+    seen: set[str] = set()
+    for kind, url in [*summary.resources, *(("image", src) for src in summary.srcs)]:
+        if url in seen:
+            continue
+        seen.add(url)
+        target = site.resolve(relative, url)
+        if target == "":
+            if not url.startswith(("#", "data:")):
+                weight.external.append(url)
+        elif target is None:
+            weight.missing.append(url)
+        elif target not in {asset.name for asset in weight.assets}:
+            weight.assets.append(Asset(kind, target, *cache.get(target)))
+    return weight
+
+
+class BudgetError(ValueError):
+    pass
+
+
+def _merge(budget: dict[str, Any], override: dict[str, Any]) -> dict[str, Any]:
+    merged = {**budget, **override}
+    if "max_asset_bytes" in override:
+        merged["max_asset_bytes"] = {**budget.get("max_asset_bytes", {}), **override["max_asset_bytes"]}
+    return merged
+
+
+def load_budgets(path: Path) -> tuple[dict[str, Any], list[tuple[str, dict[str, Any]]]]:
+    """(default budget, [(page glob, override)]) from the budgets data file."""
+    try:
+        data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    except (OSError, yaml.YAMLError) as exc:
+        raise BudgetError(f"cannot read {path}: {exc}") from exc
+    if not isinstance(data, dict) or set(data) - {"default", "pages"}:
+        raise BudgetError(f"{path}: expected a mapping with 'default' and 'pages'")
+    budgets = [("default", data.get("default") or {}), *((str(k), v) for k, v in (data.get("pages") or {}).items())]
+    for where, budget in budgets:
+        if not isinstance(budget, dict) or set(budget) - BUDGET_KEYS:
+            raise BudgetError(f"{path}: budget for {where} must be a mapping with keys among {sorted(BUDGET_KEYS)}")
+        for key, value in budget.items():
+            limits = value if key == "max_asset_bytes" else {key: value}
+            if not isinstance(limits, dict) or not all(isinstance(v, int) for v in limits.values()):
+                raise BudgetError(f"{path}: {key} for {where} must be a number of bytes (or kind -> bytes)")
+            if key == "max_asset_bytes" and set(limits) - set(ASSET_KINDS):
+                raise BudgetError(f"{path}: max_asset_bytes for {where} has kinds other than {list(ASSET_KINDS)}")
+    return budgets[0][1], budgets[1:]
+
+
+def budget_for(page: str, default: dict[str, Any], overrides: list[tuple[str, dict[str, Any]]]) -> dict[str, Any]:
+    budget = default
+    for glob, override in overrides:
+        if fnmatch(page, glob):
+            budget = _merge(budget, override)
+    return budget
+
+
+def over_budget(weight: PageWeight, budget: dict[str, Any]) -> list[tuple[str, str]]:
+    """(rule id, message) for each budget ``weight`` exceeds."""
+    failures = []
+    if "max_bytes" in budget and weight.size > budget["max_bytes"]:
+        failures.append((RULE_BYTES, f"{weight.size:,} bytes exceeds the budget of {budget['max_bytes']:,}"))
+    if "max_gzip_bytes" in budget and weight.gzip_size > budget["max_gzip_bytes"]:
+        failures.append(
+            (RULE_GZIP_BYTES, f"{weight.gzip_size:,} gzip bytes exceeds the budget of {budget['max_gzip_bytes']:,}")
+        )
+    if "max_requests" in budget and weight.requests > budget["max_requests"]:
+        failures.append((RULE_REQUESTS, f"{weight.requests} requests exceeds the budget of {budget['max_requests']}"))
+    limits = budget.get("max_asset_bytes", {})
+    for asset in weight.assets:
+        limit = limits.get(asset.kind)
+        if limit is not None and asset.size is not None and asset.size > limit:
+            failures.append(
+                (RULE_ASSET_BYTES, f"{asset.kind} {asset.name} is {asset.size:,} bytes, over the budget of {limit:,}")
+            )
+    return failures
+
+
+def _kib(size: int) -> str:
+    return f"{size / 1024:.1f} KiB"
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Check the transfer weight of rendered pages against budgets.")
+    parser.add_argument("--site-root", default="_site", help="Path to Jekyll build output (default: _site)")
+    parser.add_argument(
+        "--budgets",
+        type=Path,
+        default=DEFAULT_BUDGETS,
+        help=f"Budgets data file (default: {DEFAULT_BUDGETS.relative_to(ROOT).as_posix()})",
+    )
+    parser.add_argument(
+        "--baseurl",
+        default=None,
+        help="URL path the site is served under, for resolving absolute URLs (default: baseurl in _config.yml)",
+    )
+    parser.add_argument("--top", type=int, default=3, help="Largest assets listed per page (default: 3)")
+    parser.add_argument("--report", type=Path, default=None, help="Write every page's weight as JSON to this path")
+    add_format_argument(parser)
+    args = parser.parse_args(argv)
+
+    try:
+        default, overrides = load_budgets(args.budgets)
+    except BudgetError as exc:
+        print(f"❌ {exc}", file=sys.stderr)
+        return 2
+
+    site_root = Path(args.site_root)
+    if not site_root.is_dir():
+        print(f"❌ Site root not found: {site_root}", file=sys.stderr)
+        return 2
+    site = rendered.Site.scan(site_root, args.baseurl if args.baseurl is not None else rendered.default_baseurl())
+    cache = SizeCache(site_root)
+    pages = sorted((name for name in site.files if name.endswith(".html")), key=lambda name: name.split("/"))
+
+    writer = open_writer(args.format, "check-page-weight")
+    report: dict[str, Any] = {}
+    errors = 0
+    try:
+        for page in pages:
+            weight = weigh_page(site_root, page, site, cache)
+            report[page] = {
+                "bytes": weight.size,
+                "gzip_bytes": weight.gzip_size,
+                "requests": weight.requests,
+                "largest": [
+                    {"kind": asset.kind, "file": asset.name, "bytes": asset.size, "gzip_bytes": asset.gzip_size}
+                    for asset in weight.largest(args.top)
+                ],
+                "external": weight.external,
+                "missing": weight.missing,
+            }
+            if writer is None:
+                largest = ", ".join(f"{asset.name} ({_kib(asset.size or 0)})" for asset in weight.largest(args.top))
+                print(
+                    f"{page}: {_kib(weight.size)} ({_kib(weight.gzip_size)} gzip), {weight.requests} requests"
+                    + (f"; largest: {largest}" if largest else "")
+                )
+            for rule_id, message in over_budget(weight, budget_for(page, default, overrides)):
+                errors += 1
+                if writer is not None:
+                    writer.write(Finding(rule_id=rule_id, message=message, file=page))
+                else:
+                    print(f"❌ {page}: {message}", file=sys.stderr)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if args.report is not None:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        args.report.write_text(json.dumps({"pages": report}, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+    if errors:
+        return 1
+    if writer is None:
+        print(f"✅ {len(pages)} pages within the page-weight budgets.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -3,100 +3,112 @@
 
 from __future__ import annotations
 
+import hashlib
 import re
 import sys
 from pathlib import Path
-from typing import Iterable
+
+import markdown_scan
+from markdown_scan import LineRule
 
 
 ROOT = Path(__file__).resolve().parent.parent
 
-TARGETS = [
-    ROOT / "README.md",
-    ROOT / "CHANGELOG.md",
-    ROOT / "CONTRIBUTING.md",
-    ROOT / "UPDATE_POLICY.md",
-    ROOT / "AI_USAGE_POLICY.md",
-    ROOT / "index.md",
-    ROOT / "GLOSSARY.md",
-]
-
-GLOBS = [
-    ROOT / "chapters/**/*.md",
-    ROOT / "appendices/**/*.md",
-    ROOT / "docs/**/*.md",
-    ROOT / "docs/examples/**/*.*",
-]
-
-ALLOWED_EXAMPLE_EXTS = {".yml", ".yaml", ".json"}
+# Top-level files checked in addition to the directories below (paths relative to ROOT).
+TARGETS = {
+    "README.md",
+    "CHANGELOG.md",
+    "CONTRIBUTING.md",
+    "UPDATE_POLICY.md",
+    "AI_USAGE_POLICY.md",
+    "index.md",
+    "GLOSSARY.md",
+}
+
+# Every Markdown file below these directories.
+MARKDOWN_DIRS = ("chapters/", "appendices/", "docs/")
+
+# Markdown and data files below the examples directory.
+EXAMPLE_DIR = "docs/examples/"
+ALLOWED_EXAMPLE_EXTS = {".md", ".yml", ".yaml", ".json"}
 
 ALLOWLIST_FILE = ROOT / ".book-formatter/placeholder-allowlist.txt"
 
+RULE_ID = "placeholder"
+
 PATTERN = re.compile(
     r"\b(?:TBD|TODO|FIXME|WIP)\b|執筆中|準備中|未作成|後続タスク",
     flags=re.IGNORECASE,
 )
 
+# PATTERN without word boundaries, for lower-cased text. IGNORECASE also folds "İ"
+# (lower-cased to "i" + U+0307) and "ı" onto "i".
+PREFILTER = re.compile("tbd|todo|f(?:i\u0307?|ı)xme|w(?:i\u0307?|ı)p|執筆中|準備中|未作成|後続タスク")
+
+# The same words as byte strings, for the ASCII-lower-cased raw bytes (--jobs); "İ" and
+# "ı" are not ASCII, so their spellings are listed.
+BYTES_LITERALS = tuple(
+    word.encode("utf-8")
+    for word in ("tbd", "todo", "fixme", "fİxme", "fıxme", "wip", "wİp", "wıp", "執筆中", "準備中", "未作成", "後続タスク")
+)
+
 
-def load_allowlist() -> set[Path]:
+def load_allowlist() -> set[str]:
+    """Allowlisted files as POSIX paths relative to ROOT."""
     if not ALLOWLIST_FILE.exists():
         return set()
 
-    allow: set[Path] = set()
+    allow: set[str] = set()
     for raw in ALLOWLIST_FILE.read_text(encoding="utf-8").splitlines():
         line = raw.strip()
         if line == "" or line.startswith("#"):
             continue
-        allow.add((ROOT / line).resolve())
-    return allow
-
-
-def iter_files() -> Iterable[Path]:
-    for p in TARGETS:
-        if p.exists():
-            yield p
-
-    for g in GLOBS:
-        # Path.glob accepts "**" patterns relative to the base path,
-        # but we keep absolute roots for clarity.
-        for p in ROOT.glob(str(g.relative_to(ROOT))):
-            if not p.is_file():
-                continue
-            if p.suffix.lower() in (".md",):
-                yield p
-                continue
-            if p.suffix.lower() in ALLOWED_EXAMPLE_EXTS:
-                yield p
-
-
-def main() -> int:
-    allowlist = load_allowlist()
-
-    hits: list[tuple[Path, int, str]] = []
-    for file_path in sorted({p.resolve() for p in iter_files()}):
-        if file_path in allowlist:
-            continue
-
         try:
-            text = file_path.read_text(encoding="utf-8")
-        except UnicodeDecodeError:
-            # Treat non-UTF-8 files as out of scope for placeholder checks.
+            allow.add((ROOT / line).resolve().relative_to(ROOT).as_posix())
+        except ValueError:
             continue
+    return allow
 
-        for lineno, line in enumerate(text.splitlines(), start=1):
-            if PATTERN.search(line):
-                hits.append((file_path, lineno, line))
 
-    if not hits:
-        print("✅ No placeholders found.")
-        return 0
+_ALLOWLIST = load_allowlist()
+_ALLOWLIST_DIGEST = hashlib.sha256(ALLOWLIST_FILE.read_bytes()).hexdigest() if ALLOWLIST_FILE.exists() else ""
+
+
+def applies_to(rel: str) -> bool:
+    if rel in _ALLOWLIST:
+        return False
+    if rel in TARGETS:
+        return True
+    if rel.startswith(EXAMPLE_DIR):
+        return Path(rel).suffix.lower() in ALLOWED_EXAMPLE_EXTS
+    return rel.endswith(".md") and rel.startswith(MARKDOWN_DIRS)
+
+
+RULE = markdown_scan.register(
+    LineRule(
+        rule_id=RULE_ID,
+        pattern=PATTERN,
+        applies_to=applies_to,
+        message=lambda match, line: f"Placeholder '{match.group(0)}' found: {line.strip()}",
+        header="❌ Placeholders found:",
+        ok_message="✅ No placeholders found.",
+        lowercase_prefilter=PREFILTER,
+        bytes_literals=BYTES_LITERALS,
+        bytes_ignorecase=True,
+        fingerprint=_ALLOWLIST_DIGEST,
+    )
+)
+
 
-    print("❌ Placeholders found:", file=sys.stderr)
-    for file_path, lineno, line in hits:
-        rel = file_path.relative_to(ROOT)
-        print(f"- {rel}:{lineno}: {line}", file=sys.stderr)
-    return 1
+def main(argv: list[str]) -> int:
+    return markdown_scan.main(
+        argv,
+        [RULE],
+        ROOT,
+        tool="check-placeholders",
+        description="Check Markdown and example files for leftover placeholders.",
+    )
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(main(sys.argv[1:]))
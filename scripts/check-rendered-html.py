@@ -1,165 +1,608 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+"""Check rendered HTML regressions on critical pages of the Jekyll build.
+
+Each page is read once and tokenized once, in a single left-to-right pass, into a
+``PageSummary`` (tables with their header cells, class counts, link hrefs and image
+srcs, stylesheets and scripts, Mermaid blocks); every check of the page queries that
+summary.
+
+The checks are data, in ``scripts/rendered-html-checks.yml``: per-page conditions
+(tables, headers, classes, links, images) and, with ``--crawl``, site-wide checks
+run on every page of the site on a process pool (internal links and images resolve,
+Mermaid diagrams have an SVG fallback, tables are not empty, and, with
+``--mermaid-prerendered``, diagrams were prerendered to inline SVG in a light and a
+dark variant by ``prerender-mermaid.py``). With ``--precompressed`` the crawl also checks that every
+``.gz`` sibling of an HTML, CSS, JS, SVG or JSON file, as written by
+``precompress-site.py``, decompresses to its source; other ``.gz`` files (archives
+published as such) are not checked.
+"""
+
 from __future__ import annotations
 
 import argparse
+import dataclasses
+import gzip
+import html
+import os
+import posixpath
 import re
 import sys
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
 from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+from urllib.parse import unquote
+
+try:
+    import yaml
+except ImportError:
+    print("❌ Missing dependency: pyyaml", file=sys.stderr)
+    print("   Install: python3 -m pip install -r scripts/requirements-qa.txt", file=sys.stderr)
+    raise SystemExit(2)
+
+from qa_findings import Finding, add_format_argument, open_writer
+
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CONFIG = ROOT / "scripts/rendered-html-checks.yml"
+JEKYLL_CONFIG = ROOT / "_config.yml"
+
+RULE_MISSING_PAGE = "rendered-html/missing-page"
+RULE_MISSING_CONTENT = "rendered-html/missing-content"
+RULE_BROKEN_LINK = "rendered-html/broken-link"
+RULE_BROKEN_IMAGE = "rendered-html/broken-image"
+RULE_MERMAID_FALLBACK = "rendered-html/mermaid-fallback"
+RULE_EMPTY_TABLE = "rendered-html/empty-table"
+RULE_MERMAID_PRERENDERED = "rendered-html/mermaid-prerendered"
+RULE_PRECOMPRESSED = "rendered-html/precompressed"
+
+SCHEME_RE = re.compile(r"^[A-Za-z][A-Za-z0-9+.-]*:")
+SVG_START_RE = re.compile(r"\s*<svg\b", re.IGNORECASE)
+
+# Classes of Mermaid sources left for the runtime renderer: a .mermaid-live source and a
+# fenced block.
+MERMAID_SOURCE_CLASSES = ("mermaid", "language-mermaid")
+MERMAID_INIT_SCRIPT = "/mermaid-init.js"
+# Classes of the light and dark variant written for every prerendered diagram.
+MERMAID_THEME_CLASSES = ("mermaid-static-light", "mermaid-static-dark")
+
+# Types of the files precompress-site.py writes a .gz sibling for.
+PRECOMPRESSED_EXTENSIONS = (".html", ".css", ".js", ".svg", ".json")
+
+# Pages per task handed to a worker process with --crawl.
+CRAWL_CHUNK_SIZE = 16
+
+
+@dataclass
+class Table:
+    # Header cell texts, case-folded and stripped.
+    headers: list[str] = field(default_factory=list)
+    # Number of <td> cells.
+    cells: int = 0
+
+
+@dataclass
+class PageSummary:
+    # Tables in document order (nested tables included).
+    tables: list[Table] = field(default_factory=list)
+    # Number of elements carrying each (case-folded) class.
+    classes: Counter[str] = field(default_factory=Counter)
+    hrefs: list[str] = field(default_factory=list)
+    srcs: list[str] = field(default_factory=list)
+    # Other subresources the page loads, as (kind, URL): "stylesheet" and "icon" <link>s,
+    # and "script" <script src>s, in document order.
+    resources: list[tuple[str, str]] = field(default_factory=list)
+    # .mermaid-live and .mermaid-fallback elements in document order, as ("live", None)
+    # or ("fallback", src of the first image after it, if any).
+    mermaid: list[tuple[str, Optional[str]]] = field(default_factory=list)
+    # For each .mermaid-static element (a prerendered diagram), whether its content
+    # starts with an inline <svg>.
+    static_diagrams: list[bool] = field(default_factory=list)
+
+    def class_count(self, class_name: str) -> int:
+        return self.classes[class_name.casefold()]
+
+    def has_table_headers(self, headers: list[str]) -> bool:
+        """Whether one table has a ``<th>`` whose text is each of ``headers`` (ignoring case and surrounding space)."""
+        wanted = [header.casefold() for header in headers]
+        return any(all(header in table.headers for header in wanted) for table in self.tables)
+
+    def has_link_fragment(self, fragment: str) -> bool:
+        return any(fragment in href for href in self.hrefs)
+
+    def has_img_fragment(self, fragment: str) -> bool:
+        return any(fragment in src for src in self.srcs)
+
+
+def _nocase(words: str) -> str:
+    """``words`` (letters and ``|``) as a pattern matching every letter in either case."""
+    return re.sub(r"[A-Za-z]", lambda m: f"[{m[0].upper()}{m[0].lower()}]", words)
+
+
+# The tokens a summary needs, in one left-to-right scan: comments, <script>/<style>
+# elements (whole, so markup inside them is skipped), the tags the summary reads, and
+# any other start tag with a class attribute. Other markup is skipped by the regex
+# engine without a Python-level step per tag. The two most common tags in a page, an
+# <a> whose only attribute is a plain double-quoted href and any other tag whose only
+# attribute is a plain double-quoted class, have their value captured here so they
+# need no attribute lookup at all. Names are matched with _nocase() rather than
+# re.IGNORECASE, which makes the whole scan about twice as slow.
+_SCRIPT, _STYLE, _CLASS = _nocase("script"), _nocase("style"), _nocase("class")
+TOKEN_RE = re.compile(
+    r"<(?:!--.*?--\s*>"
+    rf"|{_SCRIPT}\b([^>]*)>.*?</{_SCRIPT}\s*>"
+    rf"|{_STYLE}\b([^>]*)>.*?</{_STYLE}\s*>"
+    rf"|/({_nocase('table|th')})\s*>"
+    rf'|{_nocase("a")}\s+{_nocase("href")}="([^"&]*)"\s*>'
+    rf"|({_nocase('table|th|a|img|link')})\b([^>]*)>"
+    rf'|[A-Za-z][^\s/>]*\s(?:\s*{_CLASS}="([^"&]*)"\s*>|([^>]*{_CLASS}[^>]*)>))',
+    re.DOTALL,
+)
+TAG_RE = re.compile(r"<[^>]*>")
+
+
+def _attribute_re(name: str) -> re.Pattern[str]:
+    # One group per quoting style; exactly one of them takes part in a match.
+    return re.compile(rf"""(?:^|\s){name}\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+))""", re.IGNORECASE)
+
+
+CLASS_ATTR_RE = _attribute_re("class")
+HREF_ATTR_RE = _attribute_re("href")
+SRC_ATTR_RE = _attribute_re("src")
+REL_ATTR_RE = _attribute_re("rel")
+
+
+def _attribute(pattern: re.Pattern[str], attrs: str) -> Optional[str]:
+    """Value of the first attribute ``pattern`` matches in a tag's attribute text (entities decoded)."""
+    match = pattern.search(attrs)
+    if match is None:
+        return None
+    value = match[match.lastindex]
+    return html.unescape(value) if "&" in value else value
+
+
+def _count_cells(text: str, table: Table, start: int, end: int) -> None:
+    table.cells = sum(text.count(prefix, start, end) for prefix in ("<td>", "<td ", "<TD>", "<TD "))
+
+
+def summarize_html(text: str) -> PageSummary:
+    """Summarize a page in one pass over ``TOKEN_RE``.
+
+    A ``<th>`` ends at ``</th>``, the next ``<th>``, or the end of its table; its text
+    is the content with tags stripped and entities decoded. A table's cells are the
+    ``<td>`` tags up to its end (those of nested tables included). Only the attributes
+    a tag can contribute are looked up: its class, and href/src/rel on the tags that
+    link to something.
+    """
+    summary = PageSummary()
+    # Case-folded class attribute values; split into classes once per distinct value.
+    class_values: Counter[str] = Counter()
+    # Open tables with the offset they start at, innermost last.
+    open_tables: list[tuple[Table, int]] = []
+    # Offset where the open <th>'s content starts, if any.
+    header_start: Optional[int] = None
+    # Index in ``summary.mermaid`` of the .mermaid-fallback waiting for its first image, if any.
+    fallback: Optional[int] = None
+    for token in TOKEN_RE.finditer(text):
+        # The last group taking part identifies the branch: 1 <script>, 2 <style>, 3 end
+        # tag, 4 plain <a href>, 6 table/th/a/img/link start tag, 7 plain class-only
+        # tag, 8 other start tag with a class; None for a comment.
+        group = token.lastindex
+        if group is None:
+            continue
+        if group == 4:
+            summary.hrefs.append(token[4])
+            continue
+        name = ""
+        if group == 7:
+            class_value: Optional[str] = token[7]
+        else:
+            if group == 8:
+                attrs = token[8]
+            elif group <= 2:
+                name = "script" if group == 1 else "style"
+                attrs = token[group]
+            else:
+                if group == 6:
+                    name = token[5].lower()
+                if group == 3 or name == "table" or name == "th":
+                    if header_start is not None:
+                        header = TAG_RE.sub("", text[header_start : token.start()])
+                        open_tables[-1][0].headers.append(html.unescape(header).strip().casefold())
+                        header_start = None
+                    if group == 3:
+                        if token[3].lower() == "table" and open_tables:
+                            _count_cells(text, *open_tables.pop(), token.start())
+                        continue
+                    if name == "table":
+                        table = Table()
+                        summary.tables.append(table)
+                        open_tables.append((table, token.end()))
+                    elif open_tables:
+                        header_start = token.end()
+                attrs = token[6]
+            if "=" not in attrs:
+                continue
+            class_value = _attribute(CLASS_ATTR_RE, attrs)
+
+        if class_value is not None:
+            class_value = class_value.casefold()
+            class_values[class_value] += 1
+            if "mermaid-" in class_value:
+                tokens = class_value.split()
+                if "mermaid-live" in tokens:
+                    summary.mermaid.append(("live", None))
+                    fallback = None
+                elif "mermaid-fallback" in tokens:
+                    fallback = len(summary.mermaid)
+                    summary.mermaid.append(("fallback", None))
+                elif "mermaid-static" in tokens:
+                    summary.static_diagrams.append(SVG_START_RE.match(text, token.end()) is not None)
+        if not name:
+            continue
+        if name == "a":
+            href = _attribute(HREF_ATTR_RE, attrs)
+            if href is not None:
+                summary.hrefs.append(href)
+        elif name == "img":
+            src = _attribute(SRC_ATTR_RE, attrs)
+            if src is not None:
+                summary.srcs.append(src)
+                if fallback is not None:
+                    summary.mermaid[fallback] = ("fallback", src)
+                    fallback = None
+        elif name == "link":
+            href = _attribute(HREF_ATTR_RE, attrs)
+            if href is not None:
+                rel = (_attribute(REL_ATTR_RE, attrs) or "").casefold().split()
+                if "stylesheet" in rel:
+                    summary.resources.append(("stylesheet", href))
+                elif "icon" in rel or "apple-touch-icon" in rel:
+                    summary.resources.append(("icon", href))
+        elif name == "script":
+            src = _attribute(SRC_ATTR_RE, attrs)
+            if src is not None:
+                summary.resources.append(("script", src))
+    for table, start in open_tables:
+        _count_cells(text, table, start, len(text))
+    for class_value, count in class_values.items():
+        for class_name in set(class_value.split()):
+            summary.classes[class_name] += count
+    return summary
+
 
+def summarize(path: Path) -> PageSummary:
+    return summarize_html(path.read_text(encoding="utf-8"))
 
-TABLE_RE = re.compile(r"<table\b", re.IGNORECASE)
-TABLE_BLOCK_RE = re.compile(r"<table\b.*?</table>", re.IGNORECASE | re.DOTALL)
-LINK_HREF_RE = re.compile(r"<a\b[^>]*href=[\"']([^\"']+)[\"']", re.IGNORECASE)
-IMG_SRC_RE = re.compile(r"<img\b[^>]*src=[\"']([^\"']+)[\"']", re.IGNORECASE)
-CLASS_ATTR_RE = re.compile(r"class=[\"']([^\"']*)[\"']", re.IGNORECASE)
 
+# Condition of a page check -> (type of its value, whether the summary satisfies it).
+CONDITIONS: dict[str, tuple[type, Callable[[PageSummary, Any], bool]]] = {
+    "min_tables": (int, lambda page, n: len(page.tables) >= n),
+    "table_headers": (list, lambda page, headers: page.has_table_headers(headers)),
+    "min_class": (dict, lambda page, counts: all(page.class_count(name) >= n for name, n in counts.items())),
+    "link_href_contains": (str, lambda page, text: page.has_link_fragment(text)),
+    "img_src_contains": (str, lambda page, text: page.has_img_fragment(text)),
+}
 
-def class_count(html: str, class_name: str) -> int:
-    count = 0
-    target = class_name.casefold()
-    for match in CLASS_ATTR_RE.finditer(html):
-        tokens = match.group(1).split()
-        if any(token.casefold() == target for token in tokens):
-            count += 1
-    return count
+SITE_CHECKS = (
+    "internal-links",
+    "internal-images",
+    "mermaid-fallbacks",
+    "non-empty-tables",
+    "mermaid-prerendered",
+    "precompressed",
+)
 
 
-def has_table(html: str) -> bool:
-    return bool(TABLE_RE.search(html))
+class ConfigError(ValueError):
+    pass
 
 
-def has_table_headers(html: str, headers: list[str]) -> bool:
-    for table_html in TABLE_BLOCK_RE.findall(html):
-        if all(
-            re.search(rf"<th\b[^>]*>\s*{re.escape(header)}\s*</th>", table_html, re.IGNORECASE)
-            for header in headers
-        ):
-            return True
-    return False
+@dataclass(frozen=True)
+class Config:
+    # Page -> [(message, {condition: value})], in file order.
+    pages: dict[str, list[tuple[str, dict[str, Any]]]]
+    site_checks: tuple[str, ...]
+    site_exclude: tuple[str, ...]
 
 
-def has_link_fragment(html: str, fragment: str) -> bool:
-    return any(fragment in href for href in LINK_HREF_RE.findall(html))
+def load_config(path: Path) -> Config:
+    """Read and validate the checks data file."""
+    try:
+        data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    except (OSError, yaml.YAMLError) as exc:
+        raise ConfigError(f"cannot read {path}: {exc}") from exc
+    if not isinstance(data, dict) or set(data) - {"pages", "site"}:
+        raise ConfigError(f"{path}: expected a mapping with 'pages' and 'site'")
 
+    pages: dict[str, list[tuple[str, dict[str, Any]]]] = {}
+    for page, checks in (data.get("pages") or {}).items():
+        if not isinstance(checks, list):
+            raise ConfigError(f"{path}: checks of {page} must be a list")
+        entries = []
+        for check in checks:
+            if not isinstance(check, dict) or not isinstance(check.get("message"), str):
+                raise ConfigError(f"{path}: each check of {page} needs a 'message'")
+            conditions = {key: value for key, value in check.items() if key != "message"}
+            if not conditions:
+                raise ConfigError(f"{path}: check '{check['message']}' of {page} has no condition")
+            for key, value in conditions.items():
+                if key not in CONDITIONS:
+                    raise ConfigError(f"{path}: unknown condition '{key}' in check '{check['message']}' of {page}")
+                if not isinstance(value, CONDITIONS[key][0]):
+                    raise ConfigError(f"{path}: '{key}' in check '{check['message']}' of {page} must be a {CONDITIONS[key][0].__name__}")
+            entries.append((check["message"], conditions))
+        pages[str(page)] = entries
 
-def has_img_fragment(html: str, fragment: str) -> bool:
-    return any(fragment in src for src in IMG_SRC_RE.findall(html))
+    site = data.get("site") or {}
+    if not isinstance(site, dict) or set(site) - {"checks", "exclude"}:
+        raise ConfigError(f"{path}: 'site' must be a mapping with 'checks' and 'exclude'")
+    site_checks = tuple(site.get("checks") or ())
+    unknown = [name for name in site_checks if name not in SITE_CHECKS]
+    if unknown:
+        raise ConfigError(f"{path}: unknown site checks {unknown} (expected any of {list(SITE_CHECKS)})")
+    return Config(pages=pages, site_checks=site_checks, site_exclude=tuple(str(glob) for glob in site.get("exclude") or ()))
 
 
-def main() -> int:
+def page_failures(page: PageSummary, checks: list[tuple[str, dict[str, Any]]]) -> list[str]:
+    """Messages of the checks ``page`` fails."""
+    return [
+        message
+        for message, conditions in checks
+        if not all(CONDITIONS[key][1](page, value) for key, value in conditions.items())
+    ]
+
+
+@dataclass(frozen=True)
+class Site:
+    """The files of a built site, for resolving the URLs its pages use."""
+
+    files: frozenset[str]
+    # URL path prefix the site is served under ('' when served at the root).
+    baseurl: str
+
+    @classmethod
+    def scan(cls, root: Path, baseurl: str) -> Site:
+        top = os.fspath(root)
+        files = set()
+        for dirpath, _, filenames in os.walk(top):
+            prefix = os.path.relpath(dirpath, top).replace(os.sep, "/")
+            prefix = "" if prefix == "." else prefix + "/"
+            files.update(prefix + name for name in filenames)
+        return cls(frozenset(files), baseurl.rstrip("/"))
+
+    def resolve(self, page: str, url: str) -> Optional[str]:
+        """File served for ``url`` on ``page``; '' for external or same-page URLs, None when nothing is served."""
+        if SCHEME_RE.match(url) or url.startswith("//"):
+            return ""
+        path = unquote(url.split("#", 1)[0].split("?", 1)[0])
+        if not path:
+            return ""
+        if path.startswith("/"):
+            if self.baseurl and path != self.baseurl and not path.startswith(self.baseurl + "/"):
+                return None
+            path = path[len(self.baseurl) :] or "/"
+        else:
+            path = posixpath.join("/" + posixpath.dirname(page), path)
+        target = posixpath.normpath(path).lstrip("/")
+        if path.endswith("/") or target in ("", "."):
+            candidates = [posixpath.join(target, "index.html") if target not in ("", ".") else "index.html"]
+        else:
+            # GitHub Pages serves /x for x.html and for x/index.html.
+            candidates = [target, target + ".html", target + "/index.html"]
+        return next((candidate for candidate in candidates if candidate in self.files), None)
+
+
+def site_failures(relative: str, page: PageSummary, site: Site, checks: tuple[str, ...]) -> list[tuple[str, str]]:
+    """(rule id, message) for each site-wide property ``page`` violates."""
+    failures = []
+    # Each distinct URL is reported once per page.
+    if "internal-links" in checks:
+        for href in dict.fromkeys(page.hrefs):
+            if site.resolve(relative, href) is None:
+                failures.append((RULE_BROKEN_LINK, f"broken internal link: {href}"))
+    if "internal-images" in checks:
+        for src in dict.fromkeys(page.srcs):
+            if site.resolve(relative, src) is None:
+                failures.append((RULE_BROKEN_IMAGE, f"broken internal image: {src}"))
+    if "mermaid-fallbacks" in checks:
+        diagram = 0
+        for i, (kind, _) in enumerate(page.mermaid):
+            if kind != "live":
+                continue
+            diagram += 1
+            following = page.mermaid[i + 1] if i + 1 < len(page.mermaid) else None
+            if following is None or following[0] != "fallback":
+                failures.append((RULE_MERMAID_FALLBACK, f"Mermaid diagram {diagram} has no .mermaid-fallback"))
+            elif following[1] is None or not unquote(following[1].split("?", 1)[0]).endswith(".svg"):
+                failures.append((RULE_MERMAID_FALLBACK, f"Mermaid fallback of diagram {diagram} has no SVG image"))
+            elif not site.resolve(relative, following[1]):
+                failures.append((RULE_MERMAID_FALLBACK, f"Mermaid fallback SVG not found: {following[1]}"))
+    if "non-empty-tables" in checks:
+        for i, table in enumerate(page.tables, start=1):
+            if table.cells == 0:
+                failures.append((RULE_EMPTY_TABLE, f"table {i} has no data cells"))
+    if "mermaid-prerendered" in checks:
+        sources = sum(page.class_count(class_name) for class_name in MERMAID_SOURCE_CLASSES)
+        if sources:
+            failures.append((RULE_MERMAID_PRERENDERED, f"{sources} Mermaid source block(s) not prerendered"))
+        for i, has_svg in enumerate(page.static_diagrams, start=1):
+            if not has_svg:
+                failures.append((RULE_MERMAID_PRERENDERED, f"prerendered Mermaid diagram {i} has no inline SVG"))
+        light, dark = (page.class_count(class_name) for class_name in MERMAID_THEME_CLASSES)
+        if light != dark or light + dark != len(page.static_diagrams):
+            failures.append(
+                (
+                    RULE_MERMAID_PRERENDERED,
+                    f"prerendered Mermaid diagrams need one light and one dark variant each "
+                    f"({light} light, {dark} dark of {len(page.static_diagrams)})",
+                )
+            )
+        for kind, url in page.resources:
+            if kind == "script" and url.split("?", 1)[0].endswith(MERMAID_INIT_SCRIPT):
+                failures.append((RULE_MERMAID_PRERENDERED, f"page still loads the Mermaid runtime: {url}"))
+    return failures
+
+
+def is_precompressed(relative: str) -> bool:
+    """Whether ``relative`` is a ``.gz`` sibling written by ``precompress-site.py``."""
+    return relative.endswith(".gz") and relative[: -len(".gz")].endswith(PRECOMPRESSED_EXTENSIONS)
+
+
+def check_precompressed(site_root: Path, relative: str, site: Site) -> list[tuple[str, str]]:
+    """(rule id, message) if the ``.gz`` file ``relative`` does not decompress to its source."""
+    source = relative[: -len(".gz")]
+    if source not in site.files:
+        return [(RULE_PRECOMPRESSED, f"precompressed file has no source: {source}")]
+    try:
+        data = gzip.decompress((site_root / relative).read_bytes())
+    except (OSError, EOFError, zlib.error) as exc:
+        return [(RULE_PRECOMPRESSED, f"precompressed file is not valid gzip: {exc}")]
+    if data != (site_root / source).read_bytes():
+        return [(RULE_PRECOMPRESSED, f"precompressed file does not match its source {source}")]
+    return []
+
+
+def check_page(
+    site_root: Path, relative: str, config: Config, site: Optional[Site]
+) -> list[tuple[str, str]]:
+    """(rule id, message) of every failure on one page: its own checks, plus the site checks with ``site``.
+
+    With the ``precompressed`` site check, ``relative`` may also be a precompressed ``.gz`` sibling.
+    """
+    if site is not None and is_precompressed(relative):
+        return check_precompressed(site_root, relative, site)
+    path = site_root / relative
+    if not path.is_file():
+        return [(RULE_MISSING_PAGE, "rendered file not found")]
+    page = summarize(path)
+    failures = [(RULE_MISSING_CONTENT, message) for message in page_failures(page, config.pages.get(relative, []))]
+    if site is not None and not any(fnmatch(relative, glob) for glob in config.site_exclude):
+        failures.extend(site_failures(relative, page, site, config.site_checks))
+    return failures
+
+
+# Worker process state for --crawl: (site root, config, site).
+_WORKER: Optional[tuple[Path, Config, Site]] = None
+
+
+def _init_worker(site_root: Path, config: Config, site: Site) -> None:
+    global _WORKER
+    _WORKER = (site_root, config, site)
+
+
+def _check_chunk(pages: list[str]) -> list[list[tuple[str, str]]]:
+    assert _WORKER is not None
+    site_root, config, site = _WORKER
+    return [check_page(site_root, relative, config, site) for relative in pages]
+
+
+def crawl(site_root: Path, config: Config, site: Site, jobs: int) -> Iterator[tuple[str, list[tuple[str, str]]]]:
+    """(page, failures) for every HTML page of the site and every configured page, in a fixed order.
+
+    Configured pages come first, in file order, then the other pages in path order,
+    then, with the ``precompressed`` site check, the precompressed ``.gz`` siblings in path order.
+    Pages are checked on ``jobs`` processes.
+    """
+    pages = list(config.pages)
+    pages += sorted((name for name in site.files if name.endswith(".html") and name not in config.pages), key=lambda name: name.split("/"))
+    if "precompressed" in config.site_checks:
+        pages += sorted(filter(is_precompressed, site.files), key=lambda name: name.split("/"))
+    if jobs <= 1:
+        for relative in pages:
+            yield relative, check_page(site_root, relative, config, site)
+        return
+    chunks = [pages[i : i + CRAWL_CHUNK_SIZE] for i in range(0, len(pages), CRAWL_CHUNK_SIZE)]
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(site_root, config, site)) as executor:
+        # map() yields the chunks' results in submission order.
+        for chunk, results in zip(chunks, executor.map(_check_chunk, chunks)):
+            yield from zip(chunk, results)
+
+
+def default_baseurl() -> str:
+    try:
+        config = yaml.safe_load(JEKYLL_CONFIG.read_text(encoding="utf-8")) or {}
+    except (OSError, yaml.YAMLError):
+        return ""
+    baseurl = config.get("baseurl") if isinstance(config, dict) else None
+    return baseurl if isinstance(baseurl, str) else ""
+
+
+def main(argv: list[str]) -> int:
     parser = argparse.ArgumentParser(description="Check rendered HTML regressions for critical pages.")
     parser.add_argument("--site-root", default="_site", help="Path to Jekyll build output (default: _site)")
-    args = parser.parse_args()
+    parser.add_argument(
+        "--config",
+        type=Path,
+        default=DEFAULT_CONFIG,
+        help=f"Checks data file (default: {DEFAULT_CONFIG.relative_to(ROOT).as_posix()})",
+    )
+    parser.add_argument("--crawl", action="store_true", help="Also run the site-wide checks on every page of the site")
+    parser.add_argument("-j", "--jobs", type=int, default=0, help="Worker processes for --crawl (default: CPU count)")
+    parser.add_argument(
+        "--mermaid-prerendered",
+        action="store_true",
+        help="With --crawl, also check that every Mermaid diagram was prerendered to inline SVG (prerender-mermaid.py)",
+    )
+    parser.add_argument(
+        "--precompressed",
+        action="store_true",
+        help="With --crawl, also check that every .gz sibling of a text file decompresses to its source (precompress-site.py)",
+    )
+    parser.add_argument(
+        "--baseurl",
+        default=None,
+        help="URL path the site is served under, for resolving absolute links (default: baseurl in _config.yml)",
+    )
+    add_format_argument(parser)
+    args = parser.parse_args(argv)
+    if args.mermaid_prerendered and not args.crawl:
+        parser.error("--mermaid-prerendered requires --crawl")
+    if args.precompressed and not args.crawl:
+        parser.error("--precompressed requires --crawl")
 
-    site_root = Path(args.site_root)
-    checks = [
-        (
-            Path("chapters/chapter01/index.html"),
-            [
-                ("missing <table> for failure patterns", lambda html: has_table(html)),
-                (
-                    "missing expected headers for failure-pattern table",
-                    lambda html: has_table_headers(html, ["失敗パターン", "典型症状", "予防策（設計成果物）"]),
-                ),
-            ],
-        ),
-        (
-            Path("style/terminology/index.html"),
-            [
-                ("missing <table> for terminology guide", lambda html: has_table(html)),
-                (
-                    "missing expected headers for terminology table",
-                    lambda html: has_table_headers(html, ["English", "日本語", "備考"]),
-                ),
-                (
-                    "missing rendered internal link to /style/notation/",
-                    lambda html: has_link_fragment(html, "/style/notation/"),
-                ),
-            ],
-        ),
-        (
-            Path("appendices/references/index.html"),
-            [
-                ("missing <table> for chapter-to-reference mapping", lambda html: has_table(html)),
-                (
-                    "missing expected headers for references table",
-                    lambda html: has_table_headers(html, ["章", "次に読む候補"]),
-                ),
-            ],
-        ),
-        (
-            Path("appendices/desk-reference/index.html"),
-            [
-                ("missing rendered tables for desk reference", lambda html: len(TABLE_RE.findall(html)) >= 2),
-                (
-                    "missing expected headers for figure index table",
-                    lambda html: has_table_headers(html, ["図版", "場所", "何を確認するときに使うか"]),
-                ),
-                (
-                    "missing expected headers for symptom lookup table",
-                    lambda html: has_table_headers(html, ["症状", "最初に戻る場所", "まず見るもの"]),
-                ),
-            ],
-        ),
-        (
-            Path("index.html"),
-            [
-                ("missing Mermaid live wrapper for concept map", lambda html: class_count(html, "mermaid-live") >= 1 and class_count(html, "mermaid-wrapper") >= 1),
-                ("missing Mermaid fallback for concept map", lambda html: class_count(html, "mermaid-fallback") >= 1 and has_img_fragment(html, "/assets/images/shared/context-pack-concept-map.svg")),
-            ],
-        ),
-        (
-            Path("chapters/chapter01/index.html"),
-            [
-                ("missing Mermaid live wrapper for chapter01 loop", lambda html: class_count(html, "mermaid-live") >= 1 and class_count(html, "mermaid-wrapper") >= 1),
-                ("missing Mermaid fallback for chapter01 loop", lambda html: class_count(html, "mermaid-fallback") >= 1 and has_img_fragment(html, "/assets/images/chapter01/context-pack-loop.svg")),
-            ],
-        ),
-        (
-            Path("chapters/chapter04/index.html"),
-            [
-                ("missing Mermaid live wrapper for chapter04 functor diagram", lambda html: class_count(html, "mermaid-live") >= 1 and class_count(html, "mermaid-wrapper") >= 1),
-                ("missing Mermaid fallback for chapter04 functor diagram", lambda html: class_count(html, "mermaid-fallback") >= 1 and has_img_fragment(html, "/assets/images/chapter04/spec-code-functor.svg")),
-            ],
-        ),
-        (
-            Path("chapters/chapter07/index.html"),
-            [
-                ("missing Mermaid live wrappers for chapter07 diagrams", lambda html: class_count(html, "mermaid-live") >= 2 and class_count(html, "mermaid-wrapper") >= 2),
-                ("missing Pullback fallback SVG", lambda html: has_img_fragment(html, "/assets/images/chapter07/pullback.svg")),
-                ("missing Pushout fallback SVG", lambda html: has_img_fragment(html, "/assets/images/chapter07/pushout.svg")),
-            ],
-        ),
-        (
-            Path("chapters/chapter09/index.html"),
-            [
-                ("missing Mermaid live wrapper for chapter09 effect-boundary diagram", lambda html: class_count(html, "mermaid-live") >= 1 and class_count(html, "mermaid-wrapper") >= 1),
-                ("missing Mermaid fallback for chapter09 effect-boundary diagram", lambda html: class_count(html, "mermaid-fallback") >= 1 and has_img_fragment(html, "/assets/images/chapter09/pure-core-impure-shell.svg")),
-            ],
-        ),
-    ]
+    try:
+        config = load_config(args.config)
+    except ConfigError as exc:
+        print(f"❌ {exc}", file=sys.stderr)
+        return 2
+    for flag, check in ((args.mermaid_prerendered, "mermaid-prerendered"), (args.precompressed, "precompressed")):
+        if flag and check not in config.site_checks:
+            config = dataclasses.replace(config, site_checks=(*config.site_checks, check))
 
-    errors: list[str] = []
-    for relative_path, requirements in checks:
-        html_path = site_root / relative_path
-        if not html_path.exists():
-            errors.append(f"{relative_path}: rendered file not found")
-            continue
+    site_root = Path(args.site_root)
+    if args.crawl:
+        site = Site.scan(site_root, args.baseurl if args.baseurl is not None else default_baseurl())
+        jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+        results: Iterator[tuple[str, list[tuple[str, str]]]] = crawl(site_root, config, site, jobs)
+    else:
+        results = ((relative, check_page(site_root, relative, config, None)) for relative in config.pages)
 
-        html = html_path.read_text(encoding="utf-8")
-        for message, predicate in requirements:
-            if not predicate(html):
-                errors.append(f"{relative_path}: {message}")
+    writer = open_writer(args.format, "check-rendered-html")
+    errors = 0
+    try:
+        for relative, failures in results:
+            for rule_id, message in failures:
+                errors += 1
+                if writer is not None:
+                    writer.write(Finding(rule_id=rule_id, message=message, file=relative))
+                else:
+                    print(f"{relative}: {message}", file=sys.stderr)
+    finally:
+        if writer is not None:
+            writer.close()
 
     if errors:
-        for error in errors:
-            print(error, file=sys.stderr)
         return 1
 
-    print("ok")
+    if writer is None:
+        print("ok")
     return 0
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(main(sys.argv[1:]))
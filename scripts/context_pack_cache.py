@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""On-disk validation result cache shared by the Context Pack validators.
+
+Entries are keyed by the SHA-256 of the pack content plus the validator/schema
+fingerprints supplied by the caller, so a hit can skip loading and validation.
+Writes go through a temporary file and ``os.replace`` and readers tolerate
+entries disappearing underneath them, which keeps one cache directory safe to
+share between concurrent CI jobs. Eviction is least-recently-used by mtime, and
+also removes the temporary files of writers that were killed mid-write.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+
+CACHE_FORMAT_VERSION = 1
+CACHE_DIR_ENV = "CONTEXT_PACK_CACHE_DIR"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Trim below the limit so that a run does not evict on every subsequent write.
+EVICT_TARGET_RATIO = 0.8
+# Temporary files older than this are left over from a killed writer; younger ones may
+# still be renamed into place by a concurrent job.
+TMP_GRACE_SECONDS = 60
+
+
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_file(path: Path) -> str:
+    return sha256_bytes(Path(path).read_bytes())
+
+
+def cache_key(content: bytes, *fingerprints: str) -> str:
+    h = hashlib.sha256()
+    h.update(f"context-pack-cache/{CACHE_FORMAT_VERSION}\0".encode("utf-8"))
+    for fingerprint in fingerprints:
+        h.update(fingerprint.encode("utf-8"))
+        h.update(b"\0")
+    h.update(content)
+    return h.hexdigest()
+
+
+class ValidationCache:
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._entry_path(key)
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # A truncated or foreign file is treated as a miss and dropped.
+            self._unlink(path)
+            return None
+
+        if not isinstance(entry, dict) or entry.get("format") != CACHE_FORMAT_VERSION or entry.get("key") != key:
+            self._unlink(path)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry.get("value")
+
+    def put(self, key: str, value: Any) -> None:
+        path = self._entry_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=path.parent)
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"format": CACHE_FORMAT_VERSION, "key": key, "value": value}, f, ensure_ascii=False)
+            os.replace(tmp_name, path)
+        except OSError:
+            self._unlink(Path(tmp_name))
+
+    def evict(self) -> int:
+        """Delete least-recently-used entries until the cache fits in ``max_bytes``.
+
+        Temporary files older than ``TMP_GRACE_SECONDS`` are deleted first (and counted);
+        younger ones count against the limit but are never evicted.
+        """
+        entries: list[tuple[float, int, Path]] = []
+        total = 0
+        removed = 0
+        stale_before = time.time() - TMP_GRACE_SECONDS
+        for path in self.directory.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.name.startswith(".tmp-"):
+                if st.st_mtime < stale_before:
+                    self._unlink(path)
+                    removed += 1
+                else:
+                    total += st.st_size
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+        if total <= self.max_bytes:
+            return removed
+
+        target = int(self.max_bytes * EVICT_TARGET_RATIO)
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= target:
+                break
+            # Another job may already have evicted the same entry; count it as gone either way.
+            self._unlink(path)
+            total -= size
+            removed += 1
+        return removed
+
+    @staticmethod
+    def _unlink(path: Path) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def open_cache(directory: Optional[str], max_bytes: int = DEFAULT_MAX_BYTES) -> Optional[ValidationCache]:
+    """Return a cache for ``directory`` (or ``$CONTEXT_PACK_CACHE_DIR``), or None when caching is disabled."""
+    directory = directory or os.environ.get(CACHE_DIR_ENV)
+    if not directory:
+        return None
+    return ValidationCache(Path(directory), max_bytes=max_bytes)
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""Context Pack loading that keeps YAML source positions for error reporting.
+
+YAML documents are composed into a node tree and constructed from that same tree,
+so the parse happens once, exactly as in ``yaml.safe_load``. The libyaml-backed
+``CSafeLoader`` is used when PyYAML was built with it, falling back to the pure
+Python ``SafeLoader`` otherwise. The node tree is kept in a ``SourceMap``; a JSON
+path is only resolved to ``line:column`` when an error is reported for it, and
+resolved prefixes are memoized so errors under the same entry share the walk.
+
+With the compiled cache enabled, each YAML pack is also stored as compact JSON in
+``.<name>.compiled.json`` next to the source. The entry records the source size and
+SHA-256 plus the PyYAML/loader that produced it; any mismatch marks it stale and
+the pack is parsed again. Packs loaded from the cache get a ``SourceMap`` that
+parses the YAML only if an error position is actually requested.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+import yaml
+
+
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+LOADER_NAME = f"pyyaml-{yaml.__version__}/{SafeLoader.__name__}"
+
+COMPILED_FORMAT_VERSION = 1
+COMPILED_CACHE_ENV = "CONTEXT_PACK_COMPILED_CACHE"
+
+
+class SourceMap:
+    """Lazy JSON path -> (line, column) index over a composed YAML node tree.
+
+    Pass ``text`` instead of ``root`` to defer composing the tree until the first lookup.
+    """
+
+    def __init__(self, root: Optional[yaml.Node] = None, text: Optional[str] = None) -> None:
+        self._text = text
+        self._nodes: dict[tuple[Any, ...], yaml.Node] = {} if root is None else {(): root}
+
+    def _root(self) -> Optional[yaml.Node]:
+        if () not in self._nodes and self._text is not None:
+            root = compose_node(self._text)
+            self._text = None
+            if root is not None:
+                self._nodes[()] = root
+        return self._nodes.get(())
+
+    def _child(self, node: yaml.Node, part: Any) -> Optional[yaml.Node]:
+        if isinstance(node, yaml.SequenceNode):
+            if isinstance(part, int) and 0 <= part < len(node.value):
+                return node.value[part]
+            return None
+        if isinstance(node, yaml.MappingNode):
+            key = str(part)
+            # Later duplicates win when the mapping is constructed, so search from the end.
+            for key_node, value_node in reversed(node.value):
+                if isinstance(key_node, yaml.ScalarNode) and key_node.value == key:
+                    return value_node
+        return None
+
+    def locate(self, parts: Sequence[Any]) -> Optional[tuple[int, int]]:
+        """Return the 1-based ``(line, column)`` of ``parts``.
+
+        Paths that do not exist in the document (e.g. a missing required key) resolve
+        to the deepest enclosing node that does.
+        """
+        if self._root() is None:
+            return None
+        parts = tuple(parts)
+        depth = len(parts)
+        while parts[:depth] not in self._nodes:
+            depth -= 1
+        node = self._nodes[parts[:depth]]
+        for i in range(depth, len(parts)):
+            child = self._child(node, parts[i])
+            if child is None:
+                break
+            node = child
+            self._nodes[parts[: i + 1]] = node
+        mark = node.start_mark
+        return mark.line + 1, mark.column + 1
+
+
+def compose_node(text: str) -> Optional[yaml.Node]:
+    loader = SafeLoader(text)
+    try:
+        return loader.get_single_node()
+    finally:
+        loader.dispose()
+
+
+def parse_document_with_source_map(content: bytes, ext: str) -> tuple[Any, Optional[SourceMap]]:
+    """Parse ``content``; YAML documents also return a ``SourceMap`` (JSON returns None)."""
+    text = content.decode("utf-8")
+    if ext in (".yml", ".yaml"):
+        loader = SafeLoader(text)
+        try:
+            node = loader.get_single_node()
+            if node is None:
+                return None, None
+            return loader.construct_document(node), SourceMap(node)
+        finally:
+            loader.dispose()
+    if ext == ".json":
+        return json.loads(text), None
+    raise ValueError(f"Unsupported file extension: {ext} (expected .yaml/.yml/.json)")
+
+
+def compiled_cache_enabled(flag: bool) -> bool:
+    return flag or os.environ.get(COMPILED_CACHE_ENV, "") not in ("", "0")
+
+
+def compiled_path(source: Path) -> Path:
+    source = Path(source)
+    return source.with_name(f".{source.name}.compiled.json")
+
+
+def _is_json_native(value: Any) -> bool:
+    """True when ``value`` survives a JSON round trip unchanged (no dates, non-str keys, ...)."""
+    stack = [value]
+    while stack:
+        v = stack.pop()
+        if v is None or isinstance(v, (str, bool, int)):
+            continue
+        if isinstance(v, float):
+            if not math.isfinite(v):
+                return False
+            continue
+        if isinstance(v, list):
+            stack.extend(v)
+            continue
+        if isinstance(v, dict):
+            if not all(isinstance(k, str) for k in v):
+                return False
+            stack.extend(v.values())
+            continue
+        return False
+    return True
+
+
+def _source_stamp(content: bytes) -> dict[str, Any]:
+    return {"size": len(content), "sha256": hashlib.sha256(content).hexdigest(), "loader": LOADER_NAME}
+
+
+def read_compiled(source: Path, content: bytes) -> tuple[bool, Any]:
+    """Return ``(True, document)`` when a fresh compiled entry exists for ``content``."""
+    try:
+        with compiled_path(source).open("r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return False, None
+    if not isinstance(entry, dict) or entry.get("format") != COMPILED_FORMAT_VERSION:
+        return False, None
+    stamp = entry.get("source")
+    # Compare the cheap size first so that most stale entries skip hashing.
+    if not isinstance(stamp, dict) or stamp.get("size") != len(content):
+        return False, None
+    if stamp != _source_stamp(content):
+        return False, None
+    return True, entry.get("document")
+
+
+def write_compiled(source: Path, content: bytes, doc: Any) -> bool:
+    """Store ``doc`` as the compiled form of ``content``; documents JSON cannot represent are skipped."""
+    if not _is_json_native(doc):
+        return False
+    path = compiled_path(source)
+    entry = {"format": COMPILED_FORMAT_VERSION, "source": _source_stamp(content), "document": doc}
+    try:
+        fd, tmp_name = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=path.parent)
+    except OSError:
+        return False
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_name, path)
+    except OSError:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def load_pack(source: Path, content: bytes, use_compiled: bool = False) -> tuple[Any, Optional[SourceMap]]:
+    """Parse a pack read from ``source``, going through the compiled cache when enabled."""
+    ext = Path(source).suffix.lower()
+    if not use_compiled or ext not in (".yml", ".yaml"):
+        return parse_document_with_source_map(content, ext)
+
+    fresh, doc = read_compiled(source, content)
+    if fresh:
+        return doc, SourceMap(text=content.decode("utf-8"))
+    doc, source_map = parse_document_with_source_map(content, ext)
+    write_compiled(source, content, doc)
+    return doc, source_map
@@ -0,0 +1,487 @@
+# -*- coding: utf-8 -*-
+"""Compile Context Pack JSON Schemas into generated Python validator modules.
+
+Every schema node becomes two functions: ``ok_N(x)``, a short-circuiting boolean
+check, and ``err_N(x, path)``, a generator that reproduces the errors (path,
+message, keyword) and keyword order of ``jsonschema.Draft202012Validator``.
+``iter_errors`` runs the boolean check first, so valid documents never build paths
+or messages, and an invalid subtree is only descended where its check fails.
+Identical subschemas share one pair of functions, and simple leaf schemas (e.g.
+non-empty strings) are inlined into their parent's loops.
+
+``iter_errors_at(doc, parts)`` validates only the value at ``parts``, with the
+subschema that applies there, and yields exactly the errors a full validation
+reports under that path. It returns None when that subschema is not statically
+known (e.g. below an ``anyOf``), in which case callers validate the whole document.
+
+Generated modules are written to ``scripts/__pycache__/context_pack_schema/`` under a
+name derived from the schema bytes, ``GENERATOR_VERSION`` and the generator's own
+source, so editing a schema or the generator produces a new module. Schemas that use keywords this generator does
+not implement raise ``UnsupportedSchema``; callers fall back to jsonschema.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Optional
+
+from jsonschema import Draft202012Validator
+
+
+GENERATOR_VERSION = 2
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / "__pycache__" / "context_pack_schema"
+
+# Keywords whose result does not depend on the values of an object's members or an
+# array's items, so replacing a child value leaves the parent's own errors unchanged.
+CHILD_INDEPENDENT = frozenset(
+    {"type", "required", "minItems", "maxItems", "minLength", "maxLength", "minimum", "maximum"}
+)
+
+# Keywords without validation behaviour.
+ANNOTATIONS = frozenset(
+    {"$schema", "$id", "$defs", "$comment", "title", "description", "default", "examples", "deprecated", "readOnly", "writeOnly"}
+)
+
+TYPE_CHECKS = {
+    "object": "isinstance({v}, dict)",
+    "array": "isinstance({v}, list)",
+    "string": "isinstance({v}, str)",
+    "boolean": "isinstance({v}, bool)",
+    "null": "{v} is None",
+    "number": "_is_number({v})",
+    "integer": "_is_integer({v})",
+}
+
+RUNTIME = '''
+from collections.abc import Mapping, Sequence
+
+
+class SchemaError:
+    __slots__ = ("absolute_path", "message", "validator")
+
+    def __init__(self, absolute_path, message, validator):
+        self.absolute_path = absolute_path
+        self.message = message
+        self.validator = validator
+
+
+def _is_number(x):
+    return isinstance(x, (int, float)) and not isinstance(x, bool)
+
+
+def _is_integer(x):
+    if isinstance(x, bool):
+        return False
+    return isinstance(x, int) or (isinstance(x, float) and x.is_integer())
+
+
+def _unbool(x, true=object(), false=object()):
+    if x is True:
+        return true
+    if x is False:
+        return false
+    return x
+
+
+def _equal(one, two):
+    # Same semantics as jsonschema._utils.equal: bools never equal numbers.
+    if one is two:
+        return True
+    if isinstance(one, str) or isinstance(two, str):
+        return one == two
+    if isinstance(one, Sequence) and isinstance(two, Sequence):
+        return len(one) == len(two) and all(_equal(i, j) for i, j in zip(one, two))
+    if isinstance(one, Mapping) and isinstance(two, Mapping):
+        return one.keys() == two.keys() and all(_equal(one[key], two[key]) for key in one)
+    return _unbool(one) == _unbool(two)
+'''
+
+
+class UnsupportedSchema(Exception):
+    pass
+
+
+class _Generator:
+    def __init__(self, root: Any) -> None:
+        self.root = root
+        self.ids: dict[str, int] = {}
+        self.constants: list[str] = []
+        self.chunks: list[str] = []
+        self.schemas: list[Any] = []
+
+    def const(self, value: Any) -> str:
+        name = f"C{len(self.constants)}"
+        self.constants.append(f"{name} = {value!r}")
+        return name
+
+    def resolve(self, ref: str) -> Any:
+        if not ref.startswith("#"):
+            raise UnsupportedSchema(f"only local $ref is supported: {ref}")
+        node = self.root
+        for token in ref[1:].split("/")[1:]:
+            token = token.replace("~1", "/").replace("~0", "~")
+            node = node[int(token)] if isinstance(node, list) else node[token]
+        return node
+
+    def node(self, schema: Any) -> int:
+        """Return the function id for ``schema``, generating it on first use."""
+        key = json.dumps(schema, ensure_ascii=False)
+        if key in self.ids:
+            return self.ids[key]
+        n = len(self.ids)
+        self.ids[key] = n
+        self.schemas.append(schema)
+        self.chunks.append(self._ok(n, schema))
+        self.chunks.append(self._err(n, schema))
+        return n
+
+    def step(self, schema: Any) -> Optional[str]:
+        """``(properties, items, additional)`` node ids for descending into ``schema``'s children.
+
+        None when a keyword makes the children's errors depend on more than one subschema
+        or on sibling values (anyOf, const, ...).
+        """
+        if schema is True or schema is False:
+            return None
+        if "$ref" in schema:
+            if set(schema) - ANNOTATIONS - CHILD_INDEPENDENT - {"$ref"}:
+                return None
+            return self.step(self.resolve(schema["$ref"]))
+        if set(schema) - ANNOTATIONS - CHILD_INDEPENDENT - {"properties", "items", "additionalProperties"}:
+            return None
+        props = {name: self.node(sub) for name, sub in schema.get("properties", {}).items()}
+        items = self.node(schema.get("items", True))
+        additional = schema.get("additionalProperties", True)
+        # additionalProperties: false only concerns the keys, which a replaced value keeps.
+        additional_node = self.node(True if additional is False else additional)
+        return f"({props!r}, {items}, {additional_node})"
+
+    def inline(self, schema: Any, v: str) -> Optional[str]:
+        """A boolean expression for simple leaf schemas, or None."""
+        if schema is True:
+            return "True"
+        if not isinstance(schema, dict):
+            return None
+        terms: list[str] = []
+        is_str = False
+        for key, value in schema.items():
+            if key in ANNOTATIONS:
+                continue
+            if key == "type" and isinstance(value, str) and value in TYPE_CHECKS:
+                terms.append(TYPE_CHECKS[value].format(v=v))
+                is_str = value == "string"
+            elif key == "minLength" and isinstance(value, int):
+                # The isinstance guard can be dropped once "type": "string" has been checked.
+                terms.append(f"len({v}) >= {value}" if is_str else f"(not isinstance({v}, str) or len({v}) >= {value})")
+            elif key == "const" and isinstance(value, str):
+                terms.append(f"{v} == {value!r}")
+            else:
+                return None
+        return "(" + " and ".join(terms or ["True"]) + ")"
+
+    def check(self, schema: Any, v: str) -> str:
+        expr = self.inline(schema, v)
+        return expr if expr is not None else f"ok_{self.node(schema)}({v})"
+
+    def _ok(self, n: int, schema: Any) -> str:
+        lines = [f"def ok_{n}(x):"]
+        if schema is True or schema is False:
+            lines.append(f"    return {schema}")
+            return "\n".join(lines)
+        if not isinstance(schema, dict):
+            raise UnsupportedSchema(f"schema must be an object or boolean: {schema!r}")
+        props = schema.get("properties", {})
+        for key, value in schema.items():
+            if key in ANNOTATIONS:
+                continue
+            if key == "type":
+                types = [value] if isinstance(value, str) else list(value)
+                if any(t not in TYPE_CHECKS for t in types):
+                    raise UnsupportedSchema(f"unknown type: {value!r}")
+                expr = " or ".join(TYPE_CHECKS[t].format(v="x") for t in types)
+                lines.append(f"    if not ({expr}):")
+                lines.append("        return False")
+            elif key in ("minLength", "maxLength"):
+                op = "<" if key == "minLength" else ">"
+                lines.append(f"    if isinstance(x, str) and len(x) {op} {value!r}:")
+                lines.append("        return False")
+            elif key in ("minItems", "maxItems"):
+                op = "<" if key == "minItems" else ">"
+                lines.append(f"    if isinstance(x, list) and len(x) {op} {value!r}:")
+                lines.append("        return False")
+            elif key in ("minimum", "maximum"):
+                op = "<" if key == "minimum" else ">"
+                lines.append(f"    if _is_number(x) and x {op} {value!r}:")
+                lines.append("        return False")
+            elif key == "const":
+                lines.append(f"    if not _equal(x, {self.const(value)}):")
+                lines.append("        return False")
+            elif key == "enum":
+                name = self.const(tuple(value))
+                lines.append(f"    if not any(_equal(x, e) for e in {name}):")
+                lines.append("        return False")
+            elif key == "required":
+                if value:
+                    expr = " and ".join(f"{p!r} in x" for p in value)
+                    lines.append(f"    if isinstance(x, dict) and not ({expr}):")
+                    lines.append("        return False")
+            elif key == "properties":
+                lines.append("    if isinstance(x, dict):")
+                for prop, subschema in value.items():
+                    lines.append(f"        if {prop!r} in x:")
+                    lines.append(f"            v = x[{prop!r}]")
+                    lines.append(f"            if not {self.check(subschema, 'v')}:")
+                    lines.append("                return False")
+            elif key == "additionalProperties":
+                if "patternProperties" in schema:
+                    raise UnsupportedSchema("patternProperties is not supported")
+                if value is True:
+                    continue
+                names = self.const(frozenset(props))
+                lines.append("    if isinstance(x, dict):")
+                lines.append("        for k, v in x.items():")
+                lines.append(f"            if k not in {names} and not {self.check(value, 'v')}:")
+                lines.append("                return False")
+            elif key == "items":
+                if "prefixItems" in schema:
+                    raise UnsupportedSchema("prefixItems is not supported")
+                lines.append("    if isinstance(x, list):")
+                lines.append("        for v in x:")
+                lines.append(f"            if not {self.check(value, 'v')}:")
+                lines.append("                return False")
+            elif key == "anyOf":
+                expr = " or ".join(self.check(subschema, "x") for subschema in value)
+                lines.append(f"    if not ({expr}):")
+                lines.append("        return False")
+            elif key == "$ref":
+                lines.append(f"    if not ok_{self.node(self.resolve(value))}(x):")
+                lines.append("        return False")
+            else:
+                raise UnsupportedSchema(f"unsupported keyword: {key}")
+        lines.append("    return True")
+        return "\n".join(lines)
+
+    def _err(self, n: int, schema: Any) -> str:
+        lines = [f"def err_{n}(x, path):"]
+        if schema is False:
+            lines.append('    yield SchemaError(path, f"False schema does not allow {x!r}", None)')
+        if not isinstance(schema, dict):
+            lines.append("    return")
+            lines.append("    yield")
+            return "\n".join(lines)
+        props = schema.get("properties", {})
+        for key, value in schema.items():
+            if key in ANNOTATIONS:
+                continue
+            if key == "type":
+                types = [value] if isinstance(value, str) else list(value)
+                expr = " or ".join(TYPE_CHECKS[t].format(v="x") for t in types)
+                reprs = ", ".join(repr(t) for t in types)
+                lines.append(f"    if not ({expr}):")
+                lines.append(f"        yield SchemaError(path, f'{{x!r}} is not of type ' + {reprs!r}, 'type')")
+            elif key in ("minLength", "maxLength", "minItems", "maxItems"):
+                container = "str" if key.endswith("Length") else "list"
+                op = "<" if key.startswith("min") else ">"
+                if key.startswith("min"):
+                    suffix = "should be non-empty" if value == 1 else "is too short"
+                else:
+                    suffix = "is expected to be empty" if value == 0 else "is too long"
+                lines.append(f"    if isinstance(x, {container}) and len(x) {op} {value!r}:")
+                lines.append(f"        yield SchemaError(path, f'{{x!r}} ' + {suffix!r}, {key!r})")
+            elif key in ("minimum", "maximum"):
+                op = "<" if key == "minimum" else ">"
+                word = "less than the minimum" if key == "minimum" else "greater than the maximum"
+                lines.append(f"    if _is_number(x) and x {op} {value!r}:")
+                lines.append(f"        yield SchemaError(path, f'{{x!r}} is {word} of ' + {repr(value)!r}, {key!r})")
+            elif key == "const":
+                lines.append(f"    if not _equal(x, {self.const(value)}):")
+                lines.append(f"        yield SchemaError(path, {f'{value!r} was expected'!r}, 'const')")
+            elif key == "enum":
+                name = self.const(tuple(value))
+                lines.append(f"    if not any(_equal(x, e) for e in {name}):")
+                lines.append(f"        yield SchemaError(path, f'{{x!r}} is not one of ' + {repr(value)!r}, 'enum')")
+            elif key == "required":
+                lines.append("    if isinstance(x, dict):")
+                lines.append(f"        for p in {self.const(tuple(value))}:")
+                lines.append("            if p not in x:")
+                lines.append("                yield SchemaError(path, f'{p!r} is a required property', 'required')")
+            elif key == "properties":
+                lines.append("    if isinstance(x, dict):")
+                for prop, subschema in value.items():
+                    lines.append(f"        if {prop!r} in x:")
+                    lines.append(f"            v = x[{prop!r}]")
+                    lines.append(f"            if not {self.check(subschema, 'v')}:")
+                    lines.append(f"                yield from err_{self.node(subschema)}(v, (*path, {prop!r}))")
+            elif key == "additionalProperties":
+                if value is True:
+                    continue
+                names = self.const(frozenset(props))
+                if value is False:
+                    lines.append("    if isinstance(x, dict):")
+                    lines.append(f"        extras = sorted((k for k in x if k not in {names}), key=str)")
+                    lines.append("        if extras:")
+                    lines.append("            joined = ', '.join(repr(e) for e in extras)")
+                    lines.append("            verb = 'was' if len(extras) == 1 else 'were'")
+                    lines.append(
+                        "            yield SchemaError(path, f'Additional properties are not allowed ({joined} {verb} unexpected)', "
+                        "'additionalProperties')"
+                    )
+                else:
+                    lines.append("    if isinstance(x, dict):")
+                    lines.append("        for k, v in x.items():")
+                    lines.append(f"            if k not in {names} and not {self.check(value, 'v')}:")
+                    lines.append(f"                yield from err_{self.node(value)}(v, (*path, k))")
+            elif key == "items":
+                lines.append("    if isinstance(x, list):")
+                lines.append("        for i, v in enumerate(x):")
+                lines.append(f"            if not {self.check(value, 'v')}:")
+                lines.append(f"                yield from err_{self.node(value)}(v, (*path, i))")
+            elif key == "anyOf":
+                expr = " or ".join(self.check(subschema, "x") for subschema in value)
+                lines.append(f"    if not ({expr}):")
+                lines.append("        yield SchemaError(path, f'{x!r} is not valid under any of the given schemas', 'anyOf')")
+            elif key == "$ref":
+                target = self.node(self.resolve(value))
+                lines.append(f"    if not ok_{target}(x):")
+                lines.append(f"        yield from err_{target}(x, path)")
+        lines.append("    return")
+        lines.append("    yield")
+        return "\n".join(lines)
+
+
+def generate_source(schema: Any, digest: str = "") -> str:
+    """Return the source of a validator module for ``schema``."""
+    generator = _Generator(schema)
+    root = generator.node(schema)
+    steps: list[str] = []
+    # step() may register more nodes, so walk the list while it grows.
+    n = 0
+    while n < len(generator.schemas):
+        step = generator.step(generator.schemas[n])
+        if step is not None:
+            steps.append(f"    {n}: {step},")
+        n += 1
+    count = len(generator.schemas)
+    header = [
+        "# -*- coding: utf-8 -*-",
+        f'"""Generated by scripts/context_pack_schema_codegen.py (generator {GENERATOR_VERSION}, schema {digest}). Do not edit."""',
+    ]
+    footer = [
+        f"is_valid = ok_{root}",
+        "",
+        "",
+        "def iter_errors(instance):",
+        f"    if ok_{root}(instance):",
+        "        return",
+        f"    yield from err_{root}(instance, ())",
+        "",
+        "",
+        f"CHECKS = ({''.join(f'ok_{i}, ' for i in range(count))})",
+        f"ERRORS = ({''.join(f'err_{i}, ' for i in range(count))})",
+        "STEPS = {",
+        *steps,
+        "}",
+        "",
+        "",
+        "def iter_errors_at(doc, parts):",
+        f"    n = {root}",
+        "    x = doc",
+        "    for part in parts:",
+        "        step = STEPS.get(n)",
+        "        if step is None:",
+        "            return None",
+        "        if isinstance(x, dict) and isinstance(part, str):",
+        "            n = step[0].get(part, step[2])",
+        "        elif isinstance(x, list) and isinstance(part, int):",
+        "            n = step[1]",
+        "        else:",
+        "            # No keyword descends through a value of this type.",
+        "            return iter(())",
+        "        x = x[part]",
+        "    if CHECKS[n](x):",
+        "        return iter(())",
+        "    return ERRORS[n](x, tuple(parts))",
+    ]
+    return "\n".join(
+        [*header, RUNTIME, "\n".join(generator.constants), "", *("\n\n" + chunk for chunk in generator.chunks), "", "", *footer, ""]
+    )
+
+
+@lru_cache(maxsize=None)
+def generator_digest() -> str:
+    """SHA-256 of this module's source; generated code changes with it even when
+    ``GENERATOR_VERSION`` is not bumped."""
+    return hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+
+
+def schema_digest(schema_bytes: bytes) -> str:
+    h = hashlib.sha256()
+    h.update(f"context-pack-schema-codegen/{GENERATOR_VERSION}/{generator_digest()}\0".encode("utf-8"))
+    h.update(schema_bytes)
+    return h.hexdigest()[:24]
+
+
+def _import_module(module_name: str, path: Path) -> ModuleType:
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"cannot load generated validator: {path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    sys.modules[module_name] = module
+    return module
+
+
+def load_generated_validator(schema_path: Path, cache_dir: Optional[Path] = None) -> ModuleType:
+    """Return the generated validator module for ``schema_path``, generating it when missing.
+
+    The module exposes ``iter_errors(instance)`` (errors with ``absolute_path``,
+    ``message`` and ``validator`` like jsonschema's) and ``is_valid(instance)``.
+    """
+    schema_bytes = Path(schema_path).read_bytes()
+    digest = schema_digest(schema_bytes)
+    module_name = f"context_pack_schema_{digest}"
+    cache_dir = Path(cache_dir) if cache_dir is not None else DEFAULT_CACHE_DIR
+    module_path = cache_dir / f"{module_name}.py"
+    if module_path.exists():
+        return _import_module(module_name, module_path)
+
+    schema = json.loads(schema_bytes.decode("utf-8"))
+    # Only schemas that jsonschema itself accepts are compiled.
+    Draft202012Validator.check_schema(schema)
+    source = generate_source(schema, digest)
+    if not _write_module(module_path, source):
+        # Read-only checkout: run the generated code without caching it.
+        module = ModuleType(module_name)
+        exec(compile(source, str(module_path), "exec"), module.__dict__)
+        sys.modules[module_name] = module
+        return module
+    return _import_module(module_name, module_path)
+
+
+def _write_module(module_path: Path, source: str) -> bool:
+    try:
+        module_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=".tmp-", suffix=".py", dir=module_path.parent)
+    except OSError:
+        return False
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(source)
+        os.replace(tmp_name, module_path)
+    except OSError:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        return False
+    return True
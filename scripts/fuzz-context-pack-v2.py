@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Mutation-fuzz the Context Pack v2 JSON Schema against the v2 semantic lint.
+
+Mutants are derived from the canonical v2 examples by four operators:
+
+- ``type``: replace a value with one of a different JSON type;
+- ``empty``: replace a string, list or object with an empty one;
+- ``drop``: remove an object key or a list element;
+- ``dangling``: replace a reference to a defined id with an undefined id.
+
+Every mutant goes through ``Draft202012Validator`` and ``validate_context_pack_v2``.
+The two disagree when exactly one of them rejects the mutant, counting only the lint
+rules that restate the schema (type / required / entry; references, duplicate ids and
+id collisions are lint-only by design), or when either one raises.
+
+Each disagreement is shrunk to a minimal negative fixture in the format of
+``scripts/fixtures/context-pack-v2-malformed-entries.json``: a single list entry
+placed at ``path`` of the regression checker's base example, reduced key by key
+while the same disagreement persists there. The fixtures are written to ``--output`` (and
+appended to the malformed-entries file with ``--append``); once appended,
+``check-context-pack-v2-schema-regressions.py`` fails until both validators reject
+the entry. Disagreements that are not a single list entry are reported as-is.
+
+Disagreements are bucketed by their signature: which validator rejects alone, the
+rule it rejects with and the JSON path of that error (list indices as ``[*]``), taken
+from the shrunk fixture when there is one, so one defect reached through different
+replacement values is reported once. Signatures recorded in
+``scripts/fixtures/context-pack-v2-fuzz-known.json`` are known disagreements, still
+to be triaged: they are reported but only a new signature fails the run.
+``--update-known`` records the signatures found by this run there.
+
+Workers run on all cores until ``--budget`` seconds have passed::
+
+    python3 scripts/fuzz-context-pack-v2.py --budget 600 --seed "$GITHUB_RUN_ID"
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from jsonschema import Draft202012Validator
+
+from script_loader import load_script_module
+
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+ROOT = SCRIPTS_DIR.parent
+REGRESSIONS_PATH = SCRIPTS_DIR / "check-context-pack-v2-schema-regressions.py"
+DEFAULT_OUTPUT = ROOT / "qa-reports/context-pack-v2-fuzz-fixtures.json"
+DEFAULT_KNOWN = SCRIPTS_DIR / "fixtures/context-pack-v2-fuzz-known.json"
+DEFAULT_BUDGET = 60.0
+
+OPERATORS = ("type", "empty", "drop", "dangling")
+# One sample value per JSON type; ``type`` picks one whose type differs from the original.
+TYPE_SAMPLES: tuple[Any, ...] = (None, True, 0, 1.5, "x", ["x"], {"x": "x"})
+# Evaluations allowed per shrink, so one pathological mutant cannot eat the budget.
+MAX_SHRINK_STEPS = 2000
+LIST_INDEX_RE = re.compile(r"\[\d+\]")
+
+
+regressions = load_script_module("context_pack_v2_regressions", REGRESSIONS_PATH)
+semantic = load_script_module("context_pack_semantic_validator", regressions.SEMANTIC_VALIDATOR_PATH)
+
+STRUCTURAL_RULES = frozenset({semantic.RULE_TYPE, semantic.RULE_REQUIRED, semantic.RULE_ENTRY})
+
+
+@dataclass(frozen=True)
+class Mutant:
+    example: int
+    path: tuple[Any, ...]
+    operator: str
+    # Replacement value (unused by ``drop``).
+    value: Any = None
+
+
+@dataclass(frozen=True)
+class Verdict:
+    schema_rejects: bool
+    lint_rejects: bool
+    # "schema: <exception>" / "lint: <exception>" when a validator raised.
+    crash: Optional[str] = None
+    # Rule id and JSON path (list indices as [*]) of the first error of the validator
+    # that rejects alone.
+    rule: Optional[str] = None
+    where: Optional[str] = None
+
+    @property
+    def disagrees(self) -> bool:
+        return self.crash is not None or self.schema_rejects != self.lint_rejects
+
+    def describe(self) -> str:
+        if self.crash is not None:
+            return f"crash ({self.crash})"
+        return "schema only" if self.schema_rejects else "lint only"
+
+    @property
+    def signature(self) -> str:
+        """Bucket of the disagreement: which validator rejects alone, with which rule, where."""
+        return f"{self.describe()}|{self.where}|{self.rule}"
+
+
+@dataclass(frozen=True)
+class Finding:
+    mutant: Mutant
+    verdict: Verdict
+    # Shrunk negative fixture, or None when the mutant is not a single list entry on the base example.
+    fixture: Optional[dict[str, Any]] = None
+
+
+_STATE: dict[str, Any] = {}
+
+
+def _state() -> dict[str, Any]:
+    """Examples and the schema validator, loaded once per process."""
+    if not _STATE:
+        _STATE["examples"] = [regressions.load_yaml(path) for path in regressions.EXAMPLE_PATHS]
+        _STATE["validator"] = Draft202012Validator(regressions.load_json(regressions.SCHEMA_PATH))
+        _STATE["paths"] = [list(iter_paths(example)) for example in _STATE["examples"]]
+        _STATE["references"] = [list(iter_references(example)) for example in _STATE["examples"]]
+    return _STATE
+
+
+def iter_paths(doc: Any, prefix: tuple[Any, ...] = ()) -> Iterator[tuple[Any, ...]]:
+    """Every non-root path of ``doc``."""
+    if isinstance(doc, dict):
+        items: Any = doc.items()
+    elif isinstance(doc, list):
+        items = enumerate(doc)
+    else:
+        return
+    for key, value in items:
+        yield (*prefix, key)
+        yield from iter_paths(value, (*prefix, key))
+
+
+def iter_references(doc: Any) -> Iterator[tuple[Any, ...]]:
+    """Paths of strings that equal an id defined elsewhere in ``doc`` (excluding the definitions)."""
+    symbols = semantic.build_symbol_table(doc)
+    defined = {symbol for table in symbols.namespaces.values() for symbol in table}
+    for path in iter_paths(doc):
+        if path and path[-1] in ("id", "name"):
+            continue
+        value = get_path(doc, path)
+        if isinstance(value, str) and value in defined:
+            yield path
+
+
+def get_path(doc: Any, path: tuple[Any, ...]) -> Any:
+    for part in path:
+        doc = doc[part]
+    return doc
+
+
+def apply(doc: Any, mutant: Mutant) -> Any:
+    """Return ``doc`` with ``mutant`` applied, copying only the containers along its path."""
+    root = _shallow_copy(doc)
+    target = root
+    for part in mutant.path[:-1]:
+        target[part] = _shallow_copy(target[part])
+        target = target[part]
+    if mutant.operator == "drop":
+        del target[mutant.path[-1]]
+    else:
+        target[mutant.path[-1]] = mutant.value
+    return root
+
+
+def _shallow_copy(value: Any) -> Any:
+    return dict(value) if isinstance(value, dict) else list(value)
+
+
+def _json_type(value: Any) -> str:
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "number"
+    return {type(None): "null", str: "string", list: "array", dict: "object"}[type(value)]
+
+
+def random_mutant(rng: random.Random) -> Optional[Mutant]:
+    state = _state()
+    example = rng.randrange(len(state["examples"]))
+    operator = rng.choice(OPERATORS)
+    if operator == "dangling":
+        references = state["references"][example]
+        if not references:
+            return None
+        path = rng.choice(references)
+        return Mutant(example, path, operator, f"{get_path(state['examples'][example], path)}-dangling")
+
+    path = rng.choice(state["paths"][example])
+    current = get_path(state["examples"][example], path)
+    if operator == "type":
+        samples = [sample for sample in TYPE_SAMPLES if _json_type(sample) != _json_type(current)]
+        return Mutant(example, path, operator, rng.choice(samples))
+    if operator == "empty":
+        if not isinstance(current, (str, list, dict)) or not current:
+            return None
+        return Mutant(example, path, operator, type(current)())
+    return Mutant(example, path, operator)
+
+
+def judge(doc: Any, at: Optional[list[Any]] = None) -> Verdict:
+    """Verdicts of both validators; with ``at``, only errors under that path count (as in the regression checker)."""
+    validator = _state()["validator"]
+    try:
+        schema_error = next(
+            (e for e in validator.iter_errors(doc) if at is None or list(e.absolute_path)[: len(at)] == at), None
+        )
+    except Exception as e:
+        return Verdict(False, False, crash=f"schema: {type(e).__name__}: {e}")
+    try:
+        errors = semantic.validate_context_pack_v2(doc)
+    except Exception as e:
+        return Verdict(schema_error is not None, False, crash=f"lint: {type(e).__name__}: {e}")
+    prefix = regressions.format_path(at) if at is not None else "$"
+    lint_error = next((error for error in errors if error.rule in STRUCTURAL_RULES and error.path.startswith(prefix)), None)
+    if schema_error is not None and lint_error is None:
+        where = regressions.format_path(list(schema_error.absolute_path))
+        return Verdict(True, False, rule=f"schema/{schema_error.validator}", where=LIST_INDEX_RE.sub("[*]", where))
+    if lint_error is not None and schema_error is None:
+        return Verdict(False, True, rule=lint_error.rule, where=LIST_INDEX_RE.sub("[*]", lint_error.path))
+    return Verdict(schema_error is not None, lint_error is not None)
+
+
+def fuzz_worker(seed: int, deadline: float, max_mutants: int) -> tuple[int, dict[str, tuple[Mutant, Verdict]]]:
+    """Judge random mutants until ``deadline``; return the count and the first disagreement per verdict signature."""
+    state = _state()
+    rng = random.Random(seed)
+    checked = 0
+    found: dict[str, tuple[Mutant, Verdict]] = {}
+    while time.time() < deadline and (max_mutants <= 0 or checked < max_mutants):
+        mutant = random_mutant(rng)
+        if mutant is None:
+            continue
+        checked += 1
+        verdict = judge(apply(state["examples"][mutant.example], mutant))
+        if verdict.disagrees:
+            found.setdefault(verdict.signature, (mutant, verdict))
+    return checked, found
+
+
+def _entry_split(path: tuple[Any, ...]) -> Optional[int]:
+    """Index of the first list index in ``path`` when every part before it is a key."""
+    for i, part in enumerate(path):
+        if isinstance(part, int):
+            return i if i > 0 else None
+        if not isinstance(part, str):
+            return None
+    return None
+
+
+def _reductions(value: Any) -> Iterator[Any]:
+    """Candidate simplifications of ``value``, smallest first."""
+    if isinstance(value, dict):
+        for key in value:
+            yield {k: v for k, v in value.items() if k != key}
+        for key, item in value.items():
+            for reduced in _reductions(item):
+                yield {**value, key: reduced}
+    elif isinstance(value, list):
+        for i in range(len(value)):
+            yield value[:i] + value[i + 1 :]
+        for i, item in enumerate(value):
+            for reduced in _reductions(item):
+                yield [*value[:i], reduced, *value[i + 1 :]]
+    elif isinstance(value, str) and value not in ("", "x"):
+        yield "x"
+    elif isinstance(value, (int, float)) and not isinstance(value, bool) and value not in (0, 1):
+        yield 0
+
+
+def shrink(mutant: Mutant, verdict: Verdict) -> Optional[tuple[dict[str, Any], Verdict]]:
+    """Reduce ``mutant`` to a negative fixture ``{"path", "value"}`` on the base example, if
+    possible; return it with its verdict there.
+
+    Fixtures are overlaid on the regression checker's base example (the first
+    example), so the mutated entry is spliced there whichever example it came from;
+    an entry that does not disagree the same way on the base example gets no fixture
+    and the finding is reported as-is.
+    """
+    state = _state()
+    mutated = apply(state["examples"][mutant.example], mutant)
+    split = _entry_split(mutant.path)
+    if split is None or (mutant.operator == "drop" and len(mutant.path) == split + 1):
+        return None
+    path = list(mutant.path[:split])
+    base = state["examples"][0]
+
+    def judged(value: Any) -> Optional[Verdict]:
+        try:
+            candidate = regressions.overlay(base, path, value)
+        except (KeyError, TypeError):
+            return None
+        return judge(candidate, [*path, 0])
+
+    def reproduces(value: Any) -> bool:
+        reduced = judged(value)
+        return reduced is not None and reduced.disagrees and reduced.describe() == verdict.describe()
+
+    value = get_path(mutated, mutant.path[: split + 1])
+    if not reproduces(value):
+        return None
+    steps = 0
+    improved = True
+    while improved and steps < MAX_SHRINK_STEPS:
+        improved = False
+        for reduced in _reductions(value):
+            steps += 1
+            if reproduces(reduced):
+                value = reduced
+                improved = True
+                break
+            if steps >= MAX_SHRINK_STEPS:
+                break
+    # Judge the emitted fixture exactly as the regression checker will see it.
+    final = judged(value)
+    if final is None or not final.disagrees or final.describe() != verdict.describe():
+        return None
+    return {"path": path, "value": value}, final
+
+
+def fuzz(seed: int, budget: float, jobs: int, max_mutants: int = 0) -> tuple[int, list[Finding]]:
+    """Fuzz for ``budget`` seconds on ``jobs`` processes, then shrink the disagreements and keep one per signature."""
+    deadline = time.time() + budget
+    per_worker = -(-max_mutants // jobs) if max_mutants > 0 else 0
+    if jobs <= 1:
+        results = [fuzz_worker(seed, deadline, per_worker)]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(fuzz_worker, seed * 1_000_003 + i, deadline, per_worker) for i in range(jobs)]
+            results = [future.result() for future in futures]
+
+    checked = sum(count for count, _ in results)
+    merged: dict[str, tuple[Mutant, Verdict]] = {}
+    for _, found in results:
+        for key, item in found.items():
+            merged.setdefault(key, item)
+
+    findings: list[Finding] = []
+    signatures: set[str] = set()
+    names: set[str] = set()
+    for key in sorted(merged):
+        mutant, verdict = merged[key]
+        shrunk = shrink(mutant, verdict)
+        fixture: Optional[dict[str, Any]] = None
+        if shrunk is not None:
+            # Bucket on the shrunk fixture: mutants that reduce to one defect are one finding.
+            fixture, verdict = shrunk
+        if verdict.signature in signatures:
+            continue
+        signatures.add(verdict.signature)
+        if fixture is not None:
+            name = _fixture_name(fixture, verdict)
+            n = 2
+            while name in names:
+                name = f"{_fixture_name(fixture, verdict)} #{n}"
+                n += 1
+            names.add(name)
+            fixture = {"name": name, **fixture}
+        findings.append(Finding(mutant, verdict, fixture))
+    return checked, findings
+
+
+def _fixture_name(fixture: dict[str, Any], verdict: Verdict) -> str:
+    return f"fuzz: {'.'.join(fixture['path'])} accepted by {'lint' if verdict.schema_rejects else 'JSON Schema'}"
+
+
+def format_fixtures(fixtures: list[dict[str, Any]]) -> str:
+    """Serialize fixtures in the layout of the checked-in fixture files (one key per line, compact values)."""
+    blocks = []
+    for fixture in fixtures:
+        lines = [f"    {json.dumps(key)}: {json.dumps(value, ensure_ascii=False)}" for key, value in fixture.items()]
+        blocks.append("  {\n" + ",\n".join(lines) + "\n  }")
+    return "[\n" + ",\n".join(blocks) + "\n]\n"
+
+
+def append_fixtures(path: Path, fixtures: list[dict[str, Any]]) -> int:
+    """Append the fixtures whose (path, value) is not already in ``path``; return how many were added."""
+    existing = regressions.load_json(path)
+    names = {fixture["name"] for fixture in existing}
+    known = {json.dumps([fixture["path"], fixture.get("value")], sort_keys=True) for fixture in existing}
+    added = 0
+    for fixture in fixtures:
+        if json.dumps([fixture["path"], fixture["value"]], sort_keys=True) in known:
+            continue
+        name = fixture["name"]
+        n = 2
+        while name in names:
+            name = f"{fixture['name']} #{n}"
+            n += 1
+        names.add(name)
+        existing.append({**fixture, "name": name})
+        added += 1
+    path.write_text(format_fixtures(existing), encoding="utf-8")
+    return added
+
+
+def load_known(path: Path) -> dict[str, dict[str, Any]]:
+    """Known disagreements by signature; none when ``path`` does not exist."""
+    if not path.is_file():
+        return {}
+    return {entry["signature"]: entry for entry in regressions.load_json(path)}
+
+
+def known_entry(finding: Finding) -> dict[str, Any]:
+    """A known-disagreement record: the signature and its shrunk fixture, or the mutant when it has none."""
+    entry: dict[str, Any] = {"signature": finding.verdict.signature}
+    if finding.fixture is not None:
+        entry.update(path=finding.fixture["path"], value=finding.fixture["value"])
+    else:
+        entry["mutant"] = describe_mutant(finding.mutant)
+    return entry
+
+
+def describe_mutant(mutant: Mutant) -> str:
+    where = regressions.format_path(list(mutant.path))
+    value = "" if mutant.operator == "drop" else f" -> {json.dumps(mutant.value, ensure_ascii=False)}"
+    return f"{regressions.EXAMPLE_PATHS[mutant.example].relative_to(ROOT)}: {mutant.operator} {where}{value}"
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Mutation-fuzz the v2 JSON Schema against the v2 semantic lint.")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help=f"Seconds to fuzz (default: {DEFAULT_BUDGET:g})")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the mutant streams (default: 0)")
+    parser.add_argument("-j", "--jobs", type=int, default=0, help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--max-mutants", type=int, default=0, help="Stop after this many mutants in total (default: no limit)")
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=DEFAULT_OUTPUT,
+        help=f"Where to write the shrunk fixtures (default: {DEFAULT_OUTPUT.relative_to(ROOT)})",
+    )
+    parser.add_argument(
+        "--append",
+        action="store_true",
+        help=f"Also append new fixtures to {regressions.MALFORMED_FIXTURE_PATH.relative_to(ROOT)}",
+    )
+    parser.add_argument(
+        "--known",
+        type=Path,
+        default=DEFAULT_KNOWN,
+        help=f"Known disagreements; only signatures missing from it fail the run (default: {DEFAULT_KNOWN.relative_to(ROOT)})",
+    )
+    parser.add_argument("--update-known", action="store_true", help="Record the signatures found by this run in --known")
+    args = parser.parse_args(argv)
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    started = time.perf_counter()
+    checked, findings = fuzz(args.seed, args.budget, jobs, args.max_mutants)
+    elapsed = time.perf_counter() - started
+
+    fixtures = [finding.fixture for finding in findings if finding.fixture is not None]
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(format_fixtures(fixtures) if fixtures else "[]\n", encoding="utf-8")
+
+    known = load_known(args.known)
+    new = [finding for finding in findings if finding.verdict.signature not in known]
+    for finding in findings:
+        mark = "❌" if finding.verdict.signature not in known else "⚠️ known:"
+        print(f"{mark} {finding.verdict.describe()}: {describe_mutant(finding.mutant)}", file=sys.stderr)
+        print(f"   signature: {finding.verdict.signature}", file=sys.stderr)
+        if finding.fixture is not None:
+            print(f"   fixture: {json.dumps(finding.fixture, ensure_ascii=False)}", file=sys.stderr)
+
+    summary = f"{checked:,} mutants in {elapsed:.1f}s on {jobs} worker(s)"
+    if not findings:
+        print(f"✅ JSON Schema and semantic lint agree on {summary}")
+        return 0
+    if args.append and fixtures:
+        added = append_fixtures(regressions.MALFORMED_FIXTURE_PATH, fixtures)
+        print(f"⚠️ Appended {added} fixture(s) to {regressions.MALFORMED_FIXTURE_PATH.relative_to(ROOT)}", file=sys.stderr)
+    if args.update_known and new:
+        known.update((finding.verdict.signature, known_entry(finding)) for finding in new)
+        args.known.parent.mkdir(parents=True, exist_ok=True)
+        args.known.write_text(format_fixtures([known[key] for key in sorted(known)]), encoding="utf-8")
+        print(f"⚠️ Recorded {len(new)} new signature(s) in {args.known}", file=sys.stderr)
+        new = []
+    counts = f"{len(findings)} disagreement(s) between JSON Schema and semantic lint ({summary}), {len(new)} new"
+    if not new:
+        print(f"⚠️ {counts}; {len(fixtures)} shrunk fixture(s) written to {args.output}", file=sys.stderr)
+        return 0
+    print(f"❌ {counts}; {len(fixtures)} shrunk fixture(s) written to {args.output}", file=sys.stderr)
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Generate large synthetic Context Packs for load testing the validators.
+
+The output is deterministic for a given ``--seed`` and valid against both the JSON
+Schema and the minimal lint. Section sizes are derived from ``--objects`` and
+``--morphisms``; every diagram, mapping, view, handler, composition, merge invariant
+and PII tool list refers to ``--refs-per-entry`` randomly chosen ids defined
+elsewhere in the pack, so reference resolution is exercised at a realistic density.
+
+``--malformed-rate`` replaces that fraction of the v2 structured entries targeted by
+``scripts/fixtures/context-pack-v2-malformed-entries.json`` with copies of the
+matching malformed fixture, e.g. to measure how the validators scale with errors::
+
+    python3 scripts/generate-context-pack.py --objects 10000 --morphisms 100000 -o /tmp/large.yaml
+    python3 scripts/generate-context-pack.py --objects 1000 --malformed-rate 0.05 --format json -o /tmp/bad.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import random
+import sys
+from pathlib import Path
+from typing import Any, Optional
+
+import yaml
+
+
+ROOT = Path(__file__).resolve().parent.parent
+MALFORMED_FIXTURE_PATH = ROOT / "scripts/fixtures/context-pack-v2-malformed-entries.json"
+
+OBJECT_KINDS = ("entity", "value", "event", "aggregate")
+EFFECT_KINDS = ("read", "write", "write-once", "external-call", "read-export")
+TOOL_PROTOCOLS = ("MCP", "local")
+FIELD_NAMES = ("id", "status", "amount", "owner", "createdAt", "updatedAt", "version", "payloadHash", "note")
+
+
+def _sample(rng: random.Random, ids: list[str], k: int) -> list[str]:
+    return rng.sample(ids, min(k, len(ids)))
+
+
+def generate_pack(
+    version: int = 2,
+    objects: int = 100,
+    morphisms: Optional[int] = None,
+    seed: int = 0,
+    refs_per_entry: int = 3,
+) -> dict[str, Any]:
+    """Return a valid Context Pack with ``objects`` objects and ``morphisms`` morphisms (default: same as objects)."""
+    if version not in (1, 2):
+        raise ValueError(f"Unsupported context_pack_version: {version}")
+    morphisms = objects if morphisms is None else morphisms
+    if min(objects, morphisms, refs_per_entry) < 1:
+        raise ValueError("objects, morphisms and refs_per_entry must be at least 1")
+    rng = random.Random(seed)
+    refs = refs_per_entry
+
+    # Namespaces use distinct prefixes so no id collides across kinds.
+    object_ids = [f"Object{i:06d}" for i in range(objects)]
+    morphism_ids = [f"Morphism{i:06d}" for i in range(morphisms)]
+    diagram_ids = [f"D{i + 1}-synthetic-invariant" for i in range(max(1, objects // 2))]
+    test_ids = [f"AT{i + 1}-synthetic-scenario" for i in range(max(1, len(diagram_ids)))]
+
+    doc: dict[str, Any] = {
+        "version": version,
+        "name": f"synthetic-v{version}-{objects}-objects-{morphisms}-morphisms-seed{seed}",
+        "problem_statement": {
+            "goals": [f"{rng.choice(object_ids)} のライフサイクルを合成的に記述する" for _ in range(3)],
+            "non_goals": ["実運用データの再現"],
+        },
+        "domain_glossary": {
+            "terms": [{"term": object_id, "ja": f"合成概念{i}"} for i, object_id in enumerate(object_ids[: min(objects, 200)])],
+        },
+        "objects": [
+            {
+                "id": object_id,
+                "kind": rng.choice(OBJECT_KINDS),
+                "fields": rng.sample(FIELD_NAMES, rng.randint(2, len(FIELD_NAMES))),
+                **({"states": ["Draft", "Active", "Closed"]} if rng.random() < 0.3 else {}),
+            }
+            for object_id in object_ids
+        ],
+        "morphisms": [
+            {
+                "id": morphism_id,
+                "input": {"target": f"{rng.choice(object_ids)}Id"},
+                "output": {"result": f"{rng.choice(object_ids)}Id"},
+                "pre": [f"{rng.choice(object_ids)}.status == Active"],
+                "post": [f"{rng.choice(object_ids)}.status == Closed"],
+                "failures": rng.sample(["NotFound", "InvalidState", "Timeout", "Conflict"], 2),
+            }
+            for morphism_id in morphism_ids
+        ],
+        "diagrams": [
+            {
+                "id": diagram_id,
+                "statement": f"{' と '.join(_sample(rng, morphism_ids, 2))} の合成は経路によらず一致する",
+                "verification": [f"{test_ids[i % len(test_ids)]} で両経路の結果を比較する"],
+                "involved": {
+                    "objects": _sample(rng, object_ids, refs),
+                    "morphisms": _sample(rng, morphism_ids, refs),
+                },
+            }
+            for i, diagram_id in enumerate(diagram_ids)
+        ],
+        "constraints": {"security": ["監査イベントは追記のみ"], "operations": ["再実行は冪等にする"]},
+        "acceptance_tests": [
+            {
+                "id": test_id,
+                "scenario": " → ".join(_sample(rng, morphism_ids, refs)),
+                "expected": [f"{rng.choice(object_ids)}.status == Closed"],
+            }
+            for test_id in test_ids
+        ],
+        "coding_conventions": {
+            "language": "language-agnostic",
+            "directory": ["src/ (synthetic)"],
+            "dependencies": {"policy": "追加前に合意する"},
+        },
+        "forbidden_changes": [f"{diagram_ids[0]} を満たさない実装変更"],
+    }
+    if version == 1:
+        return doc
+
+    schema_ids = [f"Schema{i:06d}" for i in range(objects)]
+    component_ids = [f"Component{i:05d}" for i in range(max(1, objects // 5))]
+    operation_ids = [f"Effect{i:06d}" for i in range(morphisms)]
+    tool_names = [f"synthetic_tool_{i:04d}" for i in range(max(1, objects // 10))]
+
+    doc["context_pack_version"] = 2
+    doc["data_contracts"] = {
+        "schemas": [
+            {
+                "id": schema_id,
+                "object": object_id,
+                "fields": rng.sample(FIELD_NAMES, 3),
+                "source_of_truth": f"{object_id} store",
+            }
+            for schema_id, object_id in zip(schema_ids, object_ids)
+        ],
+        "mappings": [
+            (
+                {"id": f"Mapping{i:06d}", "source": source, "target": target, "preserves": rng.sample(FIELD_NAMES, 2)}
+                if rng.random() < 0.5
+                else {"id": f"Mapping{i:06d}", "from": f"{source}.id", "to": f"{target}.owner"}
+            )
+            for i, (source, target) in enumerate((rng.choice(schema_ids), rng.choice(schema_ids)) for _ in range(objects))
+        ],
+        "migration_verification": [
+            {"type": "row_count_invariant", "expected": f"{rng.choice(schema_ids)} の件数が一致する"},
+            "foreign key が保存される",
+        ],
+    }
+    doc["open_systems"] = {
+        "components": [
+            {"id": component_id, "boundary": "合成境界", "boundary_in": _sample(rng, morphism_ids, refs)}
+            for component_id in component_ids
+        ],
+        "boundaries": [{"id": f"Boundary{i:05d}", "rule": "公開契約だけで合成する"} for i in range(len(component_ids))],
+        "composition": [
+            {
+                "id": f"Composition{i:05d}",
+                "sequence": _sample(rng, morphism_ids, refs),
+                "participants": _sample(rng, component_ids, 2),
+                "verification": _sample(rng, diagram_ids, 1),
+            }
+            for i in range(max(1, len(component_ids) // 2))
+        ],
+    }
+    doc["views"] = {
+        "lenses_or_optics": [
+            (
+                {"id": f"View{i:06d}", "source": rng.choice(object_ids + schema_ids), "view": f"View{i:06d}DTO"}
+                if rng.random() < 0.5
+                else {"id": f"View{i:06d}", "source": rng.choice(object_ids), "focus": rng.sample(FIELD_NAMES, 2)}
+            )
+            for i in range(max(1, objects // 2))
+        ]
+    }
+    doc["effects"] = {
+        "operations": [
+            {"id": operation_id, "kind": rng.choice(EFFECT_KINDS), "target": rng.choice(component_ids)}
+            for operation_id in operation_ids
+        ],
+        "handlers": [
+            (
+                {"id": f"Handler{i:06d}", "handles": _sample(rng, operation_ids, refs)}
+                if rng.random() < 0.5
+                else {"id": f"Handler{i:06d}", "operation": rng.choice(operation_ids), "retry_policy": "bounded"}
+            )
+            for i in range(max(1, morphisms // 2))
+        ],
+        "effect_safety_notes": ["外部呼び出しには timeout を設定する"],
+    }
+    doc["agent_runtime"] = {
+        "allowed_tools": [
+            {
+                "name": name,
+                "protocol": rng.choice(TOOL_PROTOCOLS),
+                "effect": "ReadRepo",
+                "input_schema_ref": f"schemas/{name}.input.json",
+                "output_schema_ref": f"schemas/{name}.output.json",
+            }
+            for name in tool_names
+        ],
+        "forbidden_tools": ["direct_sql_write", "shell_without_sandbox"],
+        "guardrails": {"input": ["reject_cross_tenant_request"], "output": ["verify_no_secret_exfiltration"]},
+        "trace_evidence": {"required_spans": ["tool_call"], "retention_policy": "project_default"},
+    }
+    doc["resource_constraints"] = {
+        "tool_budget": {"max_tool_calls": 40, "max_ci_minutes": 20},
+        "data_sensitivity": {
+            "pii": {
+                "policy": "合成データのみを扱う",
+                "allowed_tools": _sample(rng, tool_names, refs),
+                "forbidden_tools": ["direct_sql_write"],
+            }
+        },
+        "linear_resources": [
+            {"id": f"Token{i:05d}", "kind": "one_time_token", "rule": ["must_not_duplicate", "must_not_reuse"]}
+            for i in range(max(1, objects // 20))
+        ],
+    }
+    doc["change_semantics"] = {
+        "allowed_refactors": ["extract_pure_function"],
+        "forbidden_conflict_resolutions": ["delete_failing_test"],
+        "merge_invariants": [f"{diagram_id} を満たすこと" for diagram_id in _sample(rng, diagram_ids, refs * 10)],
+    }
+    doc["formalization_level"] = {
+        "metaphor_only": ["合成データは説明用の比喩である"],
+        "machine_checked": [],
+        "tested_by_ci": _sample(rng, test_ids, refs * 10),
+        "reviewed_manually": ["data_contracts.mappings と diagrams の対応づけ"],
+    }
+    return doc
+
+
+def load_malformed_fixtures(path: Path = MALFORMED_FIXTURE_PATH) -> list[dict[str, Any]]:
+    fixtures = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(fixtures, list) or not fixtures:
+        raise ValueError(f"malformed fixture list must be non-empty: {path}")
+    return fixtures
+
+
+def inject_malformed(
+    doc: dict[str, Any],
+    rate: float,
+    seed: int = 0,
+    fixtures: Optional[list[dict[str, Any]]] = None,
+) -> list[tuple[Any, ...]]:
+    """Replace about ``rate`` of the entries each fixture targets with that fixture's value.
+
+    Injected ids get a numeric suffix so they stay unique. Returns the replaced entry paths.
+    """
+    rng = random.Random(seed)
+    injected: list[tuple[Any, ...]] = []
+    for fixture in fixtures if fixtures is not None else load_malformed_fixtures():
+        container: Any = doc
+        for key in fixture["path"]:
+            container = container.get(key) if isinstance(container, dict) else None
+        if not isinstance(container, list):
+            continue
+        for i in range(len(container)):
+            if rng.random() >= rate:
+                continue
+            value = copy.deepcopy(fixture["value"])
+            if isinstance(value, dict) and isinstance(value.get("id"), str):
+                value["id"] = f"{value['id']}_{len(injected)}"
+            container[i] = value
+            injected.append((*fixture["path"], i))
+    return injected
+
+
+def dump(doc: Any, fmt: str) -> str:
+    if fmt == "json":
+        return json.dumps(doc, ensure_ascii=False, indent=2) + "\n"
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    return yaml.dump(doc, Dumper=dumper, allow_unicode=True, sort_keys=False, width=1000)
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Generate a seeded synthetic Context Pack for load testing.")
+    parser.add_argument("--context-pack-version", type=int, choices=(1, 2), default=2, help="Pack version (default: 2)")
+    parser.add_argument("--objects", type=int, default=100, help="Number of objects; other sections scale with it (default: 100)")
+    parser.add_argument("--morphisms", type=int, default=None, help="Number of morphisms and effect operations (default: --objects)")
+    parser.add_argument("--refs-per-entry", type=int, default=3, help="Ids referenced by each referring entry (default: 3)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument(
+        "--malformed-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of the entries targeted by the malformed fixtures to replace (v2 only, default: 0)",
+    )
+    parser.add_argument("--format", choices=("yaml", "json"), default=None, help="Output format (default: from -o suffix, else yaml)")
+    parser.add_argument("-o", "--output", default=None, help="Output file (default: stdout)")
+    args = parser.parse_args(argv)
+    for option, value in (("--objects", args.objects), ("--morphisms", args.morphisms), ("--refs-per-entry", args.refs_per_entry)):
+        if value is not None and value < 1:
+            parser.error(f"{option} must be at least 1")
+    if not 0.0 <= args.malformed_rate <= 1.0:
+        parser.error("--malformed-rate must be between 0 and 1")
+    if args.malformed_rate and args.context_pack_version != 2:
+        parser.error("--malformed-rate requires --context-pack-version 2")
+
+    doc = generate_pack(
+        version=args.context_pack_version,
+        objects=args.objects,
+        morphisms=args.morphisms,
+        seed=args.seed,
+        refs_per_entry=args.refs_per_entry,
+    )
+    injected = inject_malformed(doc, args.malformed_rate, seed=args.seed) if args.malformed_rate else []
+
+    fmt = args.format or ("json" if args.output and args.output.endswith(".json") else "yaml")
+    text = dump(doc, fmt)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    else:
+        sys.stdout.write(text)
+    print(
+        f"✅ Generated Context Pack v{args.context_pack_version}: {len(doc['objects'])} objects, "
+        f"{len(doc['morphisms'])} morphisms, {len(injected)} malformed entries ({len(text.encode('utf-8')):,} bytes)",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,494 @@
+# -*- coding: utf-8 -*-
+"""Single-pass line scanner shared by the Markdown QA checks.
+
+A check is a ``LineRule``: a line-local regex, the files it applies to, and whether
+fenced code blocks are skipped. Rule modules ``register`` their rules; ``scan`` walks
+the tree once, reads each file once, and tests the whole text against one combined
+regex of the file's rules, so files without any candidate match are never split into
+lines. Only files with a candidate are split, with code fences tracked once for all
+fence-aware rules. A rule may supply a literal ``lowercase_prefilter`` to stand in
+for a slow IGNORECASE pattern in the whole-text test.
+
+Rule patterns must match within a single line and must not use ``^``/``$`` anchors
+(they are searched in the whole text before they are applied line by line).
+
+With a manifest (``--incremental``; ``qa-reports/markdown-scan-manifest.json`` by
+default) each file's size, mtime, SHA-256 and findings are recorded per rule. A file
+whose size and mtime are unchanged is not even read, and one whose content hash is
+unchanged is not rescanned. Cached findings of a rule are dropped when its digest
+changes: its id, pattern, flags, ``fingerprint`` (e.g. a digest of its allowlist),
+and the source of the module defining it and of this module.
+
+With ``--jobs`` files are memory-mapped and searched for each rule's
+``bytes_literals``, so files without a candidate are never decoded; only files with a
+candidate are decoded and their matches mapped to lines (by ``scan_text``, so the
+findings are the same as in the default mode). Files are split into chunks handed to
+a process pool, and the chunks' results are yielded in path order.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import hashlib
+import inspect
+import json
+import mmap
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence
+
+from qa_findings import Finding, add_format_argument, open_writer
+
+
+# Directory names never descended into.
+EXCLUDE_DIRS = {
+    ".git",
+    "_site",
+    "vendor",
+    "node_modules",
+    "book-formatter",
+    "qa-reports",
+}
+
+FENCE_RE = re.compile(r"^\s*```")
+
+MANIFEST_VERSION = 1
+# Relative to the scan root.
+DEFAULT_MANIFEST = Path("qa-reports/markdown-scan-manifest.json")
+# Files modified this close to the scan may change again within the same mtime tick,
+# so their mtime is not trusted on the next run (the content hash is checked instead).
+RACY_MTIME_NS = 2_000_000_000
+
+# Files per task handed to a worker process in --jobs mode.
+CHUNK_SIZE = 64
+
+
+@dataclass(frozen=True)
+class LineRule:
+    rule_id: str
+    pattern: re.Pattern[str]
+    # Whether the rule checks a file, given its POSIX path relative to the scan root.
+    applies_to: Callable[[str], bool]
+    # Finding message for a match on a line.
+    message: Callable[[re.Match[str], str], str]
+    # Text output: heading printed before the hits, and the line printed when there are none.
+    header: str
+    ok_message: str
+    skip_fences: bool = False
+    # Optional cheaper stand-in for ``pattern`` when deciding whether a file needs a line
+    # scan: searched in ``text.lower()``, it must match whenever ``pattern`` matches a
+    # line of ``text``. Useful for IGNORECASE patterns, which are slow to search.
+    lowercase_prefilter: Optional[re.Pattern[str]] = None
+    # Byte strings for --jobs mode: ``pattern`` can only match a line of a file whose raw
+    # UTF-8 bytes contain one of them, after ASCII lower-casing if ``bytes_ignorecase``.
+    # Without any, every applicable file is decoded and scanned as text. (Substring
+    # tests are much faster than a bytes regex, especially an IGNORECASE one.)
+    bytes_literals: tuple[bytes, ...] = ()
+    bytes_ignorecase: bool = False
+    # Extra state the rule's results depend on; a change invalidates cached findings.
+    fingerprint: str = ""
+
+
+@dataclass(frozen=True)
+class Hit:
+    rule: LineRule
+    file: str
+    line: int
+    column: int
+    text: str
+    message: str
+
+
+_REGISTRY: dict[str, LineRule] = {}
+
+
+def register(rule: LineRule) -> LineRule:
+    """Add ``rule`` to the registry (replacing a rule with the same id) and return it."""
+    _REGISTRY[rule.rule_id] = rule
+    return rule
+
+
+def registered() -> list[LineRule]:
+    return list(_REGISTRY.values())
+
+
+def iter_files(root: Path, rules: Iterable[LineRule]) -> Iterator[tuple[str, str, tuple[LineRule, ...]]]:
+    """Files under ``root`` with at least one applicable rule, in path order: (path, relative path, rules)."""
+    rules = tuple(rules)
+    top = os.fspath(root)
+    found: list[tuple[list[str], str, str, tuple[LineRule, ...]]] = []
+    for dirpath, dirnames, filenames in os.walk(top):
+        dirnames[:] = [name for name in dirnames if name not in EXCLUDE_DIRS]
+        prefix = os.path.relpath(dirpath, top).replace(os.sep, "/")
+        prefix = "" if prefix == "." else prefix + "/"
+        for name in filenames:
+            rel = prefix + name
+            applicable = tuple(rule for rule in rules if rule.applies_to(rel))
+            if applicable:
+                found.append((rel.split("/"), os.path.join(dirpath, name), rel, applicable))
+    found.sort(key=lambda item: item[0])
+    for _, path, rel, applicable in found:
+        yield path, rel, applicable
+
+
+_COMBINED: dict[tuple[str, ...], tuple[Optional[re.Pattern[str]], Optional[re.Pattern[str]]]] = {}
+
+
+def _alternation(patterns: list[re.Pattern[str]]) -> Optional[re.Pattern[str]]:
+    if not patterns:
+        return None
+    # Scoped inline flags keep each pattern's own flags (e.g. IGNORECASE) inside the alternation.
+    parts = []
+    for pattern in patterns:
+        flags = "i" if pattern.flags & re.IGNORECASE else ""
+        parts.append(f"(?{flags}:{pattern.pattern})")
+    return re.compile("|".join(parts))
+
+
+def _combined(rules: tuple[LineRule, ...]) -> tuple[Optional[re.Pattern[str]], Optional[re.Pattern[str]]]:
+    """(alternation searched in the text, alternation searched in the lower-cased text) for ``rules``."""
+    key = tuple(rule.rule_id for rule in rules)
+    combined = _COMBINED.get(key)
+    if combined is None:
+        combined = _COMBINED[key] = (
+            _alternation([rule.pattern for rule in rules if rule.lowercase_prefilter is None]),
+            _alternation([rule.lowercase_prefilter for rule in rules if rule.lowercase_prefilter is not None]),
+        )
+    return combined
+
+
+def scan_text(rel: str, text: str, rules: tuple[LineRule, ...]) -> Iterator[Hit]:
+    """Hits of ``rules`` in ``text``, by line and then rule order; each rule reports its first match per line."""
+    raw, lowered = _combined(rules)
+    if (raw is None or raw.search(text) is None) and (lowered is None or lowered.search(text.lower()) is None):
+        return
+    track_fences = any(rule.skip_fences for rule in rules)
+    in_fence = False
+    for lineno, line in enumerate(text.splitlines(), start=1):
+        fence_line = False
+        if track_fences and FENCE_RE.match(line):
+            in_fence = not in_fence
+            fence_line = True
+        for rule in rules:
+            if rule.skip_fences and (fence_line or in_fence):
+                continue
+            match = rule.pattern.search(line)
+            if match:
+                yield Hit(rule, rel, lineno, match.start() + 1, line, rule.message(match, line))
+
+
+def _sha256_file(path: str) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def rule_digest(rule: LineRule) -> str:
+    """Identify ``rule`` and the code evaluating it, so cached findings are dropped when either changes."""
+    h = hashlib.sha256()
+    prefilter = rule.lowercase_prefilter.pattern if rule.lowercase_prefilter is not None else ""
+    bytes_literals = repr((rule.bytes_literals, rule.bytes_ignorecase))
+    sources = {inspect.getsourcefile(rule.applies_to), inspect.getsourcefile(rule.message), __file__}
+    for part in (
+        rule.rule_id,
+        rule.pattern.pattern,
+        str(rule.pattern.flags),
+        str(rule.skip_fences),
+        prefilter,
+        bytes_literals,
+        rule.fingerprint,
+        *sorted(_sha256_file(source) for source in sources if source),
+    ):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class ScanManifest:
+    """Per-file stat, content hash and findings per rule, persisted between runs."""
+
+    def __init__(self, path: Path, root: Path, rules: Iterable[LineRule]) -> None:
+        self.path = path
+        self.root = root
+        self.started_ns = time.time_ns()
+        self.digests = {rule.rule_id: rule_digest(rule) for rule in rules}
+        self.rules: dict[str, str] = {}
+        self.files: dict[str, dict[str, Any]] = {}
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            data = None
+        if isinstance(data, dict) and data.get("version") == MANIFEST_VERSION and data.get("root") == str(root):
+            self.rules = data.get("rules", {})
+            self.files = {
+                rel: entry
+                for rel, entry in data.get("files", {}).items()
+                if isinstance(entry, dict) and isinstance(entry.get("results"), dict)
+            }
+        stale = {rule_id for rule_id, digest in self.digests.items() if self.rules.get(rule_id) != digest}
+        if stale:
+            for entry in self.files.values():
+                for rule_id in stale:
+                    entry["results"].pop(rule_id, None)
+        self.rules.update(self.digests)
+        self.seen: set[str] = set()
+        self.dirty = bool(stale)
+
+    def scan_file(self, path: str, rel: str, rules: tuple[LineRule, ...]) -> Iterator[Hit]:
+        self.seen.add(rel)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        entry = self.files.get(rel)
+        cached = entry is not None and all(rule.rule_id in entry["results"] for rule in rules)
+        if cached and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            yield from self._cached_hits(entry, rel, rules)
+            return
+
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return
+        self.dirty = True
+        digest = hashlib.sha256(data).hexdigest()
+        if entry is None or entry["sha256"] != digest:
+            entry = {"results": {}}
+        entry.update(
+            size=st.st_size,
+            mtime_ns=st.st_mtime_ns if st.st_mtime_ns < self.started_ns - RACY_MTIME_NS else None,
+            sha256=digest,
+        )
+        self.files[rel] = entry
+        missing = tuple(rule for rule in rules if rule.rule_id not in entry["results"])
+        if missing:
+            for rule in missing:
+                entry["results"][rule.rule_id] = []
+            try:
+                text = data.decode("utf-8")
+            except UnicodeDecodeError:
+                # Non-UTF-8 files are out of scope for the line checks.
+                text = ""
+            for hit in scan_text(rel, text, missing):
+                entry["results"][hit.rule.rule_id].append([hit.line, hit.column, hit.text, hit.message])
+        yield from self._cached_hits(entry, rel, rules)
+
+    @staticmethod
+    def _cached_hits(entry: dict[str, Any], rel: str, rules: tuple[LineRule, ...]) -> Iterator[Hit]:
+        order = {rule.rule_id: i for i, rule in enumerate(rules)}
+        hits = [
+            Hit(rule, rel, line, column, text, message)
+            for rule in rules
+            for line, column, text, message in entry["results"][rule.rule_id]
+        ]
+        hits.sort(key=lambda hit: (hit.line, order[hit.rule.rule_id]))
+        yield from hits
+
+    def save(self) -> None:
+        """Write the manifest if anything changed, dropping files that no longer exist."""
+        files = {
+            rel: entry for rel, entry in self.files.items() if rel in self.seen or (self.root / rel).exists()
+        }
+        if not self.dirty and len(files) == len(self.files):
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=self.path.parent)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(
+                    json.dumps(
+                        {"version": MANIFEST_VERSION, "root": str(self.root), "rules": self.rules, "files": files},
+                        ensure_ascii=False,
+                    )
+                )
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_name)
+            raise
+
+
+def scan_mapped(path: str, rel: str, rules: tuple[LineRule, ...]) -> list[Hit]:
+    """Hits of ``rules`` in the file at ``path``, searching its memory-mapped bytes before decoding it."""
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                lowered: Optional[bytes] = None
+                candidates = []
+                for rule in rules:
+                    if not rule.bytes_literals:
+                        candidates.append(rule)
+                        continue
+                    if rule.bytes_ignorecase:
+                        if lowered is None:
+                            lowered = buf[:].lower()
+                        found = any(literal in lowered for literal in rule.bytes_literals)
+                    else:
+                        found = any(buf.find(literal) >= 0 for literal in rule.bytes_literals)
+                    if found:
+                        candidates.append(rule)
+                if not candidates:
+                    return []
+                text = buf[:].decode("utf-8")
+    except (OSError, ValueError):
+        # Unreadable, or not UTF-8 (UnicodeDecodeError): out of scope for the line checks.
+        return []
+    return list(scan_text(rel, text, tuple(candidates)))
+
+
+def _rule_sources(rules: Sequence[LineRule]) -> list[tuple[str, str, str]]:
+    """(rule id, module name, source path) of the module defining each rule, for worker processes."""
+    sources = []
+    for rule in rules:
+        module = rule.applies_to.__module__
+        path = inspect.getsourcefile(rule.applies_to)
+        if path is not None:
+            if module == "__main__":
+                module = f"markdown_rules_{Path(path).stem.replace('-', '_')}"
+            sources.append((rule.rule_id, module, path))
+    return sources
+
+
+def _init_worker(sources: list[tuple[str, str, str]]) -> None:
+    """Register the rules in a worker process that did not inherit them (spawn start method)."""
+    from script_loader import load_script_module
+
+    for rule_id, module_name, path in sources:
+        if rule_id not in _REGISTRY:
+            load_script_module(module_name, Path(path))
+
+
+def _scan_chunk(chunk: list[tuple[str, str, tuple[str, ...]]]) -> list[tuple[str, str, int, int, str, str]]:
+    """Worker task: (rule id, file, line, column, text, message) of each hit in ``chunk``."""
+    return [
+        (hit.rule.rule_id, hit.file, hit.line, hit.column, hit.text, hit.message)
+        for path, rel, rule_ids in chunk
+        for hit in scan_mapped(path, rel, tuple(_REGISTRY[rule_id] for rule_id in rule_ids))
+    ]
+
+
+def scan_parallel(root: Path, rules: tuple[LineRule, ...], jobs: int) -> Iterator[Hit]:
+    """``scan`` in --jobs mode: memory-mapped files, in chunks on ``jobs`` processes, in path order.
+
+    The rules must be registered, from a module importable by path in a fresh process.
+    """
+    files = list(iter_files(root, rules))
+    if jobs <= 1:
+        for path, rel, applicable in files:
+            yield from scan_mapped(path, rel, applicable)
+        return
+    by_id = {rule.rule_id: rule for rule in rules}
+    chunks = [
+        [(path, rel, tuple(rule.rule_id for rule in applicable)) for path, rel, applicable in files[i : i + CHUNK_SIZE]]
+        for i in range(0, len(files), CHUNK_SIZE)
+    ]
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(_rule_sources(rules),)) as executor:
+        # map() yields the chunks' results in submission order, whichever worker finishes first.
+        for results in executor.map(_scan_chunk, chunks):
+            for rule_id, rel, line, column, text, message in results:
+                yield Hit(by_id[rule_id], rel, line, column, text, message)
+
+
+def scan(
+    root: Path,
+    rules: Optional[Iterable[LineRule]] = None,
+    manifest: Optional[Path] = None,
+    jobs: Optional[int] = None,
+) -> Iterator[Hit]:
+    """Hits of ``rules`` (default: every registered rule) in every file under ``root``, in path order.
+
+    With ``manifest``, unchanged files are answered from it and it is rewritten once
+    the scan has been consumed completely. With ``jobs``, files are memory-mapped and
+    scanned on that many processes (see ``scan_parallel``); it cannot be combined with
+    ``manifest``.
+    """
+    rules = tuple(registered() if rules is None else rules)
+    if jobs is not None:
+        if manifest is not None:
+            raise ValueError("jobs cannot be combined with a manifest")
+        yield from scan_parallel(root, rules, jobs)
+        return
+    if manifest is None:
+        for path, rel, applicable in iter_files(root, rules):
+            try:
+                with open(path, "rb") as f:
+                    text = f.read().decode("utf-8")
+            except (OSError, UnicodeDecodeError):
+                # Non-UTF-8 files are out of scope for the line checks.
+                continue
+            yield from scan_text(rel, text, applicable)
+        return
+
+    cache = ScanManifest(manifest, root, rules)
+    for path, rel, applicable in iter_files(root, rules):
+        yield from cache.scan_file(path, rel, applicable)
+    cache.save()
+
+
+def main(argv: list[str], rules: list[LineRule], root: Path, tool: str, description: str) -> int:
+    """Command-line entry point shared by the Markdown checks: scan ``root`` once for all ``rules``."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=f"Rescan only files changed since the last run, recorded in {DEFAULT_MANIFEST.as_posix()}",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        default=None,
+        help="Manifest path for --incremental (implies --incremental)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Memory-map files and scan their bytes on JOBS worker processes (0: CPU count)",
+    )
+    add_format_argument(parser)
+    args = parser.parse_args(argv)
+
+    manifest = args.manifest if args.manifest is not None else (root / DEFAULT_MANIFEST if args.incremental else None)
+    if args.jobs is not None and manifest is not None:
+        parser.error("--jobs cannot be combined with --incremental/--manifest")
+    jobs = None if args.jobs is None else (args.jobs if args.jobs > 0 else (os.cpu_count() or 1))
+    writer = open_writer(args.format, tool)
+    hits: dict[str, list[Hit]] = {rule.rule_id: [] for rule in rules}
+    try:
+        for hit in scan(root, rules, manifest=manifest, jobs=jobs):
+            if writer is not None:
+                writer.write(
+                    Finding(
+                        rule_id=hit.rule.rule_id,
+                        message=hit.message,
+                        file=hit.file,
+                        line=hit.line,
+                        column=hit.column,
+                    )
+                )
+            hits[hit.rule.rule_id].append(hit)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    failed = False
+    for rule in rules:
+        rule_hits = hits[rule.rule_id]
+        if rule_hits:
+            failed = True
+            if writer is None:
+                print(rule.header, file=sys.stderr)
+                for hit in rule_hits:
+                    print(f"- {hit.file}:{hit.line}: {hit.text}", file=sys.stderr)
+        elif writer is None:
+            print(rule.ok_message)
+    return 1 if failed else 0
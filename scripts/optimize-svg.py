@@ -0,0 +1,629 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Minify the SVG assets of the book in place.
+
+Each SVG is parsed and written back without what does not change how it renders:
+comments, processing instructions and the XML declaration, editor metadata
+(``<metadata>`` and Inkscape/Sodipodi/Illustrator/Sketch elements and attributes),
+whitespace between elements (text content is kept as written), attributes set to
+their initial value, and duplicate ``<defs>`` entries (references to a duplicate are
+pointed at the first copy). Decimal coordinates are rounded to ``--precision``
+places, and stylesheets are stripped of comments and insignificant whitespace
+(quoted strings are kept as written).
+
+Ids are kept: a page embedding the SVG, or a URL fragment, may refer to one, and
+only references from within the file can be seen. ``--remove-unused-ids`` drops the
+ids nothing in the file refers to, for SVGs known not to be referred to from outside.
+
+The bytes saved are reported per file. Files with the same content under different
+names are reported as identical, and files that minify to the same SVG as
+equivalent.
+
+With a manifest (``qa-reports/svg-optimize-manifest.json`` by default), files whose
+content hash matches the last run's are not parsed again. ``--check`` writes nothing,
+not even the manifest, and fails when a file is not minified. ``--self-test`` runs the optimizer on the
+regression cases in ``SELF_TEST_CASES``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import copy
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from qa_findings import Finding, add_format_argument, open_writer
+
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_PATHS = ("assets/images",)
+DEFAULT_MANIFEST = Path("qa-reports/svg-optimize-manifest.json")
+MANIFEST_VERSION = 1
+DEFAULT_PRECISION = 3
+
+RULE_NOT_OPTIMIZED = "svg-optimize/not-optimized"
+RULE_DUPLICATE = "svg-optimize/duplicate"
+RULE_INVALID = "svg-optimize/invalid"
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+XML_NS = "http://www.w3.org/XML/1998/namespace"
+EDITOR_NAMESPACES = frozenset(
+    {
+        "http://www.inkscape.org/namespaces/inkscape",
+        "http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd",
+        "http://ns.adobe.com/AdobeIllustrator/10.0/",
+        "http://ns.adobe.com/AdobeSVGViewerExtensions/3.0/",
+        "http://ns.adobe.com/Graphs/1.0/",
+        "http://ns.adobe.com/Variables/1.0/",
+        "http://ns.adobe.com/SaveForWeb/1.0/",
+        "http://ns.adobe.com/Extensibility/1.0/",
+        "http://ns.adobe.com/Flows/1.0/",
+        "http://ns.adobe.com/ImageReplacement/1.0/",
+        "http://ns.adobe.com/GenericCustomNamespace/1.0/",
+        "http://ns.adobe.com/XPath/1.0/",
+        "http://www.bohemiancoding.com/sketch/ns",
+        "http://www.serif.com/",
+        "http://purl.org/dc/elements/1.1/",
+        "http://creativecommons.org/ns#",
+        "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    }
+)
+
+# Elements whose character data is rendered (or is a stylesheet), so whitespace in
+# and around their children is significant.
+TEXT_ELEMENTS = frozenset({"text", "tspan", "textPath", "title", "desc", "style", "script"})
+
+# Attributes of number lists; their decimals are rounded. Path data (``d``) is read
+# by ``minify_path``.
+NUMERIC_ATTRIBUTES = frozenset(
+    {
+        "x", "y", "width", "height", "cx", "cy", "r", "rx", "ry", "x1", "y1", "x2", "y2", "dx", "dy",
+        "fx", "fy", "points", "viewBox", "transform", "refX", "refY", "markerWidth", "markerHeight",
+    }
+)
+
+# (element, attribute) -> initial value, for attributes that are not inherited, so an
+# attribute at its initial value can be dropped whatever its ancestors set. None
+# stands for any element.
+INITIAL_VALUES = {
+    (None, "opacity"): "1",
+    **{(tag, attr): "0" for tag in ("rect", "image", "use", "foreignObject") for attr in ("x", "y")},
+    **{(tag, attr): "0" for tag in ("circle", "ellipse") for attr in ("cx", "cy")},
+    **{("line", attr): "0" for attr in ("x1", "y1", "x2", "y2")},
+}
+# Attributes dropped when empty.
+EMPTY_DROPPABLE = frozenset({"class", "style", "transform"})
+
+NUMBER_RE = re.compile(r"[-+]?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][-+]?\d+)?")
+PATH_COMMANDS = frozenset("MmZzLlHhVvCcSsQqTtAa")
+# Arguments per arc segment, and the positions of its large-arc and sweep flags: a
+# flag is one digit, which editors pack with what follows ("a5 5 0 015.5 5").
+ARC_ARGUMENTS = 7
+ARC_FLAGS = frozenset({3, 4})
+URL_REF_RE = re.compile(r"url\(\s*['\"]?#([^)'\"\s]+)['\"]?\s*\)")
+CSS_ID_RE = re.compile(r"#([A-Za-z_][\w-]*)")
+# Quoted strings are matched first, so comments and whitespace inside them are left alone.
+CSS_STRING = r"\"(?:[^\"\\]|\\.)*\"|'(?:[^'\\]|\\.)*'"
+CSS_COMMENT_RE = re.compile(rf"({CSS_STRING})|/\*.*?\*/", re.DOTALL)
+# Groups: 1 string, 2 closing brace (a last ";" before it is dropped), 3 other punctuation.
+CSS_SPACE_RE = re.compile(rf"({CSS_STRING})|\s*(?:;\s*)?(}})\s*|\s*([{{;,])\s*|:\s+|\s+", re.DOTALL)
+
+ET.register_namespace("", SVG_NS)
+ET.register_namespace("xlink", XLINK_NS)
+
+
+class SvgError(ValueError):
+    pass
+
+
+def _split(tag: str) -> tuple[str, str]:
+    """(namespace, local name) of an ElementTree tag or attribute name."""
+    if tag.startswith("{"):
+        namespace, _, local = tag[1:].partition("}")
+        return namespace, local
+    return "", tag
+
+
+def _local(tag: str) -> str:
+    return _split(tag)[1]
+
+
+def format_number(token: str, precision: int) -> str:
+    """``token`` rounded to ``precision`` decimal places, shortest form. Integers are
+    kept as written: in path data, arc flags may be packed into one run of digits."""
+    if "." not in token and "e" not in token and "E" not in token:
+        return token
+    text = f"{round(float(token), precision):.{precision}f}".rstrip("0").rstrip(".")
+    if text in ("", "-0"):
+        return "0"
+    if text.startswith("0."):
+        return text[1:]
+    if text.startswith("-0."):
+        return "-" + text[2:]
+    return text
+
+
+def _join_number(out: list[str], token: str, precision: int, following: str) -> None:
+    """Append ``token`` rounded to ``out``, with a space when rounding dropped the
+    decimal point a ``following`` ".5" would otherwise run into."""
+    text = format_number(token, precision)
+    out.append(text)
+    if following == "." and "." not in text:
+        out.append(" ")
+
+
+def _collapse_separators(value: str) -> str:
+    return re.sub(r"\s*,\s*", ",", " ".join(value.split()))
+
+
+def minify_numbers(value: str, precision: int) -> str:
+    out: list[str] = []
+    pos = 0
+    for match in NUMBER_RE.finditer(value):
+        out.append(value[pos : match.start()])
+        _join_number(out, match.group(0), precision, value[match.end() : match.end() + 1])
+        pos = match.end()
+    out.append(value[pos:])
+    return _collapse_separators("".join(out))
+
+
+def minify_path(d: str, precision: int) -> str:
+    """Path data ``d`` with its numbers rounded, arc flags kept as single digits.
+
+    The data is read command by command, as a renderer does: ``NUMBER_RE`` alone would
+    read the packed flags and coordinate of ``a5 5 0 015.5 5`` as ``015.5``. Data that
+    does not parse is only stripped of extra whitespace.
+    """
+    out: list[str] = []
+    command = ""
+    argument = 0
+    pos = 0
+    while pos < len(d):
+        char = d[pos]
+        if char in PATH_COMMANDS:
+            command, argument = char, 0
+            out.append(char)
+            pos += 1
+        elif char.isspace() or char == ",":
+            out.append(char)
+            pos += 1
+        elif command in ("a", "A") and argument % ARC_ARGUMENTS in ARC_FLAGS:
+            if char not in "01":
+                return _collapse_separators(d)
+            out.append(char)
+            argument += 1
+            pos += 1
+        else:
+            match = NUMBER_RE.match(d, pos)
+            if match is None:
+                return _collapse_separators(d)
+            _join_number(out, match.group(0), precision, d[match.end() : match.end() + 1])
+            argument += 1
+            pos = match.end()
+    return _collapse_separators("".join(out))
+
+
+def _css_space(match: re.Match[str]) -> str:
+    string, brace, punctuation = match.groups()
+    if string is not None:
+        return string
+    if brace is not None:
+        return brace
+    if punctuation is not None:
+        return punctuation
+    return ":" if match.group(0)[0] == ":" else " "
+
+
+def minify_css(css: str) -> str:
+    """``css`` without comments and insignificant whitespace; quoted strings are kept as written."""
+    css = CSS_COMMENT_RE.sub(lambda match: match.group(1) or "", css)
+    return CSS_SPACE_RE.sub(_css_space, css).strip()
+
+
+def _references(root: ET.Element) -> set[str]:
+    """Ids referenced from within the document."""
+    refs: set[str] = set()
+    for element in root.iter():
+        for name, value in element.attrib.items():
+            local = _local(name)
+            refs.update(URL_REF_RE.findall(value))
+            if local == "href" and value.startswith("#"):
+                refs.add(value[1:])
+            elif local in ("aria-labelledby", "aria-describedby"):
+                refs.update(value.split())
+        if _local(element.tag) == "style" and element.text:
+            refs.update(CSS_ID_RE.findall(element.text))
+    return refs
+
+
+def _retarget(root: ET.Element, renamed: dict[str, str]) -> None:
+    """Point references to the ids in ``renamed`` at their replacements."""
+
+    def url(match: re.Match[str]) -> str:
+        target = renamed.get(match.group(1))
+        return f"url(#{target})" if target is not None else match.group(0)
+
+    for element in root.iter():
+        for name, value in element.attrib.items():
+            if "url(" in value:
+                element.set(name, URL_REF_RE.sub(url, value))
+            if _local(name) == "href" and value.startswith("#") and value[1:] in renamed:
+                element.set(name, "#" + renamed[value[1:]])
+        if _local(element.tag) == "style" and element.text and "url(" in element.text:
+            element.text = URL_REF_RE.sub(url, element.text)
+
+
+def _collapse_duplicate_defs(root: ET.Element) -> None:
+    """Remove ``<defs>`` entries identical but for their id to an earlier one, in any
+    ``<defs>`` of the document, and the ``<defs>`` left empty."""
+    renamed: dict[str, str] = {}
+    # Serialized entry without its id -> id of its first copy.
+    first: dict[bytes, str] = {}
+    parents = [(parent, child) for parent in root.iter() for child in parent if child.tag == f"{{{SVG_NS}}}defs"]
+    for parent, defs in parents:
+        removed = False
+        for child in list(defs):
+            element_id = child.get("id")
+            if element_id is None:
+                continue
+            anonymous = copy.deepcopy(child)
+            del anonymous.attrib["id"]
+            key = ET.tostring(anonymous)
+            if key in first:
+                renamed[element_id] = first[key]
+                defs.remove(child)
+                removed = True
+            else:
+                first[key] = element_id
+        if removed and not len(defs):
+            parent.remove(defs)
+    if renamed:
+        _retarget(root, renamed)
+
+
+def _strip(element: ET.Element, precision: int, in_text: bool) -> None:
+    """Drop editor markup, insignificant whitespace and redundant attributes below ``element``."""
+    local = _local(element.tag)
+    preserve = element.get(f"{{{XML_NS}}}space") == "preserve"
+    in_text = in_text or preserve or local in TEXT_ELEMENTS
+    for name in list(element.attrib):
+        namespace, attr = _split(name)
+        value = element.attrib[name]
+        if namespace in EDITOR_NAMESPACES or (attr in EMPTY_DROPPABLE and not value.strip()):
+            del element.attrib[name]
+            continue
+        if namespace:
+            continue
+        if attr == "d":
+            value = minify_path(value, precision)
+            element.set(name, value)
+        elif attr in NUMERIC_ATTRIBUTES:
+            value = minify_numbers(value, precision)
+            element.set(name, value)
+        if INITIAL_VALUES.get((local, attr), INITIAL_VALUES.get((None, attr))) == value.strip():
+            del element.attrib[name]
+    if local == "style" and element.text and not len(element):
+        element.text = minify_css(element.text)
+    elif not in_text and element.text is not None and not element.text.strip():
+        element.text = None
+    for child in list(element):
+        namespace, child_local = _split(child.tag)
+        if not isinstance(child.tag, str) or namespace in EDITOR_NAMESPACES or (namespace == SVG_NS and child_local == "metadata"):
+            # Keep the text after a removed element where it is rendered.
+            if in_text and child.tail:
+                previous = _previous(element, child)
+                if previous is None:
+                    element.text = (element.text or "") + child.tail
+                else:
+                    previous.tail = (previous.tail or "") + child.tail
+            element.remove(child)
+            continue
+        if not in_text and child.tail is not None and not child.tail.strip():
+            child.tail = None
+        _strip(child, precision, in_text)
+
+
+def _previous(parent: ET.Element, child: ET.Element) -> Optional[ET.Element]:
+    children = list(parent)
+    index = children.index(child)
+    return children[index - 1] if index > 0 else None
+
+
+def optimize(data: bytes, precision: int = DEFAULT_PRECISION, remove_unused_ids: bool = False) -> bytes:
+    """The minified form of the SVG document ``data``.
+
+    With ``remove_unused_ids``, ids not referred to from within the document are
+    dropped; references from outside it (a page's CSS, a URL fragment) are not seen.
+    """
+    parser = ET.XMLParser(target=ET.TreeBuilder(insert_comments=False, insert_pis=False))
+    try:
+        root = ET.fromstring(data, parser=parser)
+    except ET.ParseError as exc:
+        raise SvgError(f"not well-formed XML: {exc}") from exc
+    if _local(root.tag) != "svg":
+        raise SvgError(f"root element is <{_local(root.tag)}>, not <svg>")
+    root.tail = None
+    _strip(root, precision, in_text=False)
+    root.attrib.pop("version", None)
+    _collapse_duplicate_defs(root)
+    if remove_unused_ids:
+        refs = _references(root)
+        for element in root.iter():
+            if element.get("id") is not None and element.get("id") not in refs:
+                del element.attrib["id"]
+    text = ET.tostring(root, encoding="unicode").replace(" />", "/>")
+    return (text + "\n").encode("utf-8")
+
+
+# (name, SVG, minified SVG) regressions for --self-test.
+SELF_TEST_CASES = (
+    (
+        "packed arc flags",
+        '<svg xmlns="http://www.w3.org/2000/svg"><path d="M10 10a5 5 0 015.5 5"/></svg>',
+        '<svg xmlns="http://www.w3.org/2000/svg"><path d="M10 10a5 5 0 015.5 5"/></svg>\n',
+    ),
+    (
+        "packed arc flags after rounding",
+        '<svg xmlns="http://www.w3.org/2000/svg"><path d="M0 0A1.23456 1 0 1110.00001.5l.1234.5"/></svg>',
+        '<svg xmlns="http://www.w3.org/2000/svg"><path d="M0 0A1.235 1 0 1110 .5l.123.5"/></svg>\n',
+    ),
+    (
+        "implicit arc repeat",
+        '<svg xmlns="http://www.w3.org/2000/svg"><path d="M0 0a1 1 0 0 1 2 2 1 1 0 102 2"/></svg>',
+        '<svg xmlns="http://www.w3.org/2000/svg"><path d="M0 0a1 1 0 0 1 2 2 1 1 0 102 2"/></svg>\n',
+    ),
+    (
+        "duplicate defs across defs elements",
+        '<svg xmlns="http://www.w3.org/2000/svg"><defs><path id="a" d="M0 0"/></defs>'
+        '<defs><path id="b" d="M0 0"/></defs><use href="#b"/></svg>',
+        '<svg xmlns="http://www.w3.org/2000/svg"><defs><path id="a" d="M0 0"/></defs><use href="#a"/></svg>\n',
+    ),
+    (
+        "quoted CSS string",
+        '<svg xmlns="http://www.w3.org/2000/svg"><style>text { font-family: "Noto  Sans" ; }</style></svg>',
+        '<svg xmlns="http://www.w3.org/2000/svg"><style>text{font-family:"Noto  Sans"}</style></svg>\n',
+    ),
+)
+
+
+def self_test() -> list[str]:
+    """Names of the ``SELF_TEST_CASES`` the optimizer gets wrong, with what it wrote."""
+    failures = []
+    for name, svg, expected in SELF_TEST_CASES:
+        actual = optimize(svg.encode("utf-8")).decode("utf-8")
+        if actual != expected:
+            failures.append(f"{name}: {actual.strip()}")
+    return failures
+
+
+def optimizer_digest(precision: int, remove_unused_ids: bool) -> str:
+    """Identify this optimizer and its settings, so recorded results are dropped when either changes."""
+    h = hashlib.sha256(Path(__file__).read_bytes())
+    h.update(f"\0{precision}\0{remove_unused_ids}".encode("utf-8"))
+    return h.hexdigest()
+
+
+@dataclass(frozen=True)
+class Result:
+    path: str
+    sha256: str
+    size: int
+    # Digest and size of the minified form.
+    optimized_sha256: str
+    optimized_size: int
+    # The minified bytes, when computed in this run and different from the file.
+    optimized: Optional[bytes] = None
+
+
+class OptimizeManifest:
+    """Per-file content hash and minified digest, persisted between runs."""
+
+    def __init__(self, path: Optional[Path], digest: str) -> None:
+        self.path = path
+        self.digest = digest
+        self.files: dict[str, dict[str, Any]] = {}
+        self.dirty = False
+        if path is None:
+            return
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            data = None
+        if isinstance(data, dict) and data.get("version") == MANIFEST_VERSION and data.get("optimizer") == digest:
+            self.files = {rel: entry for rel, entry in data.get("files", {}).items() if isinstance(entry, dict)}
+
+    def lookup(self, rel: str, sha256: str) -> Optional[dict[str, Any]]:
+        entry = self.files.get(rel)
+        return entry if entry is not None and entry.get("sha256") == sha256 else None
+
+    def record(self, result: Result) -> None:
+        entry = {
+            "sha256": result.sha256,
+            "size": result.size,
+            "optimized_sha256": result.optimized_sha256,
+            "optimized_size": result.optimized_size,
+        }
+        if self.files.get(result.path) != entry:
+            self.files[result.path] = entry
+            self.dirty = True
+
+    def save(self, seen: Iterable[str]) -> None:
+        """Write the manifest if anything changed, keeping only the files seen in this run."""
+        if self.path is None:
+            return
+        files = {rel: self.files[rel] for rel in sorted(seen) if rel in self.files}
+        if not self.dirty and len(files) == len(self.files):
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=self.path.parent)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"version": MANIFEST_VERSION, "optimizer": self.digest, "files": files}))
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_name)
+            raise
+
+
+def process(
+    path: Path, rel: str, manifest: OptimizeManifest, precision: int, remove_unused_ids: bool
+) -> tuple[Result, bool]:
+    """(result, whether it came from the manifest) for one file."""
+    data = path.read_bytes()
+    sha256 = hashlib.sha256(data).hexdigest()
+    entry = manifest.lookup(rel, sha256)
+    if entry is not None:
+        return Result(rel, sha256, len(data), entry["optimized_sha256"], entry["optimized_size"]), True
+    optimized = optimize(data, precision, remove_unused_ids)
+    result = Result(
+        rel,
+        sha256,
+        len(data),
+        hashlib.sha256(optimized).hexdigest(),
+        len(optimized),
+        optimized if optimized != data else None,
+    )
+    return result, False
+
+
+def iter_svgs(root: Path, paths: Iterable[str]) -> list[tuple[Path, str]]:
+    """(path, path relative to ``root``) of the SVG files at or below ``paths``, sorted."""
+    found: dict[str, Path] = {}
+    for name in paths:
+        path = Path(name) if Path(name).is_absolute() else root / name
+        candidates = [path] if path.is_file() else sorted(path.rglob("*.svg"))
+        for candidate in candidates:
+            try:
+                rel = candidate.resolve().relative_to(root).as_posix()
+            except ValueError:
+                rel = candidate.as_posix()
+            found[rel] = candidate
+    return [(found[rel], rel) for rel in sorted(found)]
+
+
+def duplicates(results: list[Result]) -> list[tuple[str, list[str]]]:
+    """("identical" or "equivalent", paths) for each group of files with the same content."""
+    by_content: dict[str, list[Result]] = defaultdict(list)
+    for result in results:
+        by_content[result.optimized_sha256].append(result)
+    groups = []
+    for group in by_content.values():
+        if len(group) > 1:
+            kind = "identical" if len({result.sha256 for result in group}) == 1 else "equivalent"
+            groups.append((kind, [result.path for result in group]))
+    return groups
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Minify SVG assets in place and report duplicates.")
+    parser.add_argument("paths", nargs="*", default=list(DEFAULT_PATHS), help="SVG files or directories (default: assets/images)")
+    parser.add_argument("--check", action="store_true", help="Write nothing; fail when a file is not minified")
+    parser.add_argument(
+        "--precision",
+        type=int,
+        default=DEFAULT_PRECISION,
+        help=f"Decimal places coordinates are rounded to (default: {DEFAULT_PRECISION})",
+    )
+    parser.add_argument(
+        "--remove-unused-ids",
+        action="store_true",
+        help="Drop ids nothing in the file refers to; only for SVGs no page or URL refers into",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        default=None,
+        help=f"Hash manifest of the last run (default: {DEFAULT_MANIFEST.as_posix()})",
+    )
+    parser.add_argument("--no-manifest", action="store_true", help="Process every file, without reading or writing a manifest")
+    parser.add_argument("--self-test", action="store_true", help="Run the optimizer's regression cases and exit")
+    add_format_argument(parser)
+    args = parser.parse_args(argv)
+
+    if args.self_test:
+        failures = self_test()
+        for failure in failures:
+            print(f"❌ Self-test failed: {failure}", file=sys.stderr)
+        if failures:
+            return 1
+        print(f"✅ SVG optimizer self-test passed ({len(SELF_TEST_CASES)} cases).")
+        return 0
+
+    manifest_path = None if args.no_manifest else (args.manifest if args.manifest is not None else ROOT / DEFAULT_MANIFEST)
+    manifest = OptimizeManifest(manifest_path, optimizer_digest(args.precision, args.remove_unused_ids))
+    files = iter_svgs(ROOT, args.paths)
+
+    writer = open_writer(args.format, "optimize-svg")
+    results: list[Result] = []
+    errors = 0
+    skipped = 0
+    try:
+        for path, rel in files:
+            try:
+                result, cached = process(path, rel, manifest, args.precision, args.remove_unused_ids)
+            except (OSError, SvgError) as exc:
+                errors += 1
+                if writer is not None:
+                    writer.write(Finding(rule_id=RULE_INVALID, message=str(exc), file=rel))
+                else:
+                    print(f"❌ {rel}: {exc}", file=sys.stderr)
+                continue
+            results.append(result)
+            skipped += cached
+            if result.optimized_sha256 == result.sha256:
+                # Already minified: record it so the next run skips it.
+                manifest.record(result)
+                continue
+            saved = result.size - result.optimized_size
+            message = f"{result.size:,} -> {result.optimized_size:,} bytes ({-saved / result.size:+.1%})"
+            if args.check:
+                errors += 1
+                if writer is not None:
+                    writer.write(Finding(rule_id=RULE_NOT_OPTIMIZED, message=f"not minified: {message}", file=rel))
+                else:
+                    print(f"❌ {rel}: not minified: {message}", file=sys.stderr)
+                continue
+            assert result.optimized is not None
+            path.write_bytes(result.optimized)
+            manifest.record(
+                Result(rel, result.optimized_sha256, result.optimized_size, result.optimized_sha256, result.optimized_size)
+            )
+            if writer is None:
+                print(f"{rel}: {message}")
+
+        for kind, paths in duplicates(results):
+            message = f"{kind} SVGs: {', '.join(paths)}"
+            if writer is not None:
+                writer.write(Finding(rule_id=RULE_DUPLICATE, message=message, file=paths[0], level="warning"))
+            else:
+                print(f"⚠️ {message}", file=sys.stderr)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if not args.check:
+        manifest.save(rel for _, rel in files)
+    if errors:
+        return 1
+    if writer is None:
+        before = sum(result.size for result in results)
+        after = sum(result.optimized_size for result in results)
+        verb = "are minified" if args.check else f"minified; saved {before - after:,} bytes"
+        print(f"✅ {len(results)} SVG files {verb} ({skipped} unchanged since the last run).")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Write precompressed ``.gz`` siblings for the text files of the Jekyll build.
+
+Runs on the build output (``_site``) after ``jekyll build``: every HTML, CSS, JS,
+SVG and JSON file of at least ``--min-size`` bytes gets a ``<file>.gz`` next to it,
+compressed at the maximum zlib level, so a server that serves precompressed files
+(e.g. nginx ``gzip_static``) never compresses on the fly. The ``.gz`` files are
+reproducible: no file name and a zero mtime in the gzip header. A sibling is not
+written when compression does not make the file smaller, and stale siblings are
+removed.
+
+Compressed files are cached in ``.cache/gzip/`` by the SHA-256 of their source, so
+unchanged files are not compressed again across builds; entries no file of the
+current build uses are removed after each run, so the cache stays the size of one
+build. Files are compressed on a
+thread pool (zlib releases the GIL). ``--report`` writes every file's compression
+ratio as JSON.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CACHE_DIR = ROOT / ".cache/gzip"
+
+EXTENSIONS = (".html", ".css", ".js", ".svg", ".json")
+DEFAULT_MIN_SIZE = 1024
+GZIP_LEVEL = 9
+
+
+@dataclass(frozen=True)
+class Compressed:
+    # Path of the source relative to the site root.
+    path: str
+    # SHA-256 of the source, its cache key.
+    sha256: str
+    size: int
+    # None when compression does not make the file smaller.
+    gzip_size: Optional[int]
+    cached: bool
+
+
+def compress(data: bytes) -> bytes:
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def precompress_file(site_root: Path, relative: str, cache_dir: Optional[Path]) -> Compressed:
+    """Write (or remove) the ``.gz`` sibling of one file."""
+    source = site_root / relative
+    target = source.with_name(source.name + ".gz")
+    data = source.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    cached_path = cache_dir / f"{digest}.gz" if cache_dir is not None else None
+    if cached_path is not None and cached_path.is_file():
+        compressed, cached = cached_path.read_bytes(), True
+    else:
+        compressed, cached = compress(data), False
+        if cached_path is not None:
+            cached_path.parent.mkdir(parents=True, exist_ok=True)
+            # Identical files may be compressed at the same time on other threads.
+            fd, tmp_name = tempfile.mkstemp(prefix=".tmp-", suffix=".gz", dir=cached_path.parent)
+            with os.fdopen(fd, "wb") as f:
+                f.write(compressed)
+            os.replace(tmp_name, cached_path)
+    if len(compressed) >= len(data):
+        target.unlink(missing_ok=True)
+        return Compressed(relative, digest, len(data), None, cached)
+    target.write_bytes(compressed)
+    return Compressed(relative, digest, len(data), len(compressed), cached)
+
+
+def prune_cache(cache_dir: Path, used: set[str]) -> int:
+    """Delete the cache entries whose digest is not in ``used``; the number deleted."""
+    removed = 0
+    for path in cache_dir.glob("*.gz"):
+        if path.name.startswith(".tmp-") or path.stem in used:
+            continue
+        # A concurrent build may already have deleted it.
+        path.unlink(missing_ok=True)
+        removed += 1
+    return removed
+
+
+def site_files(site_root: Path) -> tuple[list[str], list[str]]:
+    """(files of a precompressible type, .gz files of that type whose source is gone), relative, sorted."""
+    top = os.fspath(site_root)
+    files: set[str] = set()
+    for dirpath, _, filenames in os.walk(top):
+        prefix = os.path.relpath(dirpath, top).replace(os.sep, "/")
+        prefix = "" if prefix == "." else prefix + "/"
+        files.update(prefix + name for name in filenames)
+    eligible = {name for name in files if name.endswith(EXTENSIONS)}
+    stale = [
+        name
+        for name in files
+        if name.endswith(".gz") and name[: -len(".gz")].endswith(EXTENSIONS) and name[: -len(".gz")] not in eligible
+    ]
+    return sorted(eligible), sorted(stale)
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Write precompressed .gz siblings for the built site.")
+    parser.add_argument("--site-root", default="_site", help="Path to Jekyll build output (default: _site)")
+    parser.add_argument(
+        "--min-size",
+        type=int,
+        default=DEFAULT_MIN_SIZE,
+        help=f"Smallest file precompressed, in bytes (default: {DEFAULT_MIN_SIZE})",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=DEFAULT_CACHE_DIR,
+        help=f"Compressed file cache (default: {DEFAULT_CACHE_DIR.relative_to(ROOT).as_posix()})",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Compress every file, without reading or writing the cache")
+    parser.add_argument("-j", "--jobs", type=int, default=0, help="Parallel compressions (default: CPU count)")
+    parser.add_argument("--report", type=Path, default=None, help="Write every file's compression ratio as JSON to this path")
+    args = parser.parse_args(argv)
+
+    site_root = Path(args.site_root)
+    if not site_root.is_dir():
+        print(f"❌ Site root not found: {site_root}", file=sys.stderr)
+        return 2
+    cache_dir = None if args.no_cache else args.cache_dir
+
+    eligible, stale = site_files(site_root)
+    small = {name for name in eligible if (site_root / name).stat().st_size < args.min_size}
+    large = [name for name in eligible if name not in small]
+    for name in [*stale, *(name + ".gz" for name in small)]:
+        (site_root / name).unlink(missing_ok=True)
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        results = list(executor.map(lambda name: precompress_file(site_root, name, cache_dir), large))
+    pruned = prune_cache(cache_dir, {result.sha256 for result in results}) if cache_dir is not None else 0
+
+    written = [result for result in results if result.gzip_size is not None]
+    before = sum(result.size for result in written)
+    after = sum(result.gzip_size or 0 for result in written)
+    if args.report is not None:
+        report: dict[str, Any] = {
+            "files": {
+                result.path: {
+                    "bytes": result.size,
+                    "gzip_bytes": result.gzip_size,
+                    "ratio": round(result.gzip_size / result.size, 4) if result.gzip_size is not None else None,
+                }
+                for result in results
+            },
+            "total": {"bytes": before, "gzip_bytes": after, "ratio": round(after / before, 4) if before else None},
+        }
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        args.report.write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+    cached = sum(result.cached for result in results)
+    ratio = f"{after / before:.1%}" if before else "n/a"
+    print(
+        f"✅ Precompressed {len(written)} files: {before:,} -> {after:,} bytes ({ratio}); "
+        f"{cached} from cache, {len(results) - len(written)} not smaller, {len(small)} under {args.min_size:,} bytes; "
+        f"{pruned} unused cache entries removed."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Prerender the Mermaid diagrams of the Jekyll build to inline SVG.
+
+Runs on the build output (``_site``), after ``jekyll build``: every Mermaid source
+on a page -- a ```` ```mermaid ```` fence (rendered by Rouge as a
+``language-mermaid`` code block) or a ``<div class="mermaid">`` inside a
+``.mermaid-live`` figure -- is rendered with a local Mermaid CLI (``mmdc``) once per
+theme in ``THEMES`` and replaced by one ``<div class="mermaid-static">`` per theme,
+each holding its SVG. The variants carry a ``mermaid-static-light`` /
+``mermaid-static-dark`` class, and the site CSS shows the one matching the page's
+``data-theme``, as ``mermaid-init.js`` did by re-rendering on a theme toggle. The
+fallback images of ``.diagram-with-fallback`` figures are kept. Pages then no longer
+need the runtime renderer, so the ``mermaid-init.js`` script is removed from every
+page.
+
+Rendered SVGs are cached in ``.cache/mermaid/`` by a hash of the diagram source, the
+theme, the renderer version and ``scripts/mermaid-config.json``, so an unchanged
+diagram is never rendered twice. Distinct uncached diagrams are rendered in parallel.
+When any diagram fails to render, no page is modified.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import html
+import os
+import re
+import shlex
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CACHE_DIR = ROOT / ".cache/mermaid"
+MERMAID_CONFIG = ROOT / "scripts/mermaid-config.json"
+DEFAULT_RENDERER = "mmdc"
+
+# Site theme (the class suffix of its .mermaid-static variant) -> Mermaid theme, in the
+# order the variants are written. The light variant is shown when no theme is set.
+THEMES = {"light": "default", "dark": "dark"}
+
+# Mermaid sources in the rendered HTML, one group each: the raw <div class="mermaid">
+# of a .mermaid-live figure, and a fence as rendered by Rouge (or by kramdown without it).
+DIAGRAM_RE = re.compile(
+    r'<div\s+class="mermaid"\s*>(.*?)</div>'
+    r'|<div\s+class="language-mermaid highlighter-rouge"\s*>\s*<div\s+class="highlight"\s*>\s*'
+    r'<pre\s+class="highlight"\s*>\s*<code>(.*?)</code>\s*</pre>\s*</div>\s*</div>'
+    r'|<pre>\s*<code\s+class="language-mermaid"\s*>(.*?)</code>\s*</pre>',
+    re.DOTALL,
+)
+INIT_SCRIPT_RE = re.compile(r'[ \t]*<script\b[^>]*\bsrc="[^"]*/mermaid-init\.js"[^>]*>\s*</script>[ \t]*\n?')
+TAG_RE = re.compile(r"<[^>]*>")
+PROLOG_RE = re.compile(r"^\s*(?:<\?xml[^>]*\?>\s*)?(?:<!DOCTYPE[^>]*>\s*)?")
+SVG_ID_RE = re.compile(r'<svg\b[^>]*?\sid="([^"]+)"')
+
+
+class RenderError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class Renderer:
+    command: tuple[str, ...]
+    # Renderer version and Mermaid configuration, part of every cache key.
+    fingerprint: str
+    cache_dir: Path
+
+    @classmethod
+    def open(cls, command: str, cache_dir: Path) -> Renderer:
+        argv = tuple(shlex.split(command))
+        try:
+            result = subprocess.run([*argv, "--version"], capture_output=True, text=True, check=False)
+        except OSError as exc:
+            raise RenderError(f"Mermaid renderer not found: {command} ({exc})") from exc
+        if result.returncode != 0:
+            raise RenderError(f"Mermaid renderer failed: {command} --version: {result.stderr.strip()}")
+        config = MERMAID_CONFIG.read_text(encoding="utf-8")
+        return cls(argv, f"{result.stdout.strip()}\0{config}", cache_dir)
+
+    def key(self, source: str, theme: str) -> str:
+        return hashlib.sha256(f"{self.fingerprint}\0{theme}\0{source}".encode("utf-8")).hexdigest()
+
+    def cached(self, source: str, theme: str) -> Path:
+        return self.cache_dir / f"{self.key(source, theme)}.svg"
+
+    def render(self, source: str, theme: str) -> None:
+        """Render ``source`` in the Mermaid ``theme`` into the cache.
+
+        The theme is passed with ``-t``; ``mermaid-config.json`` must not set one, as
+        the CLI lets the config file override it.
+        """
+        target = self.cached(source, theme)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory() as tmp:
+            source_path = Path(tmp) / "diagram.mmd"
+            output_path = Path(tmp) / "diagram.svg"
+            source_path.write_text(source + "\n", encoding="utf-8")
+            result = subprocess.run(
+                [*self.command, "-i", str(source_path), "-o", str(output_path)]
+                + ["-c", str(MERMAID_CONFIG), "-t", theme, "-b", "transparent"],
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+            if result.returncode != 0 or not output_path.is_file():
+                raise RenderError((result.stderr or result.stdout).strip() or f"exit status {result.returncode}")
+            # Write the cache entry atomically; parallel renders never share a key.
+            os.replace(output_path, target)
+
+
+def _diagram(match: re.Match[str]) -> tuple[bool, str]:
+    """(whether it is a .mermaid-live source, diagram source) of a ``DIAGRAM_RE`` match."""
+    live, rouge, plain = match.groups()
+    block = next(group for group in (live, rouge, plain) if group is not None)
+    return live is not None, html.unescape(TAG_RE.sub("", block)).strip()
+
+
+def sources_of(text: str) -> list[str]:
+    """Non-empty Mermaid sources of a page, in document order."""
+    return [source for _, source in map(_diagram, DIAGRAM_RE.finditer(text)) if source]
+
+
+def inline_svg(svg: str, element_id: str) -> str:
+    """``svg`` for inlining in a page: no XML prolog, and its root id (which its
+    styles and markers are scoped by) renamed to ``element_id``."""
+    svg = PROLOG_RE.sub("", svg, count=1).strip()
+    match = SVG_ID_RE.search(svg)
+    if match is None:
+        return svg
+    return re.sub(rf"(?<![A-Za-z0-9-]){re.escape(match.group(1))}(?![A-Za-z0-9-])", element_id, svg)
+
+
+def prerender_page(text: str, renderer: Renderer) -> str:
+    """``text`` with every Mermaid source replaced by its cached SVGs and the runtime script removed.
+
+    A .mermaid-live source becomes its ``.mermaid-static`` variants in its wrapper; a
+    fence becomes a ``.mermaid-wrapper`` holding them, as ``mermaid-init.js`` would have
+    built it.
+    """
+    # Diagrams repeated on a page get distinct ids.
+    seen: dict[str, int] = {}
+
+    def replace(match: re.Match[str]) -> str:
+        live, source = _diagram(match)
+        if not source:
+            return match.group(0)
+        key = hashlib.sha256(source.encode("utf-8")).hexdigest()[:12]
+        seen[key] = seen.get(key, 0) + 1
+        element_id = f"mermaid-{key}" + (f"-{seen[key]}" if seen[key] > 1 else "")
+        static = "".join(
+            f'<div class="mermaid-static mermaid-static-{variant}" data-mermaid-hash="{key}">'
+            f'{inline_svg(renderer.cached(source, theme).read_text(encoding="utf-8"), f"{element_id}-{variant}")}</div>'
+            for variant, theme in THEMES.items()
+        )
+        return static if live else f'<div class="mermaid-wrapper">{static}</div>'
+
+    return INIT_SCRIPT_RE.sub("", DIAGRAM_RE.sub(replace, text))
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Prerender the Mermaid diagrams of the built site to inline SVG.")
+    parser.add_argument("--site-root", default="_site", help="Path to Jekyll build output (default: _site)")
+    parser.add_argument(
+        "--renderer",
+        default=DEFAULT_RENDERER,
+        help=f"Mermaid CLI command, given -i/-o/-c/-b (default: {DEFAULT_RENDERER})",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=DEFAULT_CACHE_DIR,
+        help=f"Rendered SVG cache (default: {DEFAULT_CACHE_DIR.relative_to(ROOT).as_posix()})",
+    )
+    parser.add_argument("-j", "--jobs", type=int, default=0, help="Parallel renders (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    site_root = Path(args.site_root)
+    if not site_root.is_dir():
+        print(f"❌ Site root not found: {site_root}", file=sys.stderr)
+        return 2
+    try:
+        renderer = Renderer.open(args.renderer, args.cache_dir)
+    except RenderError as exc:
+        print(f"❌ {exc}", file=sys.stderr)
+        return 2
+
+    pages = sorted(site_root.rglob("*.html"))
+    texts = {page: page.read_text(encoding="utf-8") for page in pages}
+    # Source -> first page it appears on, for error messages.
+    sources: dict[str, Path] = {}
+    diagrams = 0
+    for page, text in texts.items():
+        for source in sources_of(text):
+            diagrams += 1
+            sources.setdefault(source, page)
+
+    missing = [(source, theme) for source in sources for theme in THEMES.values() if not renderer.cached(source, theme).is_file()]
+
+    def render(job: tuple[str, str]) -> Optional[tuple[str, str]]:
+        source, theme = job
+        try:
+            renderer.render(source, theme)
+        except RenderError as exc:
+            return source, f"{theme} theme: {exc}"
+        return None
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        failures = [failure for failure in executor.map(render, missing) if failure is not None]
+    if failures:
+        print("❌ Mermaid diagrams failed to render:", file=sys.stderr)
+        for source, error in failures:
+            page = sources[source].relative_to(site_root).as_posix()
+            print(f"- {page}: {source.splitlines()[0]}: {error}", file=sys.stderr)
+        return 1
+
+    changed = 0
+    for page, text in texts.items():
+        updated = prerender_page(text, renderer)
+        if updated != text:
+            page.write_text(updated, encoding="utf-8")
+            changed += 1
+
+    svgs = len(sources) * len(THEMES)
+    print(
+        f"✅ Prerendered {diagrams} Mermaid diagrams ({len(sources)} distinct in {len(THEMES)} themes: "
+        f"{len(missing)} SVGs rendered, {svgs - len(missing)} cached); {changed} pages updated."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -99,18 +99,18 @@ if [[ "$missing_py_deps" == "true" ]]; then
 fi
 
 python3 "$ROOT/scripts/check-metadata-consistency.py"
-python3 "$ROOT/scripts/validate-context-pack.py" "$ROOT/docs/examples/common-example/context-pack-v1.yaml"
-python3 "$ROOT/scripts/validate-context-pack.py" "$ROOT/docs/examples/minimal-example/context-pack-v1.yaml"
-python3 "$ROOT/scripts/validate-context-pack.py" "$ROOT/docs/examples/common-example/context-pack-v2.yaml"
-python3 "$ROOT/scripts/validate-context-pack.py" "$ROOT/docs/examples/minimal-example/context-pack-v2.yaml"
-python3 "$ROOT/scripts/validate-context-pack-schema.py" "$ROOT/docs/examples/common-example/context-pack-v1.yaml"
-python3 "$ROOT/scripts/validate-context-pack-schema.py" "$ROOT/docs/examples/minimal-example/context-pack-v1.yaml"
-python3 "$ROOT/scripts/validate-context-pack-schema.py" "$ROOT/docs/examples/common-example/context-pack-v2.yaml"
-python3 "$ROOT/scripts/validate-context-pack-schema.py" "$ROOT/docs/examples/minimal-example/context-pack-v2.yaml"
+python3 "$ROOT/scripts/validate-context-pack-all.py" \
+  "$ROOT/docs/examples/common-example/context-pack-v1.yaml" \
+  "$ROOT/docs/examples/minimal-example/context-pack-v1.yaml" \
+  "$ROOT/docs/examples/common-example/context-pack-v2.yaml" \
+  "$ROOT/docs/examples/minimal-example/context-pack-v2.yaml"
 python3 "$ROOT/scripts/check-context-pack-v2-schema-regressions.py"
+python3 "$ROOT/scripts/check-context-pack-schema-codegen.py"
 python3 "$ROOT/scripts/check-context-pack-minimal-example-sync.py"
-python3 "$ROOT/scripts/check-placeholders.py"
-python3 "$ROOT/scripts/check-invalid-markdown-links.py"
+python3 "$ROOT/scripts/check-markdown.py"
+python3 "$ROOT/scripts/check-internal-links.py"
+python3 "$ROOT/scripts/optimize-svg.py" --check
+python3 "$ROOT/scripts/optimize-svg.py" --self-test
 node "$ROOT/scripts/check-associativity-wording.js"
 node "$ROOT/scripts/check-associativity-wording.js" --self-test
 node "$ROOT/scripts/check-monad-laws.js"
@@ -125,6 +125,17 @@ fi
   bundle exec jekyll build
 )
 
-python3 "$ROOT/scripts/check-rendered-html.py" --site-root "$ROOT/_site"
+MERMAID_FLAG=""
+if command -v mmdc >/dev/null 2>&1; then
+  echo "==> Prerendering Mermaid diagrams"
+  python3 "$ROOT/scripts/prerender-mermaid.py" --site-root "$ROOT/_site"
+  MERMAID_FLAG="--mermaid-prerendered"
+else
+  echo "⚠️ mmdc not found; Mermaid diagrams are left to the runtime renderer (npm install -g @mermaid-js/mermaid-cli)" >&2
+fi
+python3 "$ROOT/scripts/precompress-site.py" --site-root "$ROOT/_site" --report "$REPORT_DIR/precompress-report.json"
+
+python3 "$ROOT/scripts/check-rendered-html.py" --site-root "$ROOT/_site" --crawl --precompressed $MERMAID_FLAG
+python3 "$ROOT/scripts/check-page-weight.py" --site-root "$ROOT/_site" --report "$REPORT_DIR/page-weight-report.json"
 
 echo "✅ QA complete. Reports: $REPORT_DIR"
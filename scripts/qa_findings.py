@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""Machine-readable finding output shared by the QA scripts.
+
+``--format jsonl`` writes one JSON object per finding and ``--format sarif`` writes
+a SARIF 2.1.0 log. Both are written incrementally: each finding is flushed as soon
+as the script produces it, and the SARIF tool/rule metadata is emitted after the
+results so that nothing has to be buffered.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional, TextIO, Union
+
+
+FORMATS = ("text", "jsonl", "sarif")
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+
+@dataclass(frozen=True)
+class Finding:
+    rule_id: str
+    message: str
+    file: Optional[str] = None
+    line: Optional[int] = None
+    column: Optional[int] = None
+    json_path: Optional[str] = None
+    level: str = "error"
+
+
+def add_format_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="text",
+        help="Output format: human-readable text (default), JSON Lines, or SARIF 2.1.0 on stdout",
+    )
+
+
+class JsonlWriter:
+    def __init__(self, tool: str, stream: TextIO) -> None:
+        self.tool = tool
+        self.stream = stream
+        self.count = 0
+
+    def write(self, finding: Finding) -> None:
+        record = {
+            "tool": self.tool,
+            "rule": finding.rule_id,
+            "level": finding.level,
+            "file": finding.file,
+            "line": finding.line,
+            "column": finding.column,
+            "json_path": finding.json_path,
+            "message": finding.message,
+        }
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.stream.flush()
+        self.count += 1
+
+    def close(self) -> None:
+        self.stream.flush()
+
+
+def _artifact_uri(file: str) -> str:
+    path = Path(file)
+    return path.as_uri() if path.is_absolute() else path.as_posix()
+
+
+class SarifWriter:
+    def __init__(self, tool: str, stream: TextIO) -> None:
+        self.tool = tool
+        self.stream = stream
+        self.count = 0
+        self.rule_ids: dict[str, None] = {}
+        self.stream.write(f'{{"$schema": {json.dumps(SARIF_SCHEMA)}, "version": "2.1.0", "runs": [{{"results": [')
+        self.stream.flush()
+
+    def write(self, finding: Finding) -> None:
+        result: dict[str, Any] = {
+            "ruleId": finding.rule_id,
+            "level": finding.level,
+            "message": {"text": finding.message},
+        }
+        location: dict[str, Any] = {}
+        if finding.file is not None:
+            physical: dict[str, Any] = {"artifactLocation": {"uri": _artifact_uri(finding.file)}}
+            if finding.line is not None:
+                region: dict[str, Any] = {"startLine": finding.line}
+                if finding.column is not None:
+                    region["startColumn"] = finding.column
+                physical["region"] = region
+            location["physicalLocation"] = physical
+        if finding.json_path is not None:
+            location["logicalLocations"] = [{"fullyQualifiedName": finding.json_path, "kind": "member"}]
+        if location:
+            result["locations"] = [location]
+
+        separator = "," if self.count else ""
+        self.stream.write(f"{separator}\n{json.dumps(result, ensure_ascii=False)}")
+        self.stream.flush()
+        self.count += 1
+        self.rule_ids.setdefault(finding.rule_id, None)
+
+    def close(self) -> None:
+        driver = {"name": self.tool, "rules": [{"id": rule_id} for rule_id in self.rule_ids]}
+        self.stream.write(f'\n], "tool": {{"driver": {json.dumps(driver, ensure_ascii=False)}}}}}]}}\n')
+        self.stream.flush()
+
+
+FindingWriter = Union[JsonlWriter, SarifWriter]
+
+
+def open_writer(fmt: str, tool: str, stream: Optional[TextIO] = None) -> Optional[FindingWriter]:
+    """Return a writer for ``fmt``, or None for the human-readable text output."""
+    stream = stream or sys.stdout
+    if fmt == "jsonl":
+        return JsonlWriter(tool, stream)
+    if fmt == "sarif":
+        return SarifWriter(tool, stream)
+    if fmt == "text":
+        return None
+    raise ValueError(f"Unsupported format: {fmt}")
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""Import the hyphenated QA scripts as modules, shared by the scripts that reuse them.
+
+A script such as ``validate-context-pack.py`` cannot be imported by name, so it is
+loaded from its path and registered in ``sys.modules`` under the given name: a
+second load returns the same module, and its dataclasses resolve their module when
+pickled to worker processes.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+from typing import Any
+
+
+def load_script_module(module_name: str, path: Path) -> Any:
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"cannot load script: {path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
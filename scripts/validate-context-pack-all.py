@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Run JSON Schema validation and the semantic lint on Context Packs with one parse per file."""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Optional
+
+from context_pack_loader import compiled_cache_enabled, load_pack
+from qa_findings import Finding, FindingWriter, add_format_argument, open_writer
+from script_loader import load_script_module
+
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+SEMANTIC_VALIDATOR_PATH = SCRIPTS_DIR / "validate-context-pack.py"
+SCHEMA_VALIDATOR_PATH = SCRIPTS_DIR / "validate-context-pack-schema.py"
+
+SOURCE_SCHEMA = "schema"
+SOURCE_SEMANTIC = "semantic"
+RULE_LOAD_ERROR = "load-error"
+
+
+semantic = load_script_module("context_pack_semantic_validator", SEMANTIC_VALIDATOR_PATH)
+schema_validation = load_script_module("context_pack_schema_validator", SCHEMA_VALIDATOR_PATH)
+
+
+# Schema keyword -> lint rules that report the same defect at the same path. The schema
+# finding is dropped when the lint reports one of them there, as the lint names the
+# defect in the pack's own terms (an ``anyOf`` failure on a mapping is the lint's
+# missing endpoint). ``required`` fails on the object and the lint on the missing
+# member, so it is matched at the member's path.
+SCHEMA_KEYWORD_LINT_RULES: dict[str, frozenset[str]] = {
+    "schema/type": frozenset({semantic.RULE_TYPE, semantic.RULE_ENTRY}),
+    "schema/const": frozenset({semantic.RULE_TYPE}),
+    "schema/minimum": frozenset({semantic.RULE_TYPE}),
+    "schema/minLength": frozenset({semantic.RULE_TYPE}),
+    "schema/minItems": frozenset({semantic.RULE_TYPE, semantic.RULE_ENTRY}),
+    "schema/anyOf": frozenset({semantic.RULE_TYPE, semantic.RULE_ENTRY}),
+    "schema/oneOf": frozenset({semantic.RULE_TYPE, semantic.RULE_ENTRY}),
+    "schema/required": frozenset({semantic.RULE_REQUIRED, semantic.RULE_TYPE, semantic.RULE_ENTRY}),
+}
+REQUIRED_MESSAGE_RE = re.compile(r"'([^'\\]*)' is a required property")
+
+
+@dataclass(frozen=True)
+class CombinedFinding:
+    source: str
+    message: str
+    rule: str
+    line: Optional[int] = None
+    column: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class CombinedResult:
+    file: str
+    context_pack_version: Optional[int]
+    schema_path: Optional[str]
+    findings: dict[str, tuple[CombinedFinding, ...]]
+    load_error: Optional[str] = None
+
+
+# Compiled validators are reused for every document handled by this process; the
+# schema file's size and mtime are part of the key so long-lived callers see edits.
+# The daemon calls compile_schema_validator from its request threads.
+_VALIDATORS: dict[tuple[Path, int, int], Any] = {}
+_VALIDATORS_LOCK = threading.Lock()
+
+
+def compile_schema_validator(schema_path: Path) -> Any:
+    schema_path = Path(schema_path).resolve()
+    st = schema_path.stat()
+    key = (schema_path, st.st_size, st.st_mtime_ns)
+    with _VALIDATORS_LOCK:
+        validator = _VALIDATORS.get(key)
+        if validator is None:
+            validator = schema_validation.compile_validator(schema_path)
+            for stale in [k for k in _VALIDATORS if k[0] == schema_path]:
+                del _VALIDATORS[stale]
+            _VALIDATORS[key] = validator
+    return validator
+
+
+def merge_findings(
+    schema_errors: list[Any],
+    semantic_errors: list[Any],
+) -> dict[str, tuple[CombinedFinding, ...]]:
+    """Group findings by JSON path (sorted), dropping exact duplicates within each path.
+
+    A schema finding whose keyword is in ``SCHEMA_KEYWORD_LINT_RULES`` is dropped when
+    the lint reports one of its rules at the same path (for ``required``, at the
+    missing member's path): the two describe one defect.
+    """
+    lint_rules: dict[str, set[str]] = {}
+    for item in semantic_errors:
+        lint_rules.setdefault(item.path, set()).add(item.rule)
+    merged: dict[str, dict[CombinedFinding, None]] = {}
+    for e in schema_errors:
+        target: Optional[str] = e.path
+        if e.rule == "schema/required":
+            match = REQUIRED_MESSAGE_RE.fullmatch(e.message)
+            target = e.path + schema_validation.format_path([match.group(1)])[1:] if match is not None else None
+        if target is not None and not SCHEMA_KEYWORD_LINT_RULES.get(e.rule, frozenset()).isdisjoint(lint_rules.get(target, ())):
+            continue
+        merged.setdefault(e.path, {})[CombinedFinding(SOURCE_SCHEMA, e.message, e.rule, e.line, e.column)] = None
+    for item in semantic_errors:
+        finding = CombinedFinding(SOURCE_SEMANTIC, item.message, item.rule, item.line, item.column)
+        merged.setdefault(item.path, {})[finding] = None
+    return {path: tuple(merged[path]) for path in sorted(merged)}
+
+
+def validate_context_pack(
+    doc: Any,
+    schema_path: Optional[Path] = None,
+    source_map: Optional[Any] = None,
+) -> tuple[int, dict[str, tuple[CombinedFinding, ...]]]:
+    """Validate an already-loaded document with both JSON Schema and the semantic lint.
+
+    Returns the detected Context Pack version and the merged findings keyed by JSON path.
+    Pass the ``SourceMap`` of a YAML document to attach source positions to findings.
+    """
+    context_pack_version = semantic.detect_context_pack_version(doc)
+    if schema_path is None:
+        schema_path = schema_validation.DEFAULT_SCHEMA_BY_VERSION[context_pack_version]
+    validator = compile_schema_validator(schema_path)
+
+    # merge_findings orders by path, so the unsorted stream is enough here.
+    schema_errors = list(schema_validation.iter_schema_errors(validator, doc, source_map))
+    semantic_errors = list(semantic.with_positions(semantic.iter_errors(doc, context_pack_version), source_map))
+    return context_pack_version, merge_findings(schema_errors, semantic_errors)
+
+
+def validate_file(file_path: str, schema_path: Optional[str] = None, use_compiled: bool = False) -> CombinedResult:
+    try:
+        with open(file_path, "rb") as f:
+            content = f.read()
+    except Exception as e:
+        return CombinedResult(file=file_path, context_pack_version=None, schema_path=None, findings={}, load_error=str(e))
+    return validate_content(file_path, content, schema_path, use_compiled=use_compiled)
+
+
+def validate_content(
+    file_path: str,
+    content: bytes,
+    schema_path: Optional[str] = None,
+    use_compiled: bool = False,
+) -> CombinedResult:
+    """Validate ``content`` read from ``file_path``; the extension selects YAML or JSON parsing."""
+    try:
+        doc, source_map = load_pack(Path(file_path), content, use_compiled=use_compiled)
+    except Exception as e:
+        return CombinedResult(file=file_path, context_pack_version=None, schema_path=None, findings={}, load_error=str(e))
+
+    context_pack_version = semantic.detect_context_pack_version(doc)
+    selected_schema = Path(schema_path) if schema_path else schema_validation.DEFAULT_SCHEMA_BY_VERSION[context_pack_version]
+    try:
+        context_pack_version, findings = validate_context_pack(doc, selected_schema, source_map)
+    except Exception as e:
+        return CombinedResult(
+            file=file_path,
+            context_pack_version=context_pack_version,
+            schema_path=str(selected_schema),
+            findings={},
+            load_error=f"cannot use schema {selected_schema}: {e}",
+        )
+    return CombinedResult(
+        file=file_path,
+        context_pack_version=context_pack_version,
+        schema_path=str(selected_schema),
+        findings=findings,
+    )
+
+
+def report_result(result: CombinedResult, writer: Optional[FindingWriter] = None) -> None:
+    if writer is not None:
+        if result.load_error is not None:
+            writer.write(Finding(rule_id=RULE_LOAD_ERROR, message=result.load_error, file=result.file))
+            return
+        for path, findings in result.findings.items():
+            for finding in findings:
+                writer.write(
+                    Finding(
+                        rule_id=finding.rule,
+                        message=finding.message,
+                        file=result.file,
+                        line=finding.line,
+                        column=finding.column,
+                        json_path=path,
+                    )
+                )
+        return
+    if result.load_error is not None:
+        print(f"❌ Failed to load: {result.file}: {result.load_error}", file=sys.stderr)
+        return
+    if result.findings:
+        print(f"❌ Invalid Context Pack v{result.context_pack_version}: {result.file}", file=sys.stderr)
+        for path, findings in result.findings.items():
+            for finding in findings:
+                location = "" if finding.line is None else f"{result.file}:{finding.line}:{finding.column}: "
+                print(f"- {location}{path}: [{finding.source}] {finding.message}", file=sys.stderr)
+        return
+    print(
+        f"✅ Context Pack v{result.context_pack_version} passed schema validation and minimal lint: "
+        f"{result.file} (schema: {result.schema_path})"
+    )
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        description="Validate Context Pack v1/v2 YAML/JSON with JSON Schema and the minimal lint in one pass."
+    )
+    parser.add_argument(
+        "targets",
+        nargs="+",
+        metavar="file",
+        help="Target file (.yaml/.yml/.json), directory, or glob pattern; directories are searched recursively",
+    )
+    parser.add_argument(
+        "--schema",
+        default=None,
+        help="Schema file path (default: auto-detect from context_pack_version; v1 when omitted)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=0,
+        help="Number of worker processes for batch validation (default: CPU count)",
+    )
+    parser.add_argument(
+        "--compiled-cache",
+        action="store_true",
+        help="Reuse parsed YAML from .<name>.compiled.json next to each pack (also enabled by $CONTEXT_PACK_COMPILED_CACHE=1)",
+    )
+    add_format_argument(parser)
+    args = parser.parse_args(argv)
+
+    files = semantic.expand_targets(args.targets)
+    if not files:
+        print(f"❌ No Context Pack files matched: {' '.join(args.targets)}", file=sys.stderr)
+        return 2
+
+    worker = partial(validate_file, schema_path=args.schema, use_compiled=compiled_cache_enabled(args.compiled_cache))
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    writer = open_writer(args.format, "validate-context-pack-all")
+    results: list[CombinedResult] = []
+    try:
+        if jobs <= 1 or len(files) <= 1:
+            for file_path in files:
+                results.append(worker(file_path))
+                report_result(results[-1], writer)
+        else:
+            workers = min(jobs, len(files))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for result in executor.map(worker, files, chunksize=max(1, len(files) // (workers * 4))):
+                    results.append(result)
+                    report_result(result, writer)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    load_failures = sum(1 for r in results if r.load_error is not None)
+    invalid = sum(1 for r in results if r.load_error is None and r.findings)
+    if len(results) > 1 and writer is None:
+        valid = len(results) - load_failures - invalid
+        summary = f"{len(results)} checked, {valid} valid, {invalid} invalid, {load_failures} failed to load"
+        if load_failures or invalid:
+            print(f"❌ Context Pack batch failed: {summary}", file=sys.stderr)
+        else:
+            print(f"✅ Context Pack batch passed: {summary}")
+
+    if load_failures:
+        return 2
+    if invalid:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
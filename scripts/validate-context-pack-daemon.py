@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Resident Context Pack validator speaking line-delimited JSON-RPC 2.0.
+
+The daemon imports yaml/jsonschema once, keeps compiled schema validators warm, and
+remembers the results for recently seen packs (keyed by content hash and schema), so
+a request costs a file read, a hash, and — only for new content — one validation.
+
+Serve on stdin/stdout (one request per line, one response per line)::
+
+    python3 scripts/validate-context-pack-daemon.py --stdio
+
+or on a Unix socket, handling each connection in its own thread::
+
+    python3 scripts/validate-context-pack-daemon.py --socket /tmp/context-pack.sock
+
+Methods:
+
+- ``validate``: ``{"path": "pack.yaml"}`` or ``{"content": "...", "format": "yaml"}``,
+  plus optional ``"schema"``. Returns ``{"file", "context_pack_version", "schema_path",
+  "valid", "findings", "load_error", "cached"}``; each finding has ``path``, ``source``,
+  ``rule``, ``message``, ``line`` and ``column``.
+- ``stats``: cache counters.
+- ``ping``: returns ``"pong"``.
+- ``shutdown``: stops the server after replying.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import socketserver
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional, TextIO
+
+from script_loader import load_script_module
+
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+COMBINED_VALIDATOR_PATH = SCRIPTS_DIR / "validate-context-pack-all.py"
+
+DEFAULT_CACHE_SIZE = 256
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+
+combined = load_script_module("context_pack_combined_validator", COMBINED_VALIDATOR_PATH)
+
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class PackResultCache:
+    """Thread-safe LRU of serialized validation results."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, ...], dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple[str, ...]) -> Optional[dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: tuple[str, ...], value: dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses}
+
+
+def serialize_result(result: Any) -> dict[str, Any]:
+    findings = [
+        {
+            "path": path,
+            "source": finding.source,
+            "rule": finding.rule,
+            "message": finding.message,
+            "line": finding.line,
+            "column": finding.column,
+        }
+        for path, path_findings in result.findings.items()
+        for finding in path_findings
+    ]
+    return {
+        "file": result.file,
+        "context_pack_version": result.context_pack_version,
+        "schema_path": result.schema_path,
+        "valid": result.load_error is None and not findings,
+        "findings": findings,
+        "load_error": result.load_error,
+    }
+
+
+def _schema_stamp(schema: Optional[str]) -> str:
+    """Identify the selected schema file(s) so edited schemas miss the result cache."""
+    paths = [Path(schema)] if schema else list(combined.schema_validation.DEFAULT_SCHEMA_BY_VERSION.values())
+    stamps = []
+    for path in paths:
+        try:
+            st = path.stat()
+        except OSError:
+            stamps.append(f"{path}:missing")
+            continue
+        stamps.append(f"{path}:{st.st_size}:{st.st_mtime_ns}")
+    return "|".join(stamps)
+
+
+class ValidationService:
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE, use_compiled: bool = False) -> None:
+        self.cache = PackResultCache(cache_size)
+        self.use_compiled = use_compiled
+        self.stop = threading.Event()
+        # Compile the default schema validators up front so the first request is warm too.
+        for schema_path in combined.schema_validation.DEFAULT_SCHEMA_BY_VERSION.values():
+            combined.compile_schema_validator(schema_path)
+
+    def validate(self, params: dict[str, Any]) -> dict[str, Any]:
+        schema = params.get("schema")
+        if schema is not None and not isinstance(schema, str):
+            raise RpcError(INVALID_PARAMS, "schema must be a string")
+
+        if "path" in params:
+            file_path = params["path"]
+            if not isinstance(file_path, str):
+                raise RpcError(INVALID_PARAMS, "path must be a string")
+            try:
+                with open(file_path, "rb") as f:
+                    content = f.read()
+            except OSError as e:
+                return {
+                    "file": file_path,
+                    "context_pack_version": None,
+                    "schema_path": None,
+                    "valid": False,
+                    "findings": [],
+                    "load_error": str(e),
+                    "cached": False,
+                }
+        elif "content" in params:
+            fmt = params.get("format", "yaml")
+            if not isinstance(params["content"], str) or fmt not in ("yaml", "json"):
+                raise RpcError(INVALID_PARAMS, "content must be a string and format 'yaml' or 'json'")
+            content = params["content"].encode("utf-8")
+            file_path = f"<request>.{fmt}"
+        else:
+            raise RpcError(INVALID_PARAMS, "either path or content is required")
+
+        ext = os.path.splitext(file_path)[1].lower()
+        key = (hashlib.sha256(content).hexdigest(), ext, schema or "", _schema_stamp(schema))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return {**cached, "file": file_path, "cached": True}
+
+        result = combined.validate_content(file_path, content, schema, use_compiled=self.use_compiled and "path" in params)
+        response = serialize_result(result)
+        self.cache.put(key, response)
+        return {**response, "cached": False}
+
+    def dispatch(self, method: str, params: Any) -> Any:
+        if method == "validate":
+            if not isinstance(params, dict):
+                raise RpcError(INVALID_PARAMS, "params must be an object")
+            return self.validate(params)
+        if method == "stats":
+            return {"cache": self.cache.stats()}
+        if method == "ping":
+            return "pong"
+        if method == "shutdown":
+            self.stop.set()
+            return None
+        raise RpcError(METHOD_NOT_FOUND, f"unknown method: {method}")
+
+    def handle_line(self, line: str) -> Optional[str]:
+        """Answer one JSON-RPC request line; notifications (no id) get no response."""
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return _response(None, error=RpcError(PARSE_ERROR, f"parse error: {e}"))
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            return _response(None, error=RpcError(INVALID_REQUEST, "invalid request"))
+
+        request_id = request.get("id")
+        try:
+            result = self.dispatch(request["method"], request.get("params", {}))
+        except RpcError as e:
+            return _response(request_id, error=e) if "id" in request else None
+        except Exception as e:
+            return _response(request_id, error=RpcError(INTERNAL_ERROR, f"internal error: {e}")) if "id" in request else None
+        if "id" not in request:
+            return None
+        return _response(request_id, result=result)
+
+
+def _response(request_id: Any, result: Any = None, error: Optional[RpcError] = None) -> str:
+    payload: dict[str, Any] = {"jsonrpc": "2.0", "id": request_id}
+    if error is not None:
+        payload["error"] = {"code": error.code, "message": error.message}
+    else:
+        payload["result"] = result
+    return json.dumps(payload, ensure_ascii=False)
+
+
+def serve_stdio(service: ValidationService, stdin: TextIO, stdout: TextIO) -> None:
+    for line in stdin:
+        if not line.strip():
+            continue
+        response = service.handle_line(line)
+        if response is not None:
+            stdout.write(response + "\n")
+            stdout.flush()
+        if service.stop.is_set():
+            return
+
+
+def serve_socket(service: ValidationService, socket_path: str) -> None:
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            for raw in self.rfile:
+                line = raw.decode("utf-8")
+                if not line.strip():
+                    continue
+                response = service.handle_line(line)
+                if response is not None:
+                    self.wfile.write(response.encode("utf-8") + b"\n")
+                    self.wfile.flush()
+                if service.stop.is_set():
+                    threading.Thread(target=server.shutdown, daemon=True).start()
+                    return
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    if os.path.exists(socket_path):
+        # A socket left behind by a previous daemon; refuse to clobber anything else.
+        if not Path(socket_path).is_socket():
+            raise SystemExit(f"❌ Not a socket: {socket_path}")
+        os.unlink(socket_path)
+    server = Server(socket_path, Handler)
+    try:
+        print(f"✅ Context Pack validation daemon listening on {socket_path}", file=sys.stderr)
+        server.serve_forever()
+    finally:
+        server.server_close()
+        try:
+            os.unlink(socket_path)
+        except OSError:
+            pass
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Serve Context Pack validation requests over JSON-RPC.")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--stdio", action="store_true", help="Serve line-delimited JSON-RPC on stdin/stdout")
+    mode.add_argument("--socket", metavar="PATH", default=None, help="Serve line-delimited JSON-RPC on a Unix socket")
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE,
+        help=f"Number of recently seen pack results to keep (default: {DEFAULT_CACHE_SIZE})",
+    )
+    parser.add_argument(
+        "--compiled-cache",
+        action="store_true",
+        help="Reuse parsed YAML from .<name>.compiled.json next to each pack",
+    )
+    args = parser.parse_args(argv)
+
+    service = ValidationService(cache_size=max(1, args.cache_size), use_compiled=args.compiled_cache)
+    if args.stdio:
+        serve_stdio(service, sys.stdin, sys.stdout)
+    else:
+        serve_socket(service, args.socket)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -7,7 +7,7 @@ import argparse
 import json
 import sys
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Iterable, Iterator, NamedTuple, Optional
 
 try:
     import yaml
@@ -18,11 +18,23 @@ except ImportError:
 
 try:
     from jsonschema import Draft202012Validator
+    from jsonschema.exceptions import SchemaError
 except ImportError:
     print("❌ Missing dependency: jsonschema", file=sys.stderr)
     print("   Install: python3 -m pip install -r scripts/requirements-qa.txt", file=sys.stderr)
     raise SystemExit(2)
 
+# Keep the shared helper modules importable when this script is loaded via importlib.
+if str(Path(__file__).resolve().parent) not in sys.path:
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import context_pack_loader
+import context_pack_schema_codegen
+from context_pack_cache import DEFAULT_MAX_BYTES, cache_key, open_cache, sha256_file
+from context_pack_loader import SourceMap, compiled_cache_enabled, load_pack, parse_document_with_source_map
+from context_pack_schema_codegen import UnsupportedSchema, load_generated_validator
+from qa_findings import Finding, FindingWriter, add_format_argument, open_writer
+
 
 ROOT = Path(__file__).resolve().parent.parent
 DEFAULT_SCHEMA_BY_VERSION = {
@@ -30,6 +42,13 @@ DEFAULT_SCHEMA_BY_VERSION = {
     2: ROOT / "docs/spec/context-pack-v2.schema.json",
 }
 
+RULE_LOAD_ERROR = "load-error"
+
+# "generated" runs the Python module compiled from the schema (see context_pack_schema_codegen);
+# "jsonschema" interprets the schema with Draft202012Validator. Both report identical errors.
+ENGINES = ("generated", "jsonschema")
+DEFAULT_ENGINE = "generated"
+
 
 def _is_simple_key(key: str) -> bool:
     if key == "":
@@ -53,15 +72,12 @@ def format_path(parts: Iterable[Any]) -> str:
     return out
 
 
-def load_document(file_path: Path) -> Any:
-    ext = file_path.suffix.lower()
-    if ext not in (".yml", ".yaml", ".json"):
-        raise ValueError(f"Unsupported file extension: {ext} (expected .yaml/.yml/.json)")
+def parse_document(content: bytes, ext: str) -> Any:
+    return parse_document_with_source_map(content, ext)[0]
 
-    with file_path.open("r", encoding="utf-8") as f:
-        if ext in (".yml", ".yaml"):
-            return yaml.safe_load(f)
-        return json.load(f)
+
+def load_document(file_path: Path) -> Any:
+    return parse_document(file_path.read_bytes(), file_path.suffix.lower())
 
 
 def load_schema(schema_path: Path) -> Any:
@@ -75,6 +91,148 @@ def detect_context_pack_version(doc: Any) -> int:
     return 1
 
 
+class SchemaErrorItem(NamedTuple):
+    path: str
+    message: str
+    # ``schema/<keyword>`` for the failing JSON Schema keyword.
+    rule: str
+    # 1-based source position of ``path`` (YAML input with a source map only).
+    line: Optional[int] = None
+    column: Optional[int] = None
+
+
+def compile_validator(schema_path: Path, engine: str = DEFAULT_ENGINE) -> Any:
+    """Return a validator for ``schema_path`` exposing ``iter_errors(doc)``.
+
+    Raises ``OSError``/``ValueError`` for unreadable schemas and ``SchemaError`` for
+    invalid ones. Schemas the code generator cannot compile use jsonschema.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unsupported engine: {engine}")
+    if engine == "generated":
+        try:
+            return load_generated_validator(schema_path)
+        except UnsupportedSchema:
+            pass
+    schema = load_schema(schema_path)
+    Draft202012Validator.check_schema(schema)
+    return Draft202012Validator(schema)
+
+
+def iter_schema_errors(
+    validator: Any,
+    doc: Any,
+    source_map: Optional[SourceMap] = None,
+) -> Iterator[SchemaErrorItem]:
+    """Yield schema errors in the order jsonschema finds them.
+
+    Source positions are only resolved for the paths that fail.
+    """
+    for e in validator.iter_errors(doc):
+        position = source_map.locate(e.absolute_path) if source_map is not None else None
+        yield SchemaErrorItem(
+            format_path(e.absolute_path),
+            e.message,
+            f"schema/{e.validator}",
+            *(position or (None, None)),
+        )
+
+
+def schema_errors(validator: Any, doc: Any) -> list[SchemaErrorItem]:
+    """Return every schema violation, ordered by path."""
+    return sorted(iter_schema_errors(validator, doc), key=lambda x: x[0])
+
+
+def validator_fingerprint(schema_paths: Iterable[Path], engine: str) -> str:
+    """Identify this script, the engine and the modules it runs on (the validator
+    generator, the pack loader and the jsonschema release), and every schema that may
+    be selected."""
+    try:
+        from importlib.metadata import version
+
+        jsonschema_version = version("jsonschema")
+    except Exception:
+        jsonschema_version = "unknown"
+    modules = (Path(context_pack_schema_codegen.__file__), Path(context_pack_loader.__file__))
+    parts = [f"schema:{sha256_file(Path(__file__))}", f"engine:{engine}", f"jsonschema:{jsonschema_version}"]
+    parts.extend(f"{p.name}:{sha256_file(p)}" for p in modules)
+    parts.extend(f"{p.name}:{sha256_file(p)}" for p in schema_paths)
+    return "|".join(parts)
+
+
+def report(
+    file_path: Path,
+    context_pack_version: int,
+    schema_path: Path,
+    errors: Iterable[SchemaErrorItem],
+    max_errors: Optional[int] = None,
+    sort: bool = False,
+    writer: Optional[FindingWriter] = None,
+) -> int:
+    """Print errors as ``errors`` yields them, stopping after ``max_errors``.
+
+    With ``sort`` every error is collected and ordered by path before printing.
+    """
+    if sort:
+        errors = sorted(errors, key=lambda x: x.path)
+    reported = 0
+    for error in errors:
+        if max_errors is not None and reported >= max_errors:
+            if writer is None:
+                print(f"- ... stopped after {reported} error(s); more may exist", file=sys.stderr)
+            return 1
+        if writer is not None:
+            writer.write(
+                Finding(
+                    rule_id=error.rule,
+                    message=error.message,
+                    file=str(file_path),
+                    line=error.line,
+                    column=error.column,
+                    json_path=error.path,
+                )
+            )
+            reported += 1
+            continue
+        if reported == 0:
+            print(f"❌ Schema validation failed: {file_path}", file=sys.stderr)
+        if error.line is None:
+            print(f"- {error.path}: {error.message}", file=sys.stderr, flush=True)
+        else:
+            print(f"- {file_path}:{error.line}:{error.column}: {error.path}: {error.message}", file=sys.stderr, flush=True)
+        reported += 1
+    if reported:
+        return 1
+    if writer is not None:
+        return 0
+
+    print(f"✅ Schema validation passed: {file_path} (Context Pack v{context_pack_version}, schema: {schema_path})")
+    return 0
+
+
+class _RecordingErrors:
+    """Pass errors through while remembering them, so complete runs can be cached."""
+
+    def __init__(self, errors: Iterable[SchemaErrorItem]) -> None:
+        self._errors = errors
+        self.seen: list[SchemaErrorItem] = []
+        self.complete = False
+
+    def __iter__(self) -> Iterator[SchemaErrorItem]:
+        for error in self._errors:
+            self.seen.append(error)
+            yield error
+        self.complete = True
+
+
+def _failure(writer: Optional[FindingWriter], file_path: Path, text: str, error: Exception) -> int:
+    if writer is None:
+        print(f"❌ {text}: {file_path}: {error}", file=sys.stderr)
+    else:
+        writer.write(Finding(rule_id=RULE_LOAD_ERROR, message=f"{text}: {error}", file=str(file_path)))
+    return 2
+
+
 def main(argv: list[str]) -> int:
     parser = argparse.ArgumentParser(description="Validate Context Pack v1/v2 YAML/JSON with JSON Schema.")
     parser.add_argument("file", help="Target file path (.yaml/.yml/.json)")
@@ -83,42 +241,115 @@ def main(argv: list[str]) -> int:
         default=None,
         help="Schema file path (default: auto-detect from context_pack_version; v1 when omitted)",
     )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Reuse results for unchanged packs from this directory (default: $CONTEXT_PACK_CACHE_DIR; disabled when unset)",
+    )
+    parser.add_argument(
+        "--cache-max-bytes",
+        type=int,
+        default=DEFAULT_MAX_BYTES,
+        help=f"Evict least-recently-used cache entries above this size (default: {DEFAULT_MAX_BYTES})",
+    )
+    parser.add_argument(
+        "--sort",
+        action="store_true",
+        help="Order errors by JSON path (collects every error before printing)",
+    )
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="Stop at the first schema error",
+    )
+    parser.add_argument(
+        "--max-errors",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Stop after N schema errors (default: report every error)",
+    )
+    parser.add_argument(
+        "--compiled-cache",
+        action="store_true",
+        help="Reuse parsed YAML from .<name>.compiled.json next to each pack (also enabled by $CONTEXT_PACK_COMPILED_CACHE=1)",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default=DEFAULT_ENGINE,
+        help=f"Schema validation engine (default: {DEFAULT_ENGINE})",
+    )
+    add_format_argument(parser)
     args = parser.parse_args(argv)
+    if args.max_errors is not None and args.max_errors < 1:
+        parser.error("--max-errors must be at least 1")
+    max_errors = 1 if args.fail_fast else args.max_errors
+
+    writer = open_writer(args.format, "validate-context-pack-schema")
+    try:
+        return _validate(args, max_errors, writer)
+    finally:
+        if writer is not None:
+            writer.close()
+
 
+def _validate(args: argparse.Namespace, max_errors: Optional[int], writer: Optional[FindingWriter]) -> int:
     file_path = Path(args.file)
 
     try:
-        doc = load_document(file_path)
+        content = file_path.read_bytes()
     except Exception as e:
-        print(f"❌ Failed to load: {file_path}: {e}", file=sys.stderr)
-        return 2
+        return _failure(writer, file_path, "Failed to load", e)
 
-    context_pack_version = detect_context_pack_version(doc)
-    schema_path = Path(args.schema) if args.schema else DEFAULT_SCHEMA_BY_VERSION[context_pack_version]
+    cache = open_cache(args.cache_dir, max_bytes=args.cache_max_bytes)
+    key = None
+    if cache is not None:
+        schema_candidates = [Path(args.schema)] if args.schema else list(DEFAULT_SCHEMA_BY_VERSION.values())
+        try:
+            key = cache_key(content, file_path.suffix.lower(), validator_fingerprint(schema_candidates, args.engine))
+        except OSError:
+            # Let the regular path report the unreadable schema.
+            key = None
+        cached = cache.get(key) if key is not None else None
+        if cached is not None:
+            schema_path = Path(args.schema) if args.schema else DEFAULT_SCHEMA_BY_VERSION[cached["context_pack_version"]]
+            return report(
+                file_path,
+                cached["context_pack_version"],
+                schema_path,
+                (SchemaErrorItem(*e) for e in cached["errors"]),
+                max_errors=max_errors,
+                sort=args.sort,
+                writer=writer,
+            )
 
     try:
-        schema = load_schema(schema_path)
+        doc, source_map = load_pack(file_path, content, use_compiled=compiled_cache_enabled(args.compiled_cache))
     except Exception as e:
-        print(f"❌ Failed to load schema: {schema_path}: {e}", file=sys.stderr)
-        return 2
+        return _failure(writer, file_path, "Failed to load", e)
+
+    context_pack_version = detect_context_pack_version(doc)
+    schema_path = Path(args.schema) if args.schema else DEFAULT_SCHEMA_BY_VERSION[context_pack_version]
 
     try:
-        Draft202012Validator.check_schema(schema)
+        validator = compile_validator(schema_path, args.engine)
+    except SchemaError as e:
+        return _failure(writer, schema_path, "Invalid JSON Schema", e)
     except Exception as e:
-        print(f"❌ Invalid JSON Schema: {schema_path}: {e}", file=sys.stderr)
-        return 2
+        return _failure(writer, schema_path, "Failed to load schema", e)
 
-    validator = Draft202012Validator(schema)
-    errors = [(format_path(e.absolute_path), e.message) for e in validator.iter_errors(doc)]
+    errors = _RecordingErrors(iter_schema_errors(validator, doc, source_map))
+    rc = report(
+        file_path, context_pack_version, schema_path, errors, max_errors=max_errors, sort=args.sort, writer=writer
+    )
 
-    if errors:
-        print(f"❌ Schema validation failed: {file_path}", file=sys.stderr)
-        for path, message in sorted(errors, key=lambda x: x[0]):
-            print(f"- {path}: {message}", file=sys.stderr)
-        return 1
+    # A run cut short by the error limit has not seen every error, so it is not cached.
+    if cache is not None and key is not None and errors.complete:
+        cache.put(key, {"context_pack_version": context_pack_version, "errors": [list(e) for e in errors.seen]})
+        cache.evict()
 
-    print(f"✅ Schema validation passed: {file_path} (Context Pack v{context_pack_version}, schema: {schema_path})")
-    return 0
+    return rc
 
 
 if __name__ == "__main__":
@@ -4,11 +4,16 @@
 from __future__ import annotations
 
 import argparse
-import json
+import glob
+import itertools
 import os
+import re
 import sys
-from dataclasses import dataclass
-from typing import Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Optional
 
 try:
     import yaml
@@ -17,19 +22,65 @@ except ImportError:
     print("   Install: python3 -m pip install -r scripts/requirements-qa.txt", file=sys.stderr)
     raise SystemExit(2)
 
+# Keep the shared helper modules importable when this script is loaded via importlib.
+if str(Path(__file__).resolve().parent) not in sys.path:
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import context_pack_cache
+import context_pack_loader
+from context_pack_cache import DEFAULT_MAX_BYTES, ValidationCache, cache_key, open_cache, sha256_file
+from context_pack_loader import SourceMap, compiled_cache_enabled, load_pack, parse_document_with_source_map
+from qa_findings import Finding, FindingWriter, add_format_argument, open_writer
+
+
+CONTEXT_PACK_EXTS = (".yaml", ".yml", ".json")
+
+# Rule ids reported with each error (e.g. in --format jsonl/sarif output).
+RULE_TYPE = "lint/type"
+RULE_REQUIRED = "lint/required"
+RULE_ENTRY = "lint/entry"
+RULE_DUPLICATE_ID = "lint/duplicate-id"
+RULE_REFERENCE = "lint/reference"
+RULE_ID_COLLISION = "lint/id-collision"
+RULE_LOAD_ERROR = "load-error"
+
 
 @dataclass(frozen=True)
 class ValidationErrorItem:
     path: str
     message: str
+    rule: str
+    # 1-based source position of ``path`` (YAML input only; filled in by validate_file).
+    line: Optional[int] = None
+    column: Optional[int] = None
+    parts: tuple[Any, ...] = field(default=(), compare=False, repr=False)
+
+
+@dataclass(frozen=True)
+class FileValidationResult:
+    file: str
+    context_pack_version: Optional[int]
+    errors: tuple[ValidationErrorItem, ...]
+    load_error: Optional[str] = None
+    # True when validation stopped at the error limit before reaching the end of the document.
+    truncated: bool = False
+
+
+ErrorCallback = Callable[[int, ValidationErrorItem], None]
 
 
 def _is_non_empty_str(v: Any) -> bool:
-    return isinstance(v, str) and v.strip() != ""
+    # Same as ``v.strip() != ""`` without allocating the stripped copy.
+    return isinstance(v, str) and v != "" and not v.isspace()
 
 
 def _is_str_list(v: Any) -> bool:
-    return isinstance(v, list) and all(_is_non_empty_str(x) for x in v)
+    if not isinstance(v, list):
+        return False
+    for x in v:
+        if not isinstance(x, str) or x == "" or x.isspace():
+            return False
+    return True
 
 
 def _is_list(v: Any) -> bool:
@@ -65,483 +116,1252 @@ def _is_forbidden_tool_list(v: Any) -> bool:
     return isinstance(v, list) and all(_is_forbidden_tool_contract(x) for x in v)
 
 
-def _expect(cond: bool, path: str, message: str, errors: list[ValidationErrorItem]) -> None:
-    if not cond:
-        errors.append(ValidationErrorItem(path=path, message=message))
+def _is_dict(v: Any) -> bool:
+    return isinstance(v, dict)
+
+
+def _is_positive_int(v: Any) -> bool:
+    return isinstance(v, int) and v >= 1
+
+
+def _is_two(v: Any) -> bool:
+    return v == 2
+
+
+def _is_non_empty_rule(value: Any) -> bool:
+    return _is_non_empty_str(value) or (isinstance(value, list) and len(value) > 0 and _is_str_list(value))
+
+
+def _has_mapping_endpoints(item: dict[str, Any]) -> bool:
+    return (_is_non_empty_str(item.get("source")) and _is_non_empty_str(item.get("target"))) or (
+        _is_non_empty_str(item.get("from")) and _is_non_empty_str(item.get("to"))
+    )
+
+
+def _has_view_or_focus(item: dict[str, Any]) -> bool:
+    focus = item.get("focus")
+    return _is_non_empty_str(item.get("view")) or _is_non_empty_str(focus) or (
+        isinstance(focus, list) and len(focus) > 0 and _is_str_list(focus)
+    )
+
+
+def _has_handled_operation(item: dict[str, Any]) -> bool:
+    handles = item.get("handles")
+    return _is_non_empty_str(item.get("operation")) or (
+        isinstance(handles, list) and len(handles) > 0 and _is_str_list(handles)
+    )
+
+
+def parse_document(content: bytes, ext: str) -> Any:
+    return parse_document_with_source_map(content, ext)[0]
 
 
 def load_document(file_path: str) -> Any:
     ext = os.path.splitext(file_path)[1].lower()
-    with open(file_path, "r", encoding="utf-8") as f:
-        if ext in (".yml", ".yaml"):
-            return yaml.safe_load(f)
-        if ext == ".json":
-            return json.load(f)
-    raise ValueError(f"Unsupported file extension: {ext} (expected .yaml/.yml/.json)")
+    with open(file_path, "rb") as f:
+        content = f.read()
+    return parse_document(content, ext)
+
+
+def _format_path(parts: tuple[Any, ...]) -> str:
+    out = "$"
+    for part in parts:
+        out += f"[{part}]" if isinstance(part, int) else f".{part}"
+    return out
+
+
+def _error(parts: tuple[Any, ...], message: str, rule: str = RULE_TYPE) -> ValidationErrorItem:
+    # Paths are only rendered here, i.e. when a rule actually fails.
+    return ValidationErrorItem(path=_format_path(parts), message=message, rule=rule, parts=parts)
+
+
+# (namespace, path to the entry list, key holding the id). String entries count as bare ids.
+SYMBOL_SOURCES: list[tuple[str, tuple[str, ...], str]] = [
+    ("object", ("objects",), "id"),
+    ("morphism", ("morphisms",), "id"),
+    ("diagram", ("diagrams",), "id"),
+    ("acceptance_test", ("acceptance_tests",), "id"),
+    ("schema", ("data_contracts", "schemas"), "id"),
+    ("component", ("open_systems", "components"), "id"),
+    ("effect_operation", ("effects", "operations"), "id"),
+    ("handler", ("effects", "handlers"), "id"),
+    ("tool", ("agent_runtime", "allowed_tools"), "name"),
+]
+
+# Free-text fields refer to diagrams and acceptance tests by their conventional D<n>-/AT<n>- ids.
+# A mention is the longest D<n>[-suffix]/AT<n>[-suffix] run in the text, so prose glued
+# to an id with a hyphen is read as part of it.
+DIAGRAM_MENTION_RE = re.compile(r"(?<![0-9A-Za-z_-])D\d+(?:-[0-9A-Za-z_]+)*")
+ACCEPTANCE_TEST_MENTION_RE = re.compile(r"(?<![0-9A-Za-z_-])AT\d+(?:-[0-9A-Za-z_]+)*")
+
+
+class SymbolCollision(NamedTuple):
+    # (SYMBOL_SOURCES position, entry index) of the later definition; collisions are reported in this order.
+    order: tuple[int, int]
+    symbol: str
+    # Path parts of the later definition and of the first definition in another namespace.
+    parts: tuple[Any, ...]
+    first_parts: tuple[Any, ...]
+
+
+@dataclass
+class SymbolTable:
+    """Every id defined in one document, indexed by namespace for O(1) reference resolution."""
+
+    # namespace -> id -> index of the defining entry
+    namespaces: dict[str, dict[str, int]]
+    collisions: list[SymbolCollision]
+    # Namespaces whose source is present as a list (references into absent sections are not resolved).
+    present: set[str]
+    # namespace -> the part before the first hyphen of each hyphenated id ("AT1" for "AT1-happy-path").
+    prefixes: dict[str, set[str]]
+
+    def defines(self, namespace: str, symbol: Any) -> bool:
+        return isinstance(symbol, str) and symbol in self.namespaces[namespace]
+
+    def defines_any(self, namespaces: tuple[str, ...], symbol: Any) -> bool:
+        return any(self.defines(namespace, symbol) for namespace in namespaces)
+
+    def resolves_mention(self, namespace: str, mention: str) -> bool:
+        """Whether a free-text mention names a defined id: the id itself, or just its
+        ``D<n>``/``AT<n>`` number (``AT1`` for ``AT1-happy-path``)."""
+        return mention in self.namespaces[namespace] or mention in self.prefixes[namespace]
+
+
+def _mention_prefixes(table: dict[str, int]) -> set[str]:
+    return {symbol.partition("-")[0] for symbol in table if "-" in symbol}
+
+
+def _section_value(doc: Any, keys: tuple[str, ...]) -> Any:
+    value: Any = doc
+    for key in keys:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _section_list(doc: Any, keys: tuple[str, ...]) -> list[Any]:
+    value = _section_value(doc, keys)
+    return value if isinstance(value, list) else []
+
+
+def build_symbol_table(doc: Any) -> SymbolTable:
+    namespaces: dict[str, dict[str, int]] = {namespace: {} for namespace, _, _ in SYMBOL_SOURCES}
+    # id -> path parts of its first definition in any namespace (namespace is the first element).
+    owners: dict[str, tuple[Any, ...]] = {}
+    collisions: list[SymbolCollision] = []
+    present: set[str] = set()
+    if not isinstance(doc, dict):
+        prefixes: dict[str, set[str]] = {namespace: set() for namespace in namespaces}
+        return SymbolTable(namespaces=namespaces, collisions=collisions, present=present, prefixes=prefixes)
+
+    for order, (namespace, keys, id_key) in enumerate(SYMBOL_SOURCES):
+        items = _section_value(doc, keys)
+        if not isinstance(items, list):
+            continue
+        present.add(namespace)
+        table = namespaces[namespace]
+        for i, item in enumerate(items):
+            is_object = isinstance(item, dict)
+            symbol = item.get(id_key) if is_object else item
+            if not isinstance(symbol, str) or symbol == "" or symbol.isspace():
+                continue
+            if symbol in table:
+                # Duplicates inside one namespace are reported by the unique-id rules.
+                continue
+            table[symbol] = i
+            owner = owners.get(symbol)
+            if owner is None:
+                owners[symbol] = (namespace, i, is_object)
+            elif owner[0] != namespace:
+                collisions.append(
+                    SymbolCollision((order, i), symbol, _symbol_parts(namespace, i, is_object), _symbol_parts(*owner))
+                )
+    prefixes = {namespace: _mention_prefixes(table) for namespace, table in namespaces.items()}
+    return SymbolTable(namespaces=namespaces, collisions=collisions, present=present, prefixes=prefixes)
+
+
+def _overlaps(a: tuple[Any, ...], b: tuple[Any, ...]) -> bool:
+    """True when one path is a prefix of the other, i.e. changing one may change the other."""
+    n = min(len(a), len(b))
+    return a[:n] == b[:n]
+
+
+def _namespaces_under(touched: tuple[Any, ...]) -> set[str]:
+    return {namespace for namespace, keys, _ in SYMBOL_SOURCES if _overlaps(keys, touched)}
+
+
+def update_symbol_table(base: SymbolTable, doc: Any, touched: tuple[Any, ...]) -> tuple[SymbolTable, set[str]]:
+    """Return the symbol table of ``doc`` and the ids whose definitions changed.
+
+    ``doc`` must equal the document ``base`` was built from everywhere outside the
+    subtree at ``touched``. Only the namespaces defined under ``touched`` are
+    rebuilt, and collisions are recomputed only for the ids they define.
+    """
+    affected = _namespaces_under(tuple(touched))
+    if not affected or not isinstance(doc, dict):
+        return base, set()
+    namespaces = dict(base.namespaces)
+    prefixes = dict(base.prefixes)
+    present = set(base.present)
+    changed: set[str] = set()
+    for namespace, keys, id_key in SYMBOL_SOURCES:
+        if namespace not in affected:
+            continue
+        changed.update(namespaces[namespace])
+        table: dict[str, int] = {}
+        items = _section_value(doc, keys)
+        if isinstance(items, list):
+            present.add(namespace)
+            for i, item in enumerate(items):
+                symbol = item.get(id_key) if isinstance(item, dict) else item
+                if isinstance(symbol, str) and symbol != "" and not symbol.isspace() and symbol not in table:
+                    table[symbol] = i
+        else:
+            present.discard(namespace)
+        namespaces[namespace] = table
+        prefixes[namespace] = _mention_prefixes(table)
+        changed.update(table)
+
+    collisions = [c for c in base.collisions if c.symbol not in changed]
+    for symbol in changed:
+        owner: Optional[tuple[Any, ...]] = None
+        for order, (namespace, keys, _) in enumerate(SYMBOL_SOURCES):
+            index = namespaces[namespace].get(symbol)
+            if index is None:
+                continue
+            is_object = isinstance(_section_list(doc, keys)[index], dict)
+            if owner is None:
+                owner = (namespace, index, is_object)
+            else:
+                collisions.append(
+                    SymbolCollision((order, index), symbol, _symbol_parts(namespace, index, is_object), _symbol_parts(*owner))
+                )
+    collisions.sort(key=lambda c: c.order)
+    return SymbolTable(namespaces=namespaces, collisions=collisions, present=present, prefixes=prefixes), changed
+
+
+def _symbol_parts(namespace: str, index: int, is_object: bool) -> tuple[Any, ...]:
+    for source_namespace, keys, id_key in SYMBOL_SOURCES:
+        if source_namespace == namespace:
+            return (*keys, index, id_key) if is_object else (*keys, index)
+    raise KeyError(namespace)
+
+
+# ---------------------------------------------------------------------------
+# Rule table
+#
+# The lint is described as data (Field / Entries / Section / StructuredEntries /
+# EntryCheck / Custom) and compiled once at import time into checker closures.
+# Every checker is a generator of ValidationErrorItem, so the rule order below is
+# also the order in which errors are reported.
+# ---------------------------------------------------------------------------
+
+# kind -> (predicate, message suffix appended to the key)
+FIELD_KINDS: dict[str, tuple[Callable[[Any], bool], str]] = {
+    "str": (_is_non_empty_str, "は空でない文字列である必要があります"),
+    "str_list": (_is_str_list, "は文字列配列である必要があります"),
+    "list": (_is_list, "は配列である必要があります"),
+    "object": (_is_dict, "はオブジェクトである必要があります"),
+    "positive_int": (_is_positive_int, "は 1 以上の整数である必要があります"),
+    "v2_version": (_is_two, "は 2 である必要があります"),
+    "rule": (_is_non_empty_rule, "は非空文字列または非空文字列配列である必要があります"),
+    "str_or_object_list": (_is_str_or_object_list, "は非空文字列またはオブジェクトの配列である必要があります"),
+    "allowed_tool_list": (
+        _is_allowed_tool_list,
+        "は非空文字列、または name/protocol/effect/input_schema_ref/output_schema_ref を持つ tool contract の配列である必要があります",
+    ),
+    "forbidden_tool_list": (
+        _is_forbidden_tool_list,
+        "は非空文字列、または name を持つ禁止 tool contract の配列である必要があります",
+    ),
+}
+
+ROOT_MESSAGE = "トップレベルはオブジェクト（dict）である必要があります"
+
+
+@dataclass(frozen=True)
+class Field:
+    """``key`` must match ``kind``; optional fields are only checked when present."""
+
+    key: str
+    kind: str
+    optional: bool = False
+    message: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class Required:
+    keys: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class EntryCheck:
+    """Predicate over a whole entry, reported at the entry path."""
+
+    predicate: Callable[[dict[str, Any]], bool]
+    message: str
+
+
+@dataclass(frozen=True)
+class Custom:
+    """Hand-written rule: ``check(container, parts, symbols)`` yields errors.
+
+    ``reads`` lists the document paths a top-level rule depends on (default: the whole
+    document) and ``refers_to`` the symbol namespaces it resolves; scoped validation
+    uses them to skip rules a change cannot affect.
+    """
+
+    check: Callable[[dict[str, Any], tuple[Any, ...], SymbolTable], Iterator[ValidationErrorItem]]
+    reads: tuple[tuple[str, ...], ...] = ((),)
+    refers_to: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class Section:
+    """``key`` must be an object whose members follow ``rules``."""
+
+    key: str
+    rules: tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class Entries:
+    """``key`` must be a list of ``label`` objects with unique ``id_key`` values."""
+
+    key: str
+    label: str
+    id_key: str
+    rules: tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class StructuredEntries:
+    """v2 list whose entries are a non-empty string or a ``label`` object following ``rules``.
+
+    The shape of the list itself is checked by the owning Section; absent or
+    non-list values are skipped here.
+    """
+
+    section: str
+    key: str
+    label: str
+    rules: tuple[Any, ...]
+
+
+Checker = Callable[[dict[str, Any], tuple[Any, ...], SymbolTable], Iterator[ValidationErrorItem]]
+
+# Kinds tested inline by the compiled field loop instead of calling their FIELD_KINDS
+# predicate, keyed to the type they require; "str" also requires a non-blank value.
+INLINE_TYPES: dict[str, type] = {"str": str, "list": list, "object": dict}
+
+# (key, inline type or None, predicate, message, optional) of a compiled Field.
+CompiledField = tuple[str, Optional[type], Callable[[Any], bool], str, bool]
 
 
-def _check_unique_ids(items: Any, id_key: str, path: str, errors: list[ValidationErrorItem]) -> dict[str, int]:
-    if not isinstance(items, list):
-        return {}
+def _compile_fields(rules: tuple[Field, ...]) -> Checker:
+    """Compile a run of Field rules into one loop over plain tuples, so a valid entry
+    costs a dict lookup and a type check per field."""
+    fields: list[CompiledField] = []
+    for rule in rules:
+        predicate, suffix = FIELD_KINDS[rule.kind]
+        fields.append((rule.key, INLINE_TYPES.get(rule.kind), predicate, rule.message or f"{rule.key} {suffix}", rule.optional))
+    compiled = tuple(fields)
 
+    def check_fields(obj: dict[str, Any], parts: tuple[Any, ...], symbols: SymbolTable) -> Iterator[ValidationErrorItem]:
+        for key, inline, predicate, message, optional in compiled:
+            if optional and key not in obj:
+                continue
+            v = obj.get(key)
+            if inline is str:
+                if isinstance(v, str) and v != "" and not v.isspace():
+                    continue
+            elif inline is not None:
+                if isinstance(v, inline):
+                    continue
+            elif predicate(v):
+                continue
+            yield _error((*parts, key), message)
+
+    return check_fields
+
+
+def _compile_members(rules: tuple[Any, ...]) -> Checker:
+    """Compile the rules for one object's members into a single checker closure.
+
+    Consecutive Field rules share one loop (see ``_compile_fields``); other rules are
+    compiled recursively and delegated to with ``yield from``, in rule order.
+    """
+    checkers: list[Checker] = []
+    for is_field, group in itertools.groupby(rules, key=lambda rule: isinstance(rule, Field)):
+        if is_field:
+            checkers.append(_compile_fields(tuple(group)))
+        else:
+            checkers.extend(map(_compile_rule, group))
+    if len(checkers) == 1:
+        return checkers[0]
+    compiled = tuple(checkers)
+
+    def check_members(obj: dict[str, Any], parts: tuple[Any, ...], symbols: SymbolTable) -> Iterator[ValidationErrorItem]:
+        for checker in compiled:
+            yield from checker(obj, parts, symbols)
+
+    return check_members
+
+
+def _iter_duplicate_ids(items: list[Any], id_key: str, parts: tuple[Any, ...]) -> Iterator[ValidationErrorItem]:
     seen: dict[str, int] = {}
     for i, item in enumerate(items):
         if not isinstance(item, dict):
             continue
         raw = item.get(id_key)
-        if not _is_non_empty_str(raw):
+        if not isinstance(raw, str) or raw == "" or raw.isspace():
             continue
         if raw in seen:
-            errors.append(
-                ValidationErrorItem(
-                    path=f"{path}[{i}].{id_key}",
-                    message=f"{id_key} が重複しています（先頭: {path}[{seen[raw]}].{id_key}）",
-                )
-            )
+            first = _format_path((*parts, seen[raw], id_key))
+            yield _error((*parts, i, id_key), f"{id_key} が重複しています（先頭: {first}）", RULE_DUPLICATE_ID)
         else:
             seen[raw] = i
-    return seen
 
 
-def _check_io_field_types(io_obj: Any, path: str, errors: list[ValidationErrorItem]) -> None:
-    if not isinstance(io_obj, dict):
+def _compile_rule(rule: Any) -> Checker:
+    if isinstance(rule, Required):
+        keys = rule.keys
+
+        def check_required(obj: dict[str, Any], parts: tuple[Any, ...], symbols: SymbolTable) -> Iterator[ValidationErrorItem]:
+            for key in keys:
+                if key not in obj:
+                    yield _error((*parts, key), "必須フィールドが欠落しています", RULE_REQUIRED)
+
+        return check_required
+
+    if isinstance(rule, EntryCheck):
+        predicate, message = rule.predicate, rule.message
+
+        def check_entry(obj: dict[str, Any], parts: tuple[Any, ...], symbols: SymbolTable) -> Iterator[ValidationErrorItem]:
+            if not predicate(obj):
+                yield _error(parts, message, RULE_ENTRY)
+
+        return check_entry
+
+    if isinstance(rule, Custom):
+        return rule.check
+
+    if isinstance(rule, Section):
+        key = rule.key
+        members = _compile_members(rule.rules)
+        section_message = f"{key} はオブジェクトである必要があります"
+
+        def check_section(obj: dict[str, Any], parts: tuple[Any, ...], symbols: SymbolTable) -> Iterator[ValidationErrorItem]:
+            value = obj.get(key)
+            if not isinstance(value, dict):
+                yield _error((*parts, key), section_message)
+                return
+            yield from members(value, (*parts, key), symbols)
+
+        return check_section
+
+    if isinstance(rule, Entries):
+        key, id_key = rule.key, rule.id_key
+        members = _compile_members(rule.rules)
+        list_message = f"{key} は配列である必要があります"
+        entry_message = f"{rule.label} エントリはオブジェクトである必要があります"
+
+        def check_entries(obj: dict[str, Any], parts: tuple[Any, ...], symbols: SymbolTable) -> Iterator[ValidationErrorItem]:
+            items = obj.get(key)
+            list_parts = (*parts, key)
+            if not isinstance(items, list):
+                yield _error(list_parts, list_message)
+                return
+            yield from _iter_duplicate_ids(items, id_key, list_parts)
+            for i, item in enumerate(items):
+                if not isinstance(item, dict):
+                    yield _error((*list_parts, i), entry_message)
+                    continue
+                yield from members(item, (*list_parts, i), symbols)
+
+        return check_entries
+
+    if isinstance(rule, StructuredEntries):
+        section, key = rule.section, rule.key
+        members = _compile_members(rule.rules)
+        entry_message = f"非空文字列または{rule.label}オブジェクトである必要があります"
+
+        def check_structured(obj: dict[str, Any], parts: tuple[Any, ...], symbols: SymbolTable) -> Iterator[ValidationErrorItem]:
+            container = obj.get(section)
+            if not isinstance(container, dict):
+                return
+            items = container.get(key)
+            if not isinstance(items, list):
+                return
+            list_parts = (*parts, section, key)
+            for i, item in enumerate(items):
+                if isinstance(item, str) and item != "" and not item.isspace():
+                    continue
+                if not isinstance(item, dict):
+                    yield _error((*list_parts, i), entry_message)
+                    continue
+                yield from members(item, (*list_parts, i), symbols)
+
+        return check_structured
+
+    raise ValueError(f"Unknown rule: {rule!r}")
+
+
+def _check_io_field_types(io_key: str) -> Custom:
+    def check(item: dict[str, Any], parts: tuple[Any, ...], symbols: SymbolTable) -> Iterator[ValidationErrorItem]:
+        io_obj = item.get(io_key)
+        if not isinstance(io_obj, dict):
+            return
+        for key, value in io_obj.items():
+            if not _is_non_empty_str(key):
+                yield _error((*parts, io_key), "input/output のキーは空でない文字列である必要があります")
+                continue
+            if not _is_non_empty_str(value):
+                yield _error((*parts, io_key, key), "input/output のフィールド型は空でない文字列である必要があります")
+
+    return Custom(check)
+
+
+def _check_involved(item: dict[str, Any], parts: tuple[Any, ...], symbols: SymbolTable) -> Iterator[ValidationErrorItem]:
+    involved = item.get("involved")
+    if involved is None:
+        return
+    if not isinstance(involved, dict):
+        yield _error((*parts, "involved"), "involved はオブジェクトである必要があります")
         return
-    for key, value in io_obj.items():
-        if not _is_non_empty_str(key):
-            errors.append(ValidationErrorItem(path=path, message="input/output のキーは空でない文字列である必要があります"))
+    for key, namespace, message in (
+        ("objects", "object", "objects に存在しない Object id が参照されています"),
+        ("morphisms", "morphism", "morphisms に存在しない Morphism id が参照されています"),
+    ):
+        if key not in involved:
             continue
-        if not _is_non_empty_str(value):
-            errors.append(
-                ValidationErrorItem(
-                    path=f"{path}.{key}",
-                    message="input/output のフィールド型は空でない文字列である必要があります",
-                )
-            )
+        refs = involved.get(key)
+        if not _is_str_list(refs):
+            yield _error((*parts, "involved", key), f"{key} は文字列配列である必要があります")
+        if isinstance(refs, list) and namespace in symbols.present:
+            for j, ref in enumerate(refs):
+                if not symbols.defines(namespace, ref):
+                    yield _error((*parts, "involved", key, j), message, RULE_REFERENCE)
+
+
+def _reference(
+    section: tuple[str, ...],
+    keys: tuple[str, ...],
+    namespaces: tuple[str, ...],
+    message: str,
+    list_keys: tuple[str, ...] = (),
+) -> Custom:
+    """Object entries of ``section`` must point at known ids via ``keys`` (scalars) and ``list_keys`` (lists)."""
+
+    def check(doc: dict[str, Any], parts: tuple[Any, ...], symbols: SymbolTable) -> Iterator[ValidationErrorItem]:
+        for i, item in enumerate(_section_list(doc, section)):
+            if not isinstance(item, dict):
+                continue
+            for key in keys:
+                value = item.get(key)
+                if _is_non_empty_str(value) and not symbols.defines_any(namespaces, value):
+                    yield _error((*parts, *section, i, key), message, RULE_REFERENCE)
+            for key in list_keys:
+                refs = item.get(key)
+                if not isinstance(refs, list):
+                    continue
+                for j, ref in enumerate(refs):
+                    if _is_non_empty_str(ref) and not symbols.defines_any(namespaces, ref):
+                        yield _error((*parts, *section, i, key, j), message, RULE_REFERENCE)
 
+    return Custom(check, reads=(section,), refers_to=namespaces)
 
-def validate_context_pack_v1(doc: Any) -> list[ValidationErrorItem]:
-    errors: list[ValidationErrorItem] = []
 
-    _expect(isinstance(doc, dict), "$", "トップレベルはオブジェクト（dict）である必要があります", errors)
-    if not isinstance(doc, dict):
-        return errors
+def _reference_list(section: tuple[str, ...], namespaces: tuple[str, ...], message: str) -> Custom:
+    """Every string in the list at ``section`` must be a known id."""
+
+    def check(doc: dict[str, Any], parts: tuple[Any, ...], symbols: SymbolTable) -> Iterator[ValidationErrorItem]:
+        for i, ref in enumerate(_section_list(doc, section)):
+            if _is_non_empty_str(ref) and not symbols.defines_any(namespaces, ref):
+                yield _error((*parts, *section, i), message, RULE_REFERENCE)
+
+    return Custom(check, reads=(section,), refers_to=namespaces)
 
-    required_top = [
-        "version",
-        "name",
-        "problem_statement",
+
+def _mentions(section: tuple[str, ...], namespace: str, pattern: re.Pattern[str], message: str) -> Custom:
+    """Ids matching ``pattern`` inside free-text list entries must be defined."""
+
+    def check(doc: dict[str, Any], parts: tuple[Any, ...], symbols: SymbolTable) -> Iterator[ValidationErrorItem]:
+        for i, text in enumerate(_section_list(doc, section)):
+            if not isinstance(text, str):
+                continue
+            for match in pattern.finditer(text):
+                if not symbols.resolves_mention(namespace, match.group(0)):
+                    yield _error((*parts, *section, i), f"{message}: {match.group(0)}", RULE_REFERENCE)
+
+    return Custom(check, reads=(section,), refers_to=(namespace,))
+
+
+V1_RULES: tuple[Any, ...] = (
+    Required(
+        (
+            "version",
+            "name",
+            "problem_statement",
+            "domain_glossary",
+            "objects",
+            "morphisms",
+            "diagrams",
+            "constraints",
+            "acceptance_tests",
+            "coding_conventions",
+            "forbidden_changes",
+        )
+    ),
+    Field("version", "positive_int"),
+    Field("name", "str"),
+    Section("problem_statement", (Field("goals", "str_list"), Field("non_goals", "str_list"))),
+    Section(
         "domain_glossary",
+        (Entries("terms", "term", "term", (Field("term", "str"), Field("ja", "str"))),),
+    ),
+    Entries(
         "objects",
+        "object",
+        "id",
+        (
+            Field("id", "str"),
+            Field("kind", "str"),
+            Field("states", "str_list", optional=True),
+            Field("fields", "str_list", optional=True),
+        ),
+    ),
+    Entries(
         "morphisms",
+        "morphism",
+        "id",
+        (
+            Field("id", "str"),
+            Field("input", "object"),
+            Field("output", "object"),
+            Field("pre", "str_list"),
+            Field("post", "str_list"),
+            Field("failures", "str_list"),
+            _check_io_field_types("input"),
+            _check_io_field_types("output"),
+        ),
+    ),
+    Entries(
         "diagrams",
-        "constraints",
+        "diagram",
+        "id",
+        (
+            Field("id", "str"),
+            Field("statement", "str"),
+            Field("verification", "str_list"),
+            Custom(_check_involved, refers_to=("object", "morphism")),
+        ),
+    ),
+    Field("constraints", "object"),
+    Entries(
         "acceptance_tests",
+        "acceptance_test",
+        "id",
+        (Field("id", "str"), Field("scenario", "str"), Field("expected", "str_list")),
+    ),
+    Section(
         "coding_conventions",
-        "forbidden_changes",
-    ]
-    for key in required_top:
-        _expect(key in doc, f"$.{key}", "必須フィールドが欠落しています", errors)
-
-    version = doc.get("version")
-    _expect(isinstance(version, int) and version >= 1, "$.version", "version は 1 以上の整数である必要があります", errors)
-
-    name = doc.get("name")
-    _expect(_is_non_empty_str(name), "$.name", "name は空でない文字列である必要があります", errors)
-
-    ps = doc.get("problem_statement")
-    _expect(isinstance(ps, dict), "$.problem_statement", "problem_statement はオブジェクトである必要があります", errors)
-    if isinstance(ps, dict):
-        _expect(_is_str_list(ps.get("goals")), "$.problem_statement.goals", "goals は文字列配列である必要があります", errors)
-        _expect(_is_str_list(ps.get("non_goals")), "$.problem_statement.non_goals", "non_goals は文字列配列である必要があります", errors)
-
-    glossary = doc.get("domain_glossary")
-    _expect(isinstance(glossary, dict), "$.domain_glossary", "domain_glossary はオブジェクトである必要があります", errors)
-    if isinstance(glossary, dict):
-        terms = glossary.get("terms")
-        _expect(isinstance(terms, list), "$.domain_glossary.terms", "terms は配列である必要があります", errors)
-        if isinstance(terms, list):
-            _check_unique_ids(terms, "term", "$.domain_glossary.terms", errors)
-            for i, t in enumerate(terms):
-                p = f"$.domain_glossary.terms[{i}]"
-                _expect(isinstance(t, dict), p, "term エントリはオブジェクトである必要があります", errors)
-                if isinstance(t, dict):
-                    _expect(_is_non_empty_str(t.get("term")), f"{p}.term", "term は空でない文字列である必要があります", errors)
-                    _expect(_is_non_empty_str(t.get("ja")), f"{p}.ja", "ja は空でない文字列である必要があります", errors)
-
-    objects = doc.get("objects")
-    _expect(isinstance(objects, list), "$.objects", "objects は配列である必要があります", errors)
-    if isinstance(objects, list):
-        object_id_index = _check_unique_ids(objects, "id", "$.objects", errors)
-        for i, o in enumerate(objects):
-            p = f"$.objects[{i}]"
-            _expect(isinstance(o, dict), p, "object エントリはオブジェクトである必要があります", errors)
-            if isinstance(o, dict):
-                _expect(_is_non_empty_str(o.get("id")), f"{p}.id", "id は空でない文字列である必要があります", errors)
-                _expect(_is_non_empty_str(o.get("kind")), f"{p}.kind", "kind は空でない文字列である必要があります", errors)
-                if "states" in o:
-                    _expect(_is_str_list(o.get("states")), f"{p}.states", "states は文字列配列である必要があります", errors)
-                if "fields" in o:
-                    _expect(_is_str_list(o.get("fields")), f"{p}.fields", "fields は文字列配列である必要があります", errors)
-
-    morphisms = doc.get("morphisms")
-    _expect(isinstance(morphisms, list), "$.morphisms", "morphisms は配列である必要があります", errors)
-    if isinstance(morphisms, list):
-        _check_unique_ids(morphisms, "id", "$.morphisms", errors)
-        for i, m in enumerate(morphisms):
-            p = f"$.morphisms[{i}]"
-            _expect(isinstance(m, dict), p, "morphism エントリはオブジェクトである必要があります", errors)
-            if isinstance(m, dict):
-                _expect(_is_non_empty_str(m.get("id")), f"{p}.id", "id は空でない文字列である必要があります", errors)
-                _expect(isinstance(m.get("input"), dict), f"{p}.input", "input はオブジェクトである必要があります", errors)
-                _expect(isinstance(m.get("output"), dict), f"{p}.output", "output はオブジェクトである必要があります", errors)
-                _expect(_is_str_list(m.get("pre")), f"{p}.pre", "pre は文字列配列である必要があります", errors)
-                _expect(_is_str_list(m.get("post")), f"{p}.post", "post は文字列配列である必要があります", errors)
-                _expect(_is_str_list(m.get("failures")), f"{p}.failures", "failures は文字列配列である必要があります", errors)
-                _check_io_field_types(m.get("input"), f"{p}.input", errors)
-                _check_io_field_types(m.get("output"), f"{p}.output", errors)
-
-    diagrams = doc.get("diagrams")
-    _expect(isinstance(diagrams, list), "$.diagrams", "diagrams は配列である必要があります", errors)
-    if isinstance(diagrams, list):
-        diagram_id_index = _check_unique_ids(diagrams, "id", "$.diagrams", errors)
-        for i, d in enumerate(diagrams):
-            p = f"$.diagrams[{i}]"
-            _expect(isinstance(d, dict), p, "diagram エントリはオブジェクトである必要があります", errors)
-            if isinstance(d, dict):
-                _expect(_is_non_empty_str(d.get("id")), f"{p}.id", "id は空でない文字列である必要があります", errors)
-                _expect(_is_non_empty_str(d.get("statement")), f"{p}.statement", "statement は空でない文字列である必要があります", errors)
-                _expect(_is_str_list(d.get("verification")), f"{p}.verification", "verification は文字列配列である必要があります", errors)
-
-                involved = d.get("involved")
-                if involved is not None:
-                    _expect(isinstance(involved, dict), f"{p}.involved", "involved はオブジェクトである必要があります", errors)
-                if isinstance(involved, dict):
-                    if "objects" in involved:
-                        objs = involved.get("objects")
-                        _expect(_is_str_list(objs), f"{p}.involved.objects", "objects は文字列配列である必要があります", errors)
-                        if isinstance(objs, list) and isinstance(objects, list):
-                            for j, oid in enumerate(objs):
-                                if oid not in object_id_index:
-                                    errors.append(
-                                        ValidationErrorItem(
-                                            path=f"{p}.involved.objects[{j}]",
-                                            message="objects に存在しない Object id が参照されています",
-                                        )
-                                    )
-                    if "morphisms" in involved:
-                        ms = involved.get("morphisms")
-                        _expect(_is_str_list(ms), f"{p}.involved.morphisms", "morphisms は文字列配列である必要があります", errors)
-                        if isinstance(ms, list) and isinstance(morphisms, list):
-                            morphism_ids = {m.get("id") for m in morphisms if isinstance(m, dict) and _is_non_empty_str(m.get("id"))}
-                            for j, mid in enumerate(ms):
-                                if mid not in morphism_ids:
-                                    errors.append(
-                                        ValidationErrorItem(
-                                            path=f"{p}.involved.morphisms[{j}]",
-                                            message="morphisms に存在しない Morphism id が参照されています",
-                                        )
-                                    )
-
-    constraints = doc.get("constraints")
-    _expect(isinstance(constraints, dict), "$.constraints", "constraints はオブジェクトである必要があります", errors)
-
-    ats = doc.get("acceptance_tests")
-    _expect(isinstance(ats, list), "$.acceptance_tests", "acceptance_tests は配列である必要があります", errors)
-    if isinstance(ats, list):
-        _check_unique_ids(ats, "id", "$.acceptance_tests", errors)
-        for i, at in enumerate(ats):
-            p = f"$.acceptance_tests[{i}]"
-            _expect(isinstance(at, dict), p, "acceptance_test エントリはオブジェクトである必要があります", errors)
-            if isinstance(at, dict):
-                _expect(_is_non_empty_str(at.get("id")), f"{p}.id", "id は空でない文字列である必要があります", errors)
-                _expect(_is_non_empty_str(at.get("scenario")), f"{p}.scenario", "scenario は空でない文字列である必要があります", errors)
-                _expect(_is_str_list(at.get("expected")), f"{p}.expected", "expected は文字列配列である必要があります", errors)
-
-    cc = doc.get("coding_conventions")
-    _expect(isinstance(cc, dict), "$.coding_conventions", "coding_conventions はオブジェクトである必要があります", errors)
-    if isinstance(cc, dict):
-        _expect(_is_non_empty_str(cc.get("language")), "$.coding_conventions.language", "language は空でない文字列である必要があります", errors)
-        _expect(_is_str_list(cc.get("directory")), "$.coding_conventions.directory", "directory は文字列配列である必要があります", errors)
-        _expect(isinstance(cc.get("dependencies"), dict), "$.coding_conventions.dependencies", "dependencies はオブジェクトである必要があります", errors)
-
-    fc = doc.get("forbidden_changes")
-    _expect(_is_str_list(fc), "$.forbidden_changes", "forbidden_changes は文字列配列である必要があります", errors)
-
-    return errors
-
-
-def _expect_object_with_required_keys(
-    doc: dict[str, Any],
-    key: str,
-    required: list[tuple[str, str]],
-    errors: list[ValidationErrorItem],
-) -> Optional[dict[str, Any]]:
-    value = doc.get(key)
-    _expect(isinstance(value, dict), f"$.{key}", f"{key} はオブジェクトである必要があります", errors)
-    if not isinstance(value, dict):
-        return None
-
-    for child, kind in required:
-        path = f"$.{key}.{child}"
-        child_value = value.get(child)
-        if kind == "array":
-            _expect(_is_list(child_value), path, f"{child} は配列である必要があります", errors)
-        elif kind == "str_array":
-            _expect(_is_str_list(child_value), path, f"{child} は文字列配列である必要があります", errors)
-        elif kind == "str_or_object_array":
-            _expect(
-                _is_str_or_object_list(child_value),
-                path,
-                f"{child} は非空文字列またはオブジェクトの配列である必要があります",
-                errors,
-            )
-        elif kind == "allowed_tool_array":
-            _expect(
-                _is_allowed_tool_list(child_value),
-                path,
-                f"{child} は非空文字列、または name/protocol/effect/input_schema_ref/output_schema_ref を持つ tool contract の配列である必要があります",
-                errors,
-            )
-        elif kind == "forbidden_tool_array":
-            _expect(
-                _is_forbidden_tool_list(child_value),
-                path,
-                f"{child} は非空文字列、または name を持つ禁止 tool contract の配列である必要があります",
-                errors,
-            )
-        elif kind == "object":
-            _expect(isinstance(child_value, dict), path, f"{child} はオブジェクトである必要があります", errors)
-        else:
-            raise ValueError(f"Unknown validation kind: {kind}")
-    return value
+        (Field("language", "str"), Field("directory", "str_list"), Field("dependencies", "object")),
+    ),
+    Field("forbidden_changes", "str_list"),
+)
+
+V2_RULES: tuple[Any, ...] = (
+    Field("version", "v2_version", message="v2 では version は 2 である必要があります"),
+    Field("context_pack_version", "v2_version", message="context_pack_version は 2 である必要があります"),
+    Section(
+        "data_contracts",
+        (Field("schemas", "list"), Field("mappings", "list"), Field("migration_verification", "str_or_object_list")),
+    ),
+    Section("open_systems", (Field("components", "list"), Field("boundaries", "list"), Field("composition", "list"))),
+    Section("views", (Field("lenses_or_optics", "list"),)),
+    Section(
+        "effects",
+        (Field("operations", "list"), Field("handlers", "list"), Field("effect_safety_notes", "str_list")),
+    ),
+    Section(
+        "agent_runtime",
+        (
+            Field("allowed_tools", "allowed_tool_list"),
+            Field("forbidden_tools", "forbidden_tool_list"),
+            Field("guardrails", "object"),
+            Field("trace_evidence", "object"),
+        ),
+    ),
+    Section(
+        "resource_constraints",
+        (Field("tool_budget", "object"), Field("data_sensitivity", "object"), Field("linear_resources", "list")),
+    ),
+    Section(
+        "change_semantics",
+        (
+            Field("allowed_refactors", "str_list"),
+            Field("forbidden_conflict_resolutions", "str_list"),
+            Field("merge_invariants", "str_list"),
+        ),
+    ),
+    Section(
+        "formalization_level",
+        (
+            Field("metaphor_only", "str_list"),
+            Field("machine_checked", "str_list"),
+            Field("tested_by_ci", "str_list"),
+            Field("reviewed_manually", "str_list"),
+        ),
+    ),
+    # Semantic lint for the intentionally shallow v2 structured-entry contract.
+    StructuredEntries("data_contracts", "schemas", "構造化", (Field("id", "str"),)),
+    StructuredEntries("open_systems", "components", "構造化", (Field("id", "str"),)),
+    StructuredEntries("open_systems", "boundaries", "構造化", (Field("id", "str"),)),
+    StructuredEntries("open_systems", "composition", "構造化", (Field("id", "str"),)),
+    StructuredEntries(
+        "data_contracts",
+        "mappings",
+        "mapping",
+        (Field("id", "str"), EntryCheck(_has_mapping_endpoints, "source/targetまたはfrom/toの非空endpointが必要です")),
+    ),
+    StructuredEntries("data_contracts", "migration_verification", "verification", (Field("type", "str"),)),
+    StructuredEntries(
+        "views",
+        "lenses_or_optics",
+        "view/optic",
+        (Field("id", "str"), Field("source", "str"), EntryCheck(_has_view_or_focus, "非空のviewまたはfocusが必要です")),
+    ),
+    StructuredEntries("effects", "operations", "effect operation", (Field("id", "str"), Field("kind", "str"))),
+    StructuredEntries(
+        "effects",
+        "handlers",
+        "effect handler",
+        (Field("id", "str"), EntryCheck(_has_handled_operation, "非空のoperationまたはhandlesが必要です")),
+    ),
+    StructuredEntries("resource_constraints", "linear_resources", "linear resource", (Field("id", "str"), Field("rule", "rule"))),
+    # Cross-references resolved through the document's symbol table.
+    _reference(
+        ("effects", "handlers"),
+        ("operation",),
+        ("effect_operation",),
+        "effects.operations に存在しない effect operation id が参照されています",
+        list_keys=("handles",),
+    ),
+    _reference(
+        ("data_contracts", "mappings"),
+        ("source", "target"),
+        ("schema",),
+        "data_contracts.schemas に存在しない schema id が参照されています",
+    ),
+    _reference(
+        ("views", "lenses_or_optics"),
+        ("source",),
+        ("object", "schema"),
+        "objects / data_contracts.schemas に存在しない id が参照されています",
+    ),
+    _mentions(
+        ("change_semantics", "merge_invariants"),
+        "diagram",
+        DIAGRAM_MENTION_RE,
+        "diagrams に存在しない Diagram id が参照されています",
+    ),
+    _mentions(
+        ("formalization_level", "tested_by_ci"),
+        "acceptance_test",
+        ACCEPTANCE_TEST_MENTION_RE,
+        "acceptance_tests に存在しない acceptance test id が参照されています",
+    ),
+    _reference_list(
+        ("resource_constraints", "data_sensitivity", "pii", "allowed_tools"),
+        ("tool",),
+        "agent_runtime.allowed_tools に存在しない tool が参照されています",
+    ),
+)
+
+_CHECK_V1 = _compile_members(V1_RULES)
+_CHECK_V2 = _compile_members(V2_RULES)
+
+
+def _iter_symbol_collisions(symbols: SymbolTable, only: Optional[set[str]] = None) -> Iterator[ValidationErrorItem]:
+    for _, symbol, parts, first_parts in symbols.collisions:
+        if only is not None and symbol not in only:
+            continue
+        yield _error(
+            parts,
+            f"id が別の種類の定義と衝突しています（先頭: {_format_path(first_parts)}）",
+            RULE_ID_COLLISION,
+        )
 
 
-def _is_non_empty_rule(value: Any) -> bool:
-    return _is_non_empty_str(value) or (isinstance(value, list) and len(value) > 0 and _is_str_list(value))
+def _iter_v1_errors(doc: Any, symbols: SymbolTable) -> Iterator[ValidationErrorItem]:
+    if not isinstance(doc, dict):
+        yield _error((), ROOT_MESSAGE)
+        return
+    yield from _CHECK_V1(doc, (), symbols)
+
+
+def _iter_v2_errors(doc: Any, symbols: SymbolTable) -> Iterator[ValidationErrorItem]:
+    yield from _iter_v1_errors(doc, symbols)
+    if not isinstance(doc, dict):
+        yield _error((), ROOT_MESSAGE)
+        return
+    yield from _CHECK_V2(doc, (), symbols)
+
+
+def iter_errors_v1(doc: Any) -> Iterator[ValidationErrorItem]:
+    """Yield v1 lint errors in document order as they are found."""
+    symbols = build_symbol_table(doc)
+    yield from _iter_v1_errors(doc, symbols)
+    yield from _iter_symbol_collisions(symbols)
+
+
+def iter_errors_v2(doc: Any) -> Iterator[ValidationErrorItem]:
+    """Yield v2 lint errors in document order as they are found."""
+    symbols = build_symbol_table(doc)
+    yield from _iter_v2_errors(doc, symbols)
+    yield from _iter_symbol_collisions(symbols)
+
+
+def _rule_scope(rule: Any) -> tuple[tuple[tuple[str, ...], ...], frozenset[str]]:
+    """(top-level paths ``rule`` reads, symbol namespaces it or its nested rules resolve)."""
+    if isinstance(rule, Custom):
+        return rule.reads, frozenset(rule.refers_to)
+    if isinstance(rule, Required):
+        return tuple((key,) for key in rule.keys), frozenset()
+    if isinstance(rule, Field):
+        return ((rule.key,),), frozenset()
+    nested = frozenset().union(*(_rule_scope(r)[1] for r in rule.rules if not isinstance(r, EntryCheck)))
+    if isinstance(rule, StructuredEntries):
+        return ((rule.section, rule.key),), nested
+    return ((rule.key,),), nested
+
+
+@lru_cache(maxsize=None)
+def _scoped_v2_rules() -> tuple[tuple[tuple[tuple[str, ...], ...], frozenset[str], Checker], ...]:
+    return tuple((*_rule_scope(rule), _compile_members((rule,))) for rule in (*V1_RULES, *V2_RULES))
+
+
+def iter_errors_v2_scoped(
+    doc: Any,
+    touched: tuple[Any, ...],
+    base_symbols: Optional[SymbolTable] = None,
+) -> Iterator[ValidationErrorItem]:
+    """Yield the v2 lint errors that may change when only the subtree at ``touched`` changed.
+
+    ``doc`` must equal a base document everywhere outside ``touched`` (e.g. a
+    path-copied overlay). Only the rules reading a path that overlaps ``touched``, or
+    resolving ids defined under it, are run, plus the id collisions of the ids it
+    defines. Pass the base document's ``build_symbol_table`` result as
+    ``base_symbols`` to rebuild just the affected namespaces. Errors from the other
+    rules are the base document's and are not reported.
+    """
+    touched = tuple(touched)
+    if not isinstance(doc, dict) or not touched:
+        yield from iter_errors_v2(doc)
+        return
+    if base_symbols is None:
+        symbols = build_symbol_table(doc)
+        changed = {symbol for ns in _namespaces_under(touched) for symbol in symbols.namespaces[ns]}
+    else:
+        symbols, changed = update_symbol_table(base_symbols, doc, touched)
+    affected = _namespaces_under(touched)
+    for reads, refers_to, check in _scoped_v2_rules():
+        if refers_to & affected or any(_overlaps(path, touched) for path in reads):
+            yield from check(doc, (), symbols)
+    yield from _iter_symbol_collisions(symbols, changed)
+
+
+def iter_errors(doc: Any, context_pack_version: Optional[int] = None) -> Iterator[ValidationErrorItem]:
+    """Yield lint errors for ``doc``, detecting the Context Pack version unless given.
+
+    Stop consuming the generator to stop validating, e.g. with ``itertools.islice``.
+    """
+    if context_pack_version is None:
+        context_pack_version = detect_context_pack_version(doc)
+    if context_pack_version == 2:
+        return iter_errors_v2(doc)
+    return iter_errors_v1(doc)
 
 
-def _validate_v2_structured_entries(doc: dict[str, Any], errors: list[ValidationErrorItem]) -> None:
-    """Semantic lint for the intentionally shallow v2 structured-entry contract."""
-
-    def entries(section: str, field: str) -> list[Any]:
-        section_value = doc.get(section)
-        if not isinstance(section_value, dict):
-            return []
-        value = section_value.get(field)
-        return value if isinstance(value, list) else []
-
-    def require_string(item: dict[str, Any], key: str, path: str) -> None:
-        _expect(_is_non_empty_str(item.get(key)), f"{path}.{key}", f"{key} は空でない文字列である必要があります", errors)
-
-    id_only_fields = [
-        ("data_contracts", "schemas"),
-        ("open_systems", "components"),
-        ("open_systems", "boundaries"),
-        ("open_systems", "composition"),
-    ]
-    for section, field in id_only_fields:
-        for index, item in enumerate(entries(section, field)):
-            path = f"$.{section}.{field}[{index}]"
-            if _is_non_empty_str(item):
+def validate_context_pack_v1(doc: Any) -> list[ValidationErrorItem]:
+    return list(iter_errors_v1(doc))
+
+
+def validate_context_pack_v2(doc: Any) -> list[ValidationErrorItem]:
+    return list(iter_errors_v2(doc))
+
+
+def detect_context_pack_version(doc: Any) -> int:
+    if isinstance(doc, dict) and (doc.get("context_pack_version") == 2 or doc.get("version") == 2):
+        return 2
+    return 1
+
+
+def _iter_context_pack_files(directory: str) -> list[str]:
+    found: list[str] = []
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        for filename in filenames:
+            # Hidden files include the compiled pack cache (.<name>.compiled.json).
+            if filename.startswith("."):
                 continue
-            _expect(isinstance(item, dict), path, "非空文字列または構造化オブジェクトである必要があります", errors)
-            if isinstance(item, dict):
-                require_string(item, "id", path)
+            if os.path.splitext(filename)[1].lower() in CONTEXT_PACK_EXTS:
+                found.append(os.path.join(dirpath, filename))
+    return found
+
+
+def expand_targets(targets: list[str]) -> list[str]:
+    """Expand files, directories, and glob patterns into a sorted, de-duplicated file list.
+
+    Explicit file paths are kept even when they do not exist so that the caller can
+    report them as load failures instead of silently dropping them.
+    """
+    files: set[str] = set()
+    for target in targets:
+        if os.path.isdir(target):
+            files.update(_iter_context_pack_files(target))
+        elif glob.has_magic(target) and not os.path.exists(target):
+            for match in glob.glob(target, recursive=True):
+                if os.path.isdir(match):
+                    files.update(_iter_context_pack_files(match))
+                elif os.path.splitext(match)[1].lower() in CONTEXT_PACK_EXTS:
+                    files.add(match)
+        else:
+            files.add(target)
+    return sorted(files)
 
-    for index, item in enumerate(entries("data_contracts", "mappings")):
-        path = f"$.data_contracts.mappings[{index}]"
-        if _is_non_empty_str(item):
-            continue
-        _expect(isinstance(item, dict), path, "非空文字列またはmappingオブジェクトである必要があります", errors)
-        if isinstance(item, dict):
-            require_string(item, "id", path)
-            endpoints = (
-                _is_non_empty_str(item.get("source")) and _is_non_empty_str(item.get("target"))
-            ) or (_is_non_empty_str(item.get("from")) and _is_non_empty_str(item.get("to")))
-            _expect(endpoints, path, "source/targetまたはfrom/toの非空endpointが必要です", errors)
-
-    for index, item in enumerate(entries("data_contracts", "migration_verification")):
-        path = f"$.data_contracts.migration_verification[{index}]"
-        if _is_non_empty_str(item):
-            continue
-        _expect(isinstance(item, dict), path, "非空文字列またはverificationオブジェクトである必要があります", errors)
-        if isinstance(item, dict):
-            require_string(item, "type", path)
 
-    for index, item in enumerate(entries("views", "lenses_or_optics")):
-        path = f"$.views.lenses_or_optics[{index}]"
-        if _is_non_empty_str(item):
-            continue
-        _expect(isinstance(item, dict), path, "非空文字列またはview/opticオブジェクトである必要があります", errors)
-        if isinstance(item, dict):
-            require_string(item, "id", path)
-            require_string(item, "source", path)
-            focus = item.get("focus")
-            has_view_or_focus = _is_non_empty_str(item.get("view")) or _is_non_empty_str(focus) or (
-                isinstance(focus, list) and len(focus) > 0 and _is_str_list(focus)
-            )
-            _expect(has_view_or_focus, path, "非空のviewまたはfocusが必要です", errors)
+def read_file_list(list_path: str) -> list[str]:
+    if list_path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(list_path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.lstrip().startswith("#")]
 
-    for index, item in enumerate(entries("effects", "operations")):
-        path = f"$.effects.operations[{index}]"
-        if _is_non_empty_str(item):
-            continue
-        _expect(isinstance(item, dict), path, "非空文字列またはeffect operationオブジェクトである必要があります", errors)
-        if isinstance(item, dict):
-            require_string(item, "id", path)
-            require_string(item, "kind", path)
-
-    for index, item in enumerate(entries("effects", "handlers")):
-        path = f"$.effects.handlers[{index}]"
-        if _is_non_empty_str(item):
-            continue
-        _expect(isinstance(item, dict), path, "非空文字列またはeffect handlerオブジェクトである必要があります", errors)
-        if isinstance(item, dict):
-            require_string(item, "id", path)
-            handles = item.get("handles")
-            has_operation = _is_non_empty_str(item.get("operation")) or (
-                isinstance(handles, list) and len(handles) > 0 and _is_str_list(handles)
+
+@lru_cache(maxsize=None)
+def validator_fingerprint() -> str:
+    """Identify this lint implementation and the loader and cache modules its results go
+    through, so cached results are dropped when any of them change."""
+    modules = (Path(context_pack_loader.__file__), Path(context_pack_cache.__file__))
+    return "|".join([f"semantic:{sha256_file(Path(__file__))}", *(f"{p.name}:{sha256_file(p)}" for p in modules)])
+
+
+def with_positions(errors: Iterable[ValidationErrorItem], source_map: Optional[SourceMap]) -> Iterator[ValidationErrorItem]:
+    """Attach YAML source positions to errors; only paths that failed are ever resolved."""
+    if source_map is None:
+        yield from errors
+        return
+    for item in errors:
+        position = source_map.locate(item.parts)
+        yield item if position is None else replace(item, line=position[0], column=position[1])
+
+
+def _take_errors(
+    errors: Iterator[ValidationErrorItem],
+    context_pack_version: int,
+    max_errors: Optional[int],
+    on_error: Optional[ErrorCallback],
+) -> tuple[list[ValidationErrorItem], bool]:
+    """Consume at most ``max_errors`` errors; the flag tells whether more were left unread."""
+    taken: list[ValidationErrorItem] = []
+    for item in errors:
+        if max_errors is not None and len(taken) >= max_errors:
+            return taken, True
+        taken.append(item)
+        if on_error is not None:
+            on_error(context_pack_version, item)
+    return taken, False
+
+
+def validate_file(
+    file_path: str,
+    cache: Optional[ValidationCache] = None,
+    max_errors: Optional[int] = None,
+    on_error: Optional[ErrorCallback] = None,
+    use_compiled: bool = False,
+) -> FileValidationResult:
+    """Validate one file, stopping after ``max_errors`` errors when given.
+
+    ``on_error`` is called for each error as soon as it is found, before the result is returned.
+    Only complete results are written to ``cache``. ``use_compiled`` loads YAML through the
+    compiled pack cache next to the source.
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    try:
+        with open(file_path, "rb") as f:
+            content = f.read()
+    except Exception as e:
+        return FileValidationResult(file=file_path, context_pack_version=None, errors=(), load_error=str(e))
+
+    key = None
+    if cache is not None:
+        key = cache_key(content, ext, validator_fingerprint())
+        cached = cache.get(key)
+        if cached is not None:
+            errors, truncated = _take_errors(
+                (
+                    ValidationErrorItem(path=path, message=message, rule=rule, line=line, column=column)
+                    for path, message, rule, line, column in cached["errors"]
+                ),
+                cached["context_pack_version"],
+                max_errors,
+                on_error,
+            )
+            return FileValidationResult(
+                file=file_path,
+                context_pack_version=cached["context_pack_version"],
+                errors=tuple(errors),
+                truncated=truncated,
             )
-            _expect(has_operation, path, "非空のoperationまたはhandlesが必要です", errors)
 
-    for index, item in enumerate(entries("resource_constraints", "linear_resources")):
-        path = f"$.resource_constraints.linear_resources[{index}]"
-        if _is_non_empty_str(item):
-            continue
-        _expect(isinstance(item, dict), path, "非空文字列またはlinear resourceオブジェクトである必要があります", errors)
-        if isinstance(item, dict):
-            require_string(item, "id", path)
-            _expect(_is_non_empty_rule(item.get("rule")), f"{path}.rule", "rule は非空文字列または非空文字列配列である必要があります", errors)
+    try:
+        doc, source_map = load_pack(Path(file_path), content, use_compiled=use_compiled)
+    except Exception as e:
+        return FileValidationResult(file=file_path, context_pack_version=None, errors=(), load_error=str(e))
 
+    context_pack_version = detect_context_pack_version(doc)
+    errors, truncated = _take_errors(
+        with_positions(iter_errors(doc, context_pack_version), source_map), context_pack_version, max_errors, on_error
+    )
 
-def validate_context_pack_v2(doc: Any) -> list[ValidationErrorItem]:
-    errors = validate_context_pack_v1(doc)
+    if cache is not None and key is not None and not truncated:
+        cache.put(
+            key,
+            {
+                "context_pack_version": context_pack_version,
+                "errors": [[item.path, item.message, item.rule, item.line, item.column] for item in errors],
+            },
+        )
+    return FileValidationResult(
+        file=file_path,
+        context_pack_version=context_pack_version,
+        errors=tuple(errors),
+        truncated=truncated,
+    )
 
-    _expect(isinstance(doc, dict), "$", "トップレベルはオブジェクト（dict）である必要があります", errors)
-    if not isinstance(doc, dict):
-        return errors
-
-    _expect(doc.get("version") == 2, "$.version", "v2 では version は 2 である必要があります", errors)
-    _expect(
-        doc.get("context_pack_version") == 2,
-        "$.context_pack_version",
-        "context_pack_version は 2 である必要があります",
-        errors,
+
+def validate_files(
+    files: list[str],
+    jobs: int,
+    cache: Optional[ValidationCache] = None,
+    max_errors: Optional[int] = None,
+    use_compiled: bool = False,
+) -> Iterator[FileValidationResult]:
+    """Validate files, fanning out to a process pool; results are yielded in input order.
+
+    Closing the generator early cancels files that have not started yet.
+    """
+    worker = partial(validate_file, cache=cache, max_errors=max_errors, use_compiled=use_compiled)
+    if jobs <= 1 or len(files) <= 1:
+        for file_path in files:
+            yield worker(file_path)
+        return
+
+    workers = min(jobs, len(files))
+    # Hand each worker a few large chunks so IPC stays small relative to parse cost.
+    chunksize = max(1, len(files) // (workers * 4))
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        yield from executor.map(worker, files, chunksize=chunksize)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _invalid_header(file_path: str, context_pack_version: Optional[int]) -> str:
+    return f"❌ Invalid Context Pack v{context_pack_version}: {file_path}"
+
+
+def _finding(file_path: str, item: ValidationErrorItem) -> Finding:
+    return Finding(
+        rule_id=item.rule,
+        message=item.message,
+        file=file_path,
+        line=item.line,
+        column=item.column,
+        json_path=item.path,
     )
 
-    _expect_object_with_required_keys(
-        doc,
-        "data_contracts",
-        [
-            ("schemas", "array"),
-            ("mappings", "array"),
-            ("migration_verification", "str_or_object_array"),
-        ],
-        errors,
+
+def format_error(file_path: str, item: ValidationErrorItem) -> str:
+    if item.line is None:
+        return f"- {item.path}: {item.message}"
+    return f"- {file_path}:{item.line}:{item.column}: {item.path}: {item.message}"
+
+
+def report_result(
+    result: FileValidationResult,
+    errors_reported: bool = False,
+    writer: Optional[FindingWriter] = None,
+) -> None:
+    """Print ``result``; pass ``errors_reported`` when its errors were already streamed."""
+    if writer is not None:
+        if result.load_error is not None:
+            writer.write(Finding(rule_id=RULE_LOAD_ERROR, message=result.load_error, file=result.file))
+        elif not errors_reported:
+            for item in result.errors:
+                writer.write(_finding(result.file, item))
+        return
+    if result.load_error is not None:
+        print(f"❌ Failed to load: {result.file}: {result.load_error}", file=sys.stderr)
+        return
+    if result.errors:
+        if not errors_reported:
+            print(_invalid_header(result.file, result.context_pack_version), file=sys.stderr)
+            for item in result.errors:
+                print(format_error(result.file, item), file=sys.stderr)
+        if result.truncated:
+            print(f"- ... stopped after {len(result.errors)} error(s); more may exist", file=sys.stderr)
+        return
+    print(f"✅ Context Pack v{result.context_pack_version} is valid: {result.file}")
+
+
+class _ErrorStreamer:
+    """Print a file's errors the moment the in-process lint finds them."""
+
+    def __init__(self, file_path: str, writer: Optional[FindingWriter] = None) -> None:
+        self.file_path = file_path
+        self.writer = writer
+        self.started = False
+
+    def __call__(self, context_pack_version: int, item: ValidationErrorItem) -> None:
+        if self.writer is not None:
+            self.writer.write(_finding(self.file_path, item))
+            self.started = True
+            return
+        if not self.started:
+            print(_invalid_header(self.file_path, context_pack_version), file=sys.stderr)
+            self.started = True
+        print(format_error(self.file_path, item), file=sys.stderr, flush=True)
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Validate Context Pack v1/v2 YAML/JSON (minimal lint).")
+    parser.add_argument(
+        "targets",
+        nargs="*",
+        metavar="file",
+        help="Target file (.yaml/.yml/.json), directory, or glob pattern; directories are searched recursively",
     )
-    _expect_object_with_required_keys(
-        doc,
-        "open_systems",
-        [
-            ("components", "array"),
-            ("boundaries", "array"),
-            ("composition", "array"),
-        ],
-        errors,
+    parser.add_argument(
+        "--files-from",
+        metavar="LIST",
+        default=None,
+        help="Read additional target paths from LIST, one per line ('-' for stdin)",
     )
-    _expect_object_with_required_keys(
-        doc,
-        "views",
-        [("lenses_or_optics", "array")],
-        errors,
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=0,
+        help="Number of worker processes for batch validation (default: CPU count)",
     )
-    _expect_object_with_required_keys(
-        doc,
-        "effects",
-        [
-            ("operations", "array"),
-            ("handlers", "array"),
-            ("effect_safety_notes", "str_array"),
-        ],
-        errors,
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Reuse results for unchanged packs from this directory (default: $CONTEXT_PACK_CACHE_DIR; disabled when unset)",
     )
-    _expect_object_with_required_keys(
-        doc,
-        "agent_runtime",
-        [
-            ("allowed_tools", "allowed_tool_array"),
-            ("forbidden_tools", "forbidden_tool_array"),
-            ("guardrails", "object"),
-            ("trace_evidence", "object"),
-        ],
-        errors,
+    parser.add_argument(
+        "--cache-max-bytes",
+        type=int,
+        default=DEFAULT_MAX_BYTES,
+        help=f"Evict least-recently-used cache entries above this size (default: {DEFAULT_MAX_BYTES})",
     )
-    _expect_object_with_required_keys(
-        doc,
-        "resource_constraints",
-        [
-            ("tool_budget", "object"),
-            ("data_sensitivity", "object"),
-            ("linear_resources", "array"),
-        ],
-        errors,
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="Stop at the first error: report one error per file and skip the remaining files",
     )
-    _expect_object_with_required_keys(
-        doc,
-        "change_semantics",
-        [
-            ("allowed_refactors", "str_array"),
-            ("forbidden_conflict_resolutions", "str_array"),
-            ("merge_invariants", "str_array"),
-        ],
-        errors,
+    parser.add_argument(
+        "--max-errors",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Stop validating a file after N errors (default: report every error)",
     )
-    _expect_object_with_required_keys(
-        doc,
-        "formalization_level",
-        [
-            ("metaphor_only", "str_array"),
-            ("machine_checked", "str_array"),
-            ("tested_by_ci", "str_array"),
-            ("reviewed_manually", "str_array"),
-        ],
-        errors,
+    parser.add_argument(
+        "--compiled-cache",
+        action="store_true",
+        help="Reuse parsed YAML from .<name>.compiled.json next to each pack (also enabled by $CONTEXT_PACK_COMPILED_CACHE=1)",
     )
-
-    _validate_v2_structured_entries(doc, errors)
-
-    return errors
-
-
-def detect_context_pack_version(doc: Any) -> int:
-    if isinstance(doc, dict) and (doc.get("context_pack_version") == 2 or doc.get("version") == 2):
+    add_format_argument(parser)
+    args = parser.parse_args(argv)
+    if args.max_errors is not None and args.max_errors < 1:
+        parser.error("--max-errors must be at least 1")
+    max_errors = 1 if args.fail_fast else args.max_errors
+
+    targets = list(args.targets)
+    if args.files_from:
+        try:
+            targets.extend(read_file_list(args.files_from))
+        except OSError as e:
+            print(f"❌ Failed to read file list: {args.files_from}: {e}", file=sys.stderr)
+            return 2
+    if not targets:
+        parser.error("at least one file, directory, or glob pattern is required")
+
+    files = expand_targets(targets)
+    if not files:
+        print(f"❌ No Context Pack files matched: {' '.join(targets)}", file=sys.stderr)
         return 2
-    return 1
 
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    cache = open_cache(args.cache_dir, max_bytes=args.cache_max_bytes)
+    writer = open_writer(args.format, "validate-context-pack")
+    use_compiled = compiled_cache_enabled(args.compiled_cache)
+    checked = load_failures = invalid = 0
+    if jobs <= 1 or len(files) <= 1:
+        # In-process: print each error the moment the lint yields it.
+        def results() -> Iterator[tuple[FileValidationResult, bool]]:
+            for file_path in files:
+                streamer = _ErrorStreamer(file_path, writer)
+                result = validate_file(
+                    file_path, cache=cache, max_errors=max_errors, on_error=streamer, use_compiled=use_compiled
+                )
+                yield result, streamer.started
 
-def main(argv: list[str]) -> int:
-    parser = argparse.ArgumentParser(description="Validate Context Pack v1/v2 YAML/JSON (minimal lint).")
-    parser.add_argument("file", help="Target file path (.yaml/.yml/.json)")
-    args = parser.parse_args(argv)
+    else:
+
+        def results() -> Iterator[tuple[FileValidationResult, bool]]:
+            for result in validate_files(files, jobs, cache=cache, max_errors=max_errors, use_compiled=use_compiled):
+                yield result, False
 
+    stream = results()
     try:
-        doc = load_document(args.file)
-    except Exception as e:
-        print(f"❌ Failed to load: {args.file}: {e}", file=sys.stderr)
-        return 2
+        for result, errors_reported in stream:
+            report_result(result, errors_reported=errors_reported, writer=writer)
+            checked += 1
+            if result.load_error is not None:
+                load_failures += 1
+            elif result.errors:
+                invalid += 1
+            if args.fail_fast and (load_failures or invalid):
+                break
+    finally:
+        stream.close()
+        if writer is not None:
+            writer.close()
+    if cache is not None:
+        cache.evict()
+
+    if len(files) > 1 and writer is None:
+        valid = checked - load_failures - invalid
+        summary = f"{checked} checked, {valid} valid, {invalid} invalid, {load_failures} failed to load"
+        if checked < len(files):
+            summary += f", {len(files) - checked} skipped (--fail-fast)"
+        if load_failures or invalid:
+            print(f"❌ Context Pack batch failed: {summary}", file=sys.stderr)
+        else:
+            print(f"✅ Context Pack batch passed: {summary}")
 
-    context_pack_version = detect_context_pack_version(doc)
-    if context_pack_version == 2:
-        errors = validate_context_pack_v2(doc)
-    else:
-        errors = validate_context_pack_v1(doc)
-    if errors:
-        print(f"❌ Invalid Context Pack v{context_pack_version}: {args.file}", file=sys.stderr)
-        for item in errors:
-            print(f"- {item.path}: {item.message}", file=sys.stderr)
+    if load_failures:
+        return 2
+    if invalid:
         return 1
-
-    print(f"✅ Context Pack v{context_pack_version} is valid: {args.file}")
     return 0
 
 